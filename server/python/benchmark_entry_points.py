@@ -0,0 +1,600 @@
+#!/usr/bin/env python3
+"""
+Startup and Cold-Path Benchmark for Python Entry Points
+Measures how long each spawn-per-request Python entry point takes to become useful:
+import time per module, agent constructor time, first-call latency and warm-call
+latency for each method. Every entry point runs in a fresh interpreter so import
+and first-call numbers are real cold-start costs.
+
+Heavy model backends (ChromaDB, sentence-transformers, transformers/torch,
+LangChain, LangGraph, Langfuse, Redis, Radon, Graphviz) are replaced by offline
+stubs by default, so the numbers describe our own code paths and run without
+network access or model downloads. Use --real-backends to measure the installed
+backends instead.
+
+Usage:
+    python benchmark_entry_points.py [--output report.json] [--warm-calls 5]
+                                     [--only zenVectorCli,field_matcher_ml]
+                                     [--real-backends]
+                                     [--compare baseline.json] [--tolerance 0.25]
+"""
+
+import sys
+import os
+import json
+import time
+import types
+import platform
+import tempfile
+import importlib
+import statistics
+import subprocess
+from contextlib import redirect_stdout
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+PYTHON_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVICES_DIR = os.path.join(os.path.dirname(PYTHON_DIR), 'services')
+
+REPORT_VERSION = 1
+DEFAULT_WARM_CALLS = 5
+DEFAULT_TOLERANCE = 0.25
+
+# ---------------------------------------------------------------------------
+# Offline backend stubs
+# ---------------------------------------------------------------------------
+
+class _StubVector(list):
+    """List with a numpy-like tolist()"""
+    def tolist(self):
+        return [item.tolist() if isinstance(item, _StubVector) else item for item in self]
+
+class _StubEmbeddingModel:
+    """Deterministic stand-in for SentenceTransformer / HuggingFaceEmbeddings"""
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def _vector(self, text: str) -> _StubVector:
+        return _StubVector((hash(text) >> shift & 0xff) / 255.0 for shift in range(0, 384, 8))
+
+    def encode(self, texts):
+        if isinstance(texts, str):
+            return self._vector(texts)
+        return _StubVector(self._vector(text) for text in texts)
+
+    def embed_query(self, text: str):
+        return self._vector(text).tolist()
+
+class _StubCollection:
+    """In-memory ChromaDB collection"""
+    def __init__(self):
+        self.documents = {}
+
+    def add(self, documents=None, metadatas=None, ids=None, embeddings=None):
+        for doc_id, document, metadata in zip(ids, documents, metadatas or [{}] * len(ids)):
+            self.documents[doc_id] = (document, metadata)
+
+    def query(self, query_embeddings=None, query_texts=None, n_results=10, where=None):
+        items = list(self.documents.values())[:n_results]
+        return {
+            'documents': [[document for document, _ in items]],
+            'metadatas': [[metadata for _, metadata in items]],
+            'distances': [[0.5 for _ in items]]
+        }
+
+    def count(self) -> int:
+        return len(self.documents)
+
+class _StubChromaClient:
+    """In-memory ChromaDB PersistentClient"""
+    def __init__(self, path=None, settings=None):
+        self.collections = {}
+
+    def get_collection(self, name: str):
+        if name not in self.collections:
+            raise ValueError(f"Collection {name} does not exist")
+        return self.collections[name]
+
+    def create_collection(self, name: str, metadata=None):
+        self.collections[name] = _StubCollection()
+        return self.collections[name]
+
+class _StubPipeline:
+    """transformers.pipeline stand-in for classification and generation"""
+    def __init__(self, task: str, model: str = None, device: int = -1, **kwargs):
+        self.task = task
+        self.tokenizer = types.SimpleNamespace(eos_token_id=0)
+
+    def __call__(self, text, **kwargs):
+        if self.task == 'text-generation':
+            return [{'generated_text': f"{text} Answer: stub response"}]
+        return [{'label': 'LABEL_0', 'score': 0.5}]
+
+class _StubRedis:
+    """In-memory redis.Redis"""
+    def __init__(self, **kwargs):
+        self.store = {}
+
+    def ping(self):
+        return True
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def setex(self, key, expire, value):
+        self.store[key] = value
+
+    def info(self):
+        return {'db0': {'keys': len(self.store)}, 'used_memory_human': '0K'}
+
+class _StubTextSplitter:
+    def __init__(self, chunk_size=1000, chunk_overlap=0, length_function=len):
+        self.chunk_size = chunk_size
+
+    def split_text(self, text: str) -> List[str]:
+        return [text[i:i + self.chunk_size] for i in range(0, len(text), self.chunk_size)]
+
+class _StubVectorStore:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def as_retriever(self, **kwargs):
+        return self
+
+class _StubRetrievalQA:
+    @classmethod
+    def from_chain_type(cls, **kwargs):
+        return cls()
+
+    def __call__(self, inputs):
+        return {'result': 'stub answer', 'source_documents': []}
+
+class _StubStateGraph:
+    def __init__(self, state=None):
+        pass
+
+    def add_node(self, name, func):
+        pass
+
+    def add_edge(self, start, end):
+        pass
+
+    def compile(self):
+        return self
+
+class _StubDigraph:
+    """graphviz.Digraph stand-in that writes an empty output file"""
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def attr(self, *args, **kwargs):
+        pass
+
+    def node(self, *args, **kwargs):
+        pass
+
+    def edge(self, *args, **kwargs):
+        pass
+
+    def render(self, filename, format='svg', cleanup=True):
+        path = f"{filename}.{format}"
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('')
+        return path
+
+class _StubObject:
+    """Accepts any constructor arguments"""
+    def __init__(self, *args, **kwargs):
+        pass
+
+def _noop_observe(*args, **kwargs):
+    return lambda func: func
+
+def _stub_module(name: str, **attributes) -> types.ModuleType:
+    module = types.ModuleType(name)
+    module.__dict__.update(attributes)
+    sys.modules[name] = module
+    return module
+
+def install_backend_stubs():
+    """Register offline stubs for every heavy backend in sys.modules"""
+    _stub_module('chromadb', PersistentClient=_StubChromaClient)
+    _stub_module('chromadb.config', Settings=_StubObject)
+    _stub_module('sentence_transformers', SentenceTransformer=_StubEmbeddingModel)
+    _stub_module('transformers', pipeline=_StubPipeline, AutoTokenizer=_StubObject, AutoModel=_StubObject)
+    _stub_module('torch', cuda=types.SimpleNamespace(is_available=lambda: False))
+    _stub_module('langfuse', Langfuse=_StubObject)
+    _stub_module('langfuse.decorators', observe=_noop_observe, langfuse_context=None)
+    _stub_module('redis', Redis=_StubRedis)
+    _stub_module('radon')
+    _stub_module('radon.complexity', cc_visit=lambda code: [])
+    _stub_module('radon.metrics', mi_visit=lambda code, multi: 100.0, h_visit=lambda code: None)
+    _stub_module('langchain')
+    _stub_module('langchain.document_loaders', PyPDFLoader=_StubObject, WebBaseLoader=_StubObject)
+    _stub_module('langchain.text_splitter', RecursiveCharacterTextSplitter=_StubTextSplitter)
+    _stub_module('langchain.vectorstores', Chroma=_StubVectorStore)
+    _stub_module('langchain.embeddings', HuggingFaceEmbeddings=_StubEmbeddingModel)
+    _stub_module('langchain.llms', HuggingFacePipeline=_StubObject)
+    _stub_module('langchain.chains', RetrievalQA=_StubRetrievalQA)
+    _stub_module('langchain.prompts', PromptTemplate=_StubObject)
+    _stub_module('langgraph', StateGraph=_StubStateGraph, START='__start__', END='__end__')
+    _stub_module('langgraph.graph', MessagesState=dict)
+    _stub_module('bs4', BeautifulSoup=_StubObject)
+    _stub_module('PyPDF2')
+    _stub_module('graphviz', Digraph=_StubDigraph)
+
+# ---------------------------------------------------------------------------
+# Sample workloads
+# ---------------------------------------------------------------------------
+
+SAMPLE_CLASSES = [
+    {
+        'name': f"Customer{kind}{i}",
+        'type': kind.lower(),
+        'package': 'com.example.customer',
+        'annotations': [f"@{kind}"],
+        'methods': [{'name': f"handle{j}"} for j in range(6)],
+        'fields': [{'name': name, 'type': 'String'} for name in ('firstName', 'lastName', 'email', 'ssn')]
+    }
+    for i in range(4)
+    for kind in ('Controller', 'Service', 'Repository')
+]
+
+SAMPLE_RELATIONSHIPS = [
+    {'from': f"CustomerController{i}", 'to': f"CustomerService{i}", 'type': 'calls'}
+    for i in range(4)
+] + [
+    {'from': f"CustomerService{i}", 'to': f"CustomerRepository{i}", 'type': 'uses'}
+    for i in range(4)
+]
+
+SAMPLE_DEMOGRAPHIC_RECORDS = [
+    {'age_group': group, 'region': region, 'income': 40000 + 1000 * i}
+    for i, (group, region) in enumerate(
+        (g, r) for g in ('18-25', '26-40', '41-65') for r in ('north', 'south')
+    )
+]
+
+SAMPLE_TABLES = ['CUSTOMER', 'ACCOUNT', 'ORDERS', 'PAYMENT', 'ADDRESS']
+SAMPLE_COLUMNS = [
+    'first_name', 'last_name', 'ssn', 'date_of_birth', 'email_address', 'phone_number',
+    'street_address', 'zip_code', 'account_number', 'card_number', 'order_id', 'status_code'
+]
+
+SAMPLE_CODEBASE_FIELDS = [
+    f"{prefix}{suffix}"
+    for prefix in ('customer', 'client', 'billing', 'shipping', 'primary', 'secondary')
+    for suffix in ('FirstName', 'LastName', 'Ssn', 'DateOfBirth', 'EmailAddress', 'PhoneNumber',
+                   'StreetAddress', 'ZipCode', 'AccountNumber', 'CardNumber', 'OrderId', 'StatusCode',
+                   'CreatedDate', 'UpdatedDate', 'Quantity', 'Price', 'Description', 'Notes',
+                   'Version', 'Token', 'Category', 'Amount', 'Total', 'Reference')
+]
+
+def _sample_source_files() -> List[Dict[str, str]]:
+    files = []
+    for cls in SAMPLE_CLASSES:
+        lines = [f"package {cls['package']};", f"public class {cls['name']} {{"]
+        lines += [f"    private String {field['name']};" for field in cls['fields']]
+        lines += [f"    public void {method['name']}() {{ this.email = getEmail(); }}" for method in cls['methods']]
+        lines += ['    // SELECT * FROM CUSTOMER JOIN ACCOUNT ON CUSTOMER.id = ACCOUNT.customer_id', '}']
+        files.append({'relativePath': f"src/{cls['name']}.java", 'content': '\n'.join(lines)})
+    return files
+
+# ---------------------------------------------------------------------------
+# Entry point definitions
+# ---------------------------------------------------------------------------
+
+def _zen_vector_workload(workdir: str):
+    import zenVectorCli
+    from zenVectorService import ZenVectorAgent
+
+    calls = [
+        ('get_agent_statistics', {}),
+        ('add_code_to_vector_db', {'project_id': 'bench', 'code_data': {'classes': SAMPLE_CLASSES}}),
+        ('find_similar_code', {'query_code': 'customer service controller', 'top_k': 5}),
+        ('semantic_search', {'query': 'customer email', 'top_k': 10}),
+        ('analyze_demographic_patterns', {'demographic_data': SAMPLE_DEMOGRAPHIC_RECORDS}),
+        ('search_demographic_data', {'query': 'income north', 'top_k': 10}),
+    ]
+    construct = lambda: ZenVectorAgent(db_path=os.path.join(workdir, 'chroma_db'))
+    methods = [
+        (method, lambda agent, m=method, d=data: zenVectorCli.handle_request(agent, m, d))
+        for method, data in calls
+    ]
+    return construct, methods
+
+def _knowledge_agent_workload(workdir: str):
+    import knowledgeAgentCli
+    from knowledgeAgent import KnowledgeAgent
+
+    calls = [
+        ('get_agent_statistics', {}),
+        ('chat_query', {'query': 'How is customer data stored?', 'context_limit': 5}),
+    ]
+    construct = lambda: KnowledgeAgent(db_path=os.path.join(workdir, 'knowledge_db'))
+    methods = [
+        (method, lambda agent, m=method, d=data: knowledgeAgentCli.handle_request(agent, m, d))
+        for method, data in calls
+    ]
+    return construct, methods
+
+def _class_diagram_workload(workdir: str):
+    import classDiagramGenerator
+
+    analysis_data = {'classes': SAMPLE_CLASSES, 'relationships': SAMPLE_RELATIONSHIPS}
+    methods = [
+        ('create_class_diagram', lambda _: classDiagramGenerator.create_class_diagram(analysis_data, 'svg', 'light')),
+    ]
+    return None, methods
+
+def _field_matcher_workload(workdir: str):
+    from field_matcher_ml import FieldMatcherML
+
+    excel_fields = [
+        {'tableName': table, 'fieldName': column}
+        for table in SAMPLE_TABLES for column in SAMPLE_COLUMNS
+    ]
+    methods = [
+        ('calculate_similarity', lambda matcher: matcher.calculate_similarity('CUSTOMER.ssn', 'socialSecurityNumber')),
+        ('suggest_mappings', lambda matcher: matcher.suggest_mappings(excel_fields, SAMPLE_CODEBASE_FIELDS)),
+    ]
+    return FieldMatcherML, methods
+
+def _excel_scanner_workload(workdir: str):
+    import openpyxl
+    from excel_field_scanner import ExcelFieldScanner
+
+    excel_path = os.path.join(workdir, 'fields.xlsx')
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(['table_name', 'field_name'])
+    for table in SAMPLE_TABLES:
+        for column in SAMPLE_COLUMNS:
+            sheet.append([table, column])
+    workbook.save(excel_path)
+
+    source_files = _sample_source_files()
+    methods = [
+        ('parse_excel', lambda scanner: scanner.parse_excel()),
+        ('scan_source_files', lambda scanner: scanner.scan_source_files(source_files)),
+    ]
+    return lambda: ExcelFieldScanner(excel_path), methods
+
+def _report_generator_workload(workdir: str):
+    import report_generator
+
+    html_path = os.path.join(workdir, 'report.html')
+    with open(html_path, 'w', encoding='utf-8') as f:
+        f.write('<html><body>' + '<p>Field mapping row</p>' * 500 + '</body></html>')
+
+    def generate(_, format_type):
+        argv = sys.argv
+        sys.argv = ['report_generator.py', html_path, os.path.join(workdir, f"report.{format_type}"), format_type]
+        try:
+            report_generator.main()
+        finally:
+            sys.argv = argv
+
+    methods = [
+        ('main_pdf', lambda ctx: generate(ctx, 'pdf')),
+        ('main_docx', lambda ctx: generate(ctx, 'docx')),
+    ]
+    return None, methods
+
+# name -> (directory, modules imported in dependency order, workload factory)
+ENTRY_POINTS: Dict[str, Tuple[str, List[str], Callable]] = {
+    'zenVectorCli': (SERVICES_DIR, ['capabilityProbe', 'zenVectorService', 'zenVectorCli'], _zen_vector_workload),
+    'knowledgeAgentCli': (SERVICES_DIR, ['capabilityProbe', 'knowledgeAgent', 'knowledgeAgentCli'], _knowledge_agent_workload),
+    'classDiagramGenerator': (SERVICES_DIR, ['classDiagramGenerator'], _class_diagram_workload),
+    'field_matcher_ml': (PYTHON_DIR, ['tensorflow_field_model', 'field_matcher_ml'], _field_matcher_workload),
+    'excel_field_scanner': (PYTHON_DIR, ['excel_field_scanner'], _excel_scanner_workload),
+    'report_generator': (PYTHON_DIR, ['report_generator'], _report_generator_workload),
+}
+
+# ---------------------------------------------------------------------------
+# Measurement
+# ---------------------------------------------------------------------------
+
+def _timed(func: Callable, *args) -> Tuple[float, Any]:
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+def _summarize(samples: List[float]) -> Dict[str, float]:
+    if not samples:
+        return {}
+    return {
+        'min': round(min(samples), 6),
+        'median': round(statistics.median(samples), 6),
+        'mean': round(statistics.mean(samples), 6),
+        'max': round(max(samples), 6)
+    }
+
+def _error_payload(value: Any) -> Optional[str]:
+    """Error message of a {"error": ...} result (handlers report failures that way)"""
+    if isinstance(value, dict) and value.get('error'):
+        return str(value['error'])
+    return None
+
+def measure_entry_point(name: str, warm_calls: int, stub_backends: bool) -> Dict[str, Any]:
+    """Measure one entry point inside the current (fresh) interpreter"""
+    directory, modules, workload = ENTRY_POINTS[name]
+    sys.path.insert(0, directory)
+    result: Dict[str, Any] = {'import_seconds': {}, 'methods': {}}
+
+    with tempfile.TemporaryDirectory(prefix=f"bench_{name}_") as workdir:
+        if stub_backends:
+            install_backend_stubs()
+            # Ignore any host manifest so every (stubbed) backend is imported
+            os.environ['ZENAGENT_CAPABILITY_MANIFEST'] = os.path.join(workdir, 'no_manifest.json')
+
+        try:
+            for module in modules:
+                elapsed, _ = _timed(importlib.import_module, module)
+                result['import_seconds'][module] = round(elapsed, 6)
+            result['import_total_seconds'] = round(sum(result['import_seconds'].values()), 6)
+
+            construct, methods = workload(workdir)
+            context = None
+            if construct is not None:
+                elapsed, context = _timed(construct)
+                result['constructor_seconds'] = round(elapsed, 6)
+        except Exception as e:
+            result['error'] = f"{type(e).__name__}: {e}"
+            return result
+
+        for method, call in methods:
+            entry: Dict[str, Any] = {}
+            try:
+                elapsed, value = _timed(call, context)
+                error = _error_payload(value)
+                if error:
+                    entry['error'] = error
+                    result['methods'][method] = entry
+                    continue
+                entry['first_call_seconds'] = round(elapsed, 6)
+
+                # Calls answering with an error payload did no real work
+                samples, failed = [], 0
+                for _ in range(warm_calls):
+                    elapsed, value = _timed(call, context)
+                    if _error_payload(value):
+                        failed += 1
+                    else:
+                        samples.append(elapsed)
+                entry['warm_call_seconds'] = _summarize(samples)
+                if failed:
+                    entry['failed_calls'] = failed
+            except Exception as e:
+                entry['error'] = f"{type(e).__name__}: {e}"
+            result['methods'][method] = entry
+
+    return result
+
+def run_child(name: str, warm_calls: int, stub_backends: bool):
+    """Child process: measure and print a single JSON line on the real stdout"""
+    out = sys.stdout
+    with redirect_stdout(sys.stderr):
+        result = measure_entry_point(name, warm_calls, stub_backends)
+    out.write(json.dumps(result) + "\n")
+    out.flush()
+
+def run_benchmarks(names: List[str], warm_calls: int, stub_backends: bool) -> Dict[str, Any]:
+    """Run every entry point in its own interpreter and collect a report"""
+    report = {
+        'benchmark': 'python_entry_points',
+        'version': REPORT_VERSION,
+        'generated_at': datetime.now().isoformat(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'stub_backends': stub_backends,
+        'warm_calls': warm_calls,
+        'entry_points': {}
+    }
+
+    for name in names:
+        command = [sys.executable, os.path.abspath(__file__), '--child', name, '--warm-calls', str(warm_calls)]
+        if not stub_backends:
+            command.append('--real-backends')
+
+        start = time.perf_counter()
+        completed = subprocess.run(command, capture_output=True, text=True)
+        wall = time.perf_counter() - start
+
+        lines = [line for line in completed.stdout.splitlines() if line.strip()]
+        try:
+            result = json.loads(lines[-1])
+        except (IndexError, ValueError):
+            result = {'error': completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else 'No output'}
+        result['process_wall_seconds'] = round(wall, 6)
+        report['entry_points'][name] = result
+        print(f"{name:25s} import={result.get('import_total_seconds', 'n/a')}s "
+              f"constructor={result.get('constructor_seconds', 'n/a')}s wall={wall:.3f}s", file=sys.stderr)
+
+    return report
+
+def _flatten_timings(report: Dict[str, Any]) -> Dict[str, float]:
+    """Flatten comparable timings into 'entry.metric' keys"""
+    timings = {}
+    for name, result in report.get('entry_points', {}).items():
+        for key in ('import_total_seconds', 'constructor_seconds'):
+            if key in result:
+                timings[f"{name}.{key}"] = result[key]
+        for method, entry in result.get('methods', {}).items():
+            if 'first_call_seconds' in entry:
+                timings[f"{name}.{method}.first_call_seconds"] = entry['first_call_seconds']
+            if entry.get('warm_call_seconds'):
+                timings[f"{name}.{method}.warm_call_median_seconds"] = entry['warm_call_seconds']['median']
+    return timings
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any], tolerance: float,
+                    min_seconds: float = 0.001) -> List[Dict[str, Any]]:
+    """List timings that got slower than baseline by more than the tolerance"""
+    regressions = []
+    before = _flatten_timings(baseline)
+    after = _flatten_timings(current)
+    for key, old in before.items():
+        new = after.get(key)
+        if new is None or max(old, new) < min_seconds:
+            continue
+        if new > old * (1 + tolerance):
+            regressions.append({
+                'metric': key,
+                'baseline_seconds': old,
+                'current_seconds': new,
+                'slowdown': round(new / old, 3) if old > 0 else None
+            })
+    return regressions
+
+def _option(argv: List[str], flag: str, default: Optional[str] = None) -> Optional[str]:
+    if flag in argv:
+        index = argv.index(flag)
+        if index + 1 < len(argv):
+            return argv[index + 1]
+    return default
+
+def main():
+    """Main entry point for CLI usage"""
+    argv = sys.argv[1:]
+    warm_calls = int(_option(argv, '--warm-calls', str(DEFAULT_WARM_CALLS)))
+    stub_backends = '--real-backends' not in argv
+
+    child = _option(argv, '--child')
+    if child:
+        run_child(child, warm_calls, stub_backends)
+        return
+
+    only = _option(argv, '--only')
+    names = only.split(',') if only else list(ENTRY_POINTS)
+    unknown = [name for name in names if name not in ENTRY_POINTS]
+    if unknown:
+        print(json.dumps({"error": f"Unknown entry points: {', '.join(unknown)}"}))
+        sys.exit(1)
+
+    report = run_benchmarks(names, warm_calls, stub_backends)
+
+    baseline_path = _option(argv, '--compare')
+    if baseline_path:
+        with open(baseline_path, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        tolerance = float(_option(argv, '--tolerance', str(DEFAULT_TOLERANCE)))
+        report['comparison'] = {
+            'baseline': baseline_path,
+            'tolerance': tolerance,
+            'regressions': compare_reports(baseline, report, tolerance)
+        }
+
+    output = json.dumps(report, indent=2)
+    output_path = _option(argv, '--output')
+    if output_path:
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(output)
+        print(f"Report written to {output_path}", file=sys.stderr)
+    else:
+        print(output)
+
+    if baseline_path and report['comparison']['regressions']:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Training and Inference Benchmark for the Field Model
+Measures NeuralFieldEmbedding throughput so model and trainer changes can be
+judged on speed and quality together: training pairs/sec on the demographic
+training pairs (a fresh model, fixed epoch budget, no early stopping), and
+names/sec for encode_batch and embed_batch at several batch sizes against the
+shipped model. Every phase also reports its peak traced allocation, and the
+report includes the process peak RSS and the critical-pair similarity scores
+of both the shipped and the freshly trained model. Training pairs and names
+are drawn from a fixed --seed (recorded in the report), so runs and
+baselines measure the same workload.
+
+Timings are taken without tracing; peak memory comes from one extra
+tracemalloc run per phase (allocations in training worker processes are
+not traced).
+
+Usage:
+    python benchmark_field_model.py [--output report.json] [--model path]
+                                    [--epochs 5] [--workers 1] [--repeats 3]
+                                    [--batch-sizes 1,32,256,4096] [--names 20000]
+                                    [--seed 0] [--compare baseline.json] [--tolerance 0.25]
+"""
+
+import sys
+import os
+import json
+import time
+import random
+import platform
+import statistics
+import tracemalloc
+from contextlib import redirect_stdout
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import numpy as np
+from tensorflow_field_model import NeuralFieldEmbedding, PARALLEL_MIN_PAIRS
+from train_demographic_model import (
+    CRITICAL_PAIRS, DEMOGRAPHIC_FIELDS, NON_DEMOGRAPHIC_FIELDS, generate_demographic_training_data
+)
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
+PYTHON_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_MODEL = os.path.join(PYTHON_DIR, 'models', 'demographic_field_model.zfm')
+
+REPORT_VERSION = 1
+DEFAULT_EPOCHS = 5
+DEFAULT_REPEATS = 3
+DEFAULT_BATCH_SIZES = (1, 32, 256, 4096)
+DEFAULT_NAMES = 20_000
+DEFAULT_TOLERANCE = 0.25
+DEFAULT_SEED = 0
+
+# Batches timed per batch size, so batch size 1 runs over a prefix of the names
+MAX_BATCHES = 1000
+
+# Training settings of train_demographic_model.py's full-pair-set mode
+TRAIN_OPTIMIZER = 'adam'
+TRAIN_LEARNING_RATE = 0.002
+TRAIN_BATCH_SIZE = 32
+
+# Critical pairs must score above this (as in train_demographic_model.py)
+CRITICAL_THRESHOLD = 0.85
+
+# Drop in the lowest critical-pair score reported as a quality regression
+QUALITY_TOLERANCE = 0.02
+
+# ---------------------------------------------------------------------------
+# Measurement
+# ---------------------------------------------------------------------------
+
+def _summarize(samples: List[float]) -> Dict[str, float]:
+    return {
+        'min': round(min(samples), 6),
+        'median': round(statistics.median(samples), 6),
+        'max': round(max(samples), 6)
+    }
+
+def _peak_traced_bytes(func: Callable[[], Any]) -> int:
+    """Peak memory allocated (Python and NumPy) while func runs"""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def _max_rss_bytes() -> Optional[int]:
+    """Peak resident set size of this process so far"""
+    if not RESOURCE_AVAILABLE:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+def _throughput(func: Callable[[], Any], items: int, repeats: int) -> Dict[str, Any]:
+    """Items/sec over repeated runs (best and median) plus the traced peak"""
+    seconds = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        seconds.append(time.perf_counter() - start)
+    return {
+        'items': items,
+        'seconds': _summarize(seconds),
+        'per_second_best': round(items / min(seconds), 1),
+        'per_second_median': round(items / statistics.median(seconds), 1),
+        'peak_traced_bytes': _peak_traced_bytes(func)
+    }
+
+def critical_scores(model: NeuralFieldEmbedding) -> Dict[str, Any]:
+    """Similarity of every critical pair, the lowest one and whether all pass"""
+    scores = model.pair_similarities(CRITICAL_PAIRS)
+    return {
+        'pairs': {f"{a}|{b}": round(float(score), 6) for (a, b), score in zip(CRITICAL_PAIRS, scores)},
+        'min': round(float(scores.min()), 6),
+        'threshold': CRITICAL_THRESHOLD,
+        'passed': bool(scores.min() > CRITICAL_THRESHOLD)
+    }
+
+def benchmark_names(count: int, seed: int = 0) -> List[str]:
+    """Distinct field-like names built from the training vocabulary"""
+    rng = random.Random(seed)
+    vocabulary = [field for fields in DEMOGRAPHIC_FIELDS.values() for field in fields] + NON_DEMOGRAPHIC_FIELDS
+    prefixes = ['', 'customer_', 'primary', 'src_', 'tbl_', 'ACCT_']
+    names = set()
+    while len(names) < count:
+        names.add(f"{rng.choice(prefixes)}{rng.choice(vocabulary)}{rng.choice(['', '_', ''])}{rng.randrange(1000)}")
+    return sorted(names)
+
+# ---------------------------------------------------------------------------
+# Benchmarks
+# ---------------------------------------------------------------------------
+
+def benchmark_training(epochs: int, workers: int, repeats: int, seed: int = 0) -> Dict[str, Any]:
+    """Training pairs/sec for a fresh model on the demographic training pairs"""
+    # The pair set is drawn with the global generators, so seed them for
+    # runs (and baselines) to train on the same pairs
+    random.seed(seed)
+    np.random.seed(seed)
+    with redirect_stdout(sys.stderr):
+        similar_pairs, dissimilar_pairs = generate_demographic_training_data()
+    n_pairs = len(similar_pairs) + len(dissimilar_pairs)
+    workers = workers if workers > 0 else (os.cpu_count() or 1)
+    # Parallel workers each need a shard of PARALLEL_MIN_PAIRS, so the batch grows
+    batch_size = max(TRAIN_BATCH_SIZE, PARALLEL_MIN_PAIRS * workers) if workers > 1 else TRAIN_BATCH_SIZE
+    trained: Dict[str, NeuralFieldEmbedding] = {}
+
+    def train():
+        np.random.seed(seed)
+        model = NeuralFieldEmbedding(input_dim=100, embedding_dim=32)
+        with redirect_stdout(sys.stderr):
+            model.train_on_pairs(
+                similar_pairs, dissimilar_pairs,
+                epochs=epochs,
+                learning_rate=TRAIN_LEARNING_RATE,
+                batch_size=batch_size,
+                seed=seed,
+                optimizer=TRAIN_OPTIMIZER,
+                workers=workers
+            )
+        trained['model'] = model
+
+    result = _throughput(train, n_pairs * epochs, repeats)
+    result.update({
+        'pairs': n_pairs,
+        'seed': seed,
+        'epochs': epochs,
+        'batch_size': batch_size,
+        'workers': workers,
+        'optimizer': TRAIN_OPTIMIZER,
+        'critical_pairs': critical_scores(trained['model'])
+    })
+    return result
+
+def benchmark_inference(model: NeuralFieldEmbedding, names: List[str], batch_sizes: List[int], repeats: int) -> Dict[str, Any]:
+    """encode_batch and embed_batch names/sec at each batch size"""
+    results: Dict[str, Any] = {'encode_batch': {}, 'embed_batch': {}}
+    for batch_size in batch_sizes:
+        count = min(len(names), batch_size * MAX_BATCHES)
+        batches = [names[start:start + batch_size] for start in range(0, count, batch_size)]
+        for method in ('encode_batch', 'embed_batch'):
+            call = getattr(model, method)
+            results[method][str(batch_size)] = _throughput(
+                lambda: [call(batch) for batch in batches], count, repeats
+            )
+    return results
+
+def run_benchmarks(model_path: str, epochs: int, workers: int, repeats: int,
+                   batch_sizes: List[int], n_names: int, seed: int = DEFAULT_SEED) -> Dict[str, Any]:
+    """Benchmark training and inference and collect a report"""
+    report: Dict[str, Any] = {
+        'benchmark': 'field_model',
+        'version': REPORT_VERSION,
+        'generated_at': datetime.now().isoformat(),
+        'python': sys.version.split()[0],
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'repeats': repeats,
+        'seed': seed,
+    }
+
+    model = NeuralFieldEmbedding()
+    with redirect_stdout(sys.stderr):
+        model.load_model(model_path)
+    names = benchmark_names(n_names, seed)
+    report['model'] = {
+        'path': model_path,
+        'critical_pairs': critical_scores(model),
+        'inference': benchmark_inference(model, names, batch_sizes, repeats)
+    }
+    print(f"inference: {n_names} names at batch sizes {batch_sizes}", file=sys.stderr)
+
+    report['training'] = benchmark_training(epochs, workers, repeats, seed)
+    print(f"training: {report['training']['per_second_median']} pairs/s", file=sys.stderr)
+
+    report['max_rss_bytes'] = _max_rss_bytes()
+    return report
+
+# ---------------------------------------------------------------------------
+# Comparison
+# ---------------------------------------------------------------------------
+
+def _flatten_throughputs(report: Dict[str, Any]) -> Dict[str, float]:
+    """Flatten comparable throughputs into 'phase.metric' keys"""
+    throughputs = {}
+    if 'per_second_median' in report.get('training', {}):
+        throughputs['training.pairs_per_second'] = report['training']['per_second_median']
+    for method, by_size in report.get('model', {}).get('inference', {}).items():
+        for batch_size, entry in by_size.items():
+            throughputs[f"{method}.batch_{batch_size}.names_per_second"] = entry['per_second_median']
+    return throughputs
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any], tolerance: float) -> List[Dict[str, Any]]:
+    """List throughputs slower than baseline by more than the tolerance, and critical-pair score drops"""
+    regressions = []
+    before = _flatten_throughputs(baseline)
+    after = _flatten_throughputs(current)
+    for key, old in before.items():
+        new = after.get(key)
+        if new is None or old <= 0:
+            continue
+        if new * (1 + tolerance) < old:
+            regressions.append({
+                'metric': key,
+                'baseline': old,
+                'current': new,
+                'slowdown': round(old / new, 3) if new > 0 else None
+            })
+
+    for section in ('model', 'training'):
+        old = baseline.get(section, {}).get('critical_pairs', {}).get('min')
+        new = current.get(section, {}).get('critical_pairs', {}).get('min')
+        if old is not None and new is not None and new < old - QUALITY_TOLERANCE:
+            regressions.append({'metric': f"{section}.critical_pairs.min", 'baseline': old, 'current': new})
+    return regressions
+
+def _option(argv: List[str], flag: str, default: Optional[str] = None) -> Optional[str]:
+    if flag in argv:
+        index = argv.index(flag)
+        if index + 1 < len(argv):
+            return argv[index + 1]
+    return default
+
+def main():
+    """Main entry point for CLI usage"""
+    argv = sys.argv[1:]
+    try:
+        epochs = int(_option(argv, '--epochs', str(DEFAULT_EPOCHS)))
+        workers = int(_option(argv, '--workers', '1'))
+        repeats = max(1, int(_option(argv, '--repeats', str(DEFAULT_REPEATS))))
+        n_names = int(_option(argv, '--names', str(DEFAULT_NAMES)))
+        seed = int(_option(argv, '--seed', str(DEFAULT_SEED)))
+        batch_sizes = [int(size) for size in _option(argv, '--batch-sizes', ','.join(map(str, DEFAULT_BATCH_SIZES))).split(',')]
+    except ValueError as e:
+        print(json.dumps({"error": f"Invalid option: {e}"}))
+        sys.exit(1)
+
+    report = run_benchmarks(_option(argv, '--model', DEFAULT_MODEL), epochs, workers, repeats, batch_sizes, n_names, seed)
+
+    baseline_path = _option(argv, '--compare')
+    if baseline_path:
+        with open(baseline_path, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        tolerance = float(_option(argv, '--tolerance', str(DEFAULT_TOLERANCE)))
+        report['comparison'] = {
+            'baseline': baseline_path,
+            'tolerance': tolerance,
+            'regressions': compare_reports(baseline, report, tolerance)
+        }
+
+    output = json.dumps(report, indent=2)
+    output_path = _option(argv, '--output')
+    if output_path:
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(output)
+        print(f"Report written to {output_path}", file=sys.stderr)
+    else:
+        print(output)
+
+    if baseline_path and report['comparison']['regressions']:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -61,7 +61,7 @@ def create_pretrained_model():
     print("\nSaving model...")
     model_dir = os.path.join(os.path.dirname(__file__), 'models')
     os.makedirs(model_dir, exist_ok=True)
-    model_path = os.path.join(model_dir, 'demographic_field_model.pkl')
+    model_path = os.path.join(model_dir, 'demographic_field_model.zfm')
     model.save_model(model_path)
     
     print()
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Field ANN Index - Approximate nearest neighbours over field embeddings
+Random-projection LSH for the L2-normalized NeuralFieldEmbedding vectors, so
+top-k retrieval over million-field catalogs re-ranks only the fields that
+collide with a query instead of scanning every embedding.
+
+Each of n_tables tables hashes a vector to the sign pattern of n_bits random
+hyperplane projections (angle-preserving, so nearby embeddings collide).
+Trained embeddings sit in a narrow cone, so vectors are centred on the
+catalog mean first; otherwise most of them share one bucket.
+All tables share one sorted array of (table, code) keys with the matching
+positions, so a query finds every probed bucket with a single binary search.
+Queries probe their own bucket plus the buckets within probe_radius bits,
+deduplicate the colliding positions and re-rank them exactly by cosine
+similarity; nothing per query touches the whole catalog. Everything is
+plain arrays, so indexes are saved and memory-mapped with field_cache.
+
+Usage:
+    python field_ann.py build catalog.txt              # build and persist in the cache directory
+    python field_ann.py recall catalog.txt queries.txt  # recall against exact search
+"""
+
+import sys
+import os
+import json
+import time
+import itertools
+import numpy as np
+from typing import Dict, Iterable, Iterator, List
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from field_scoring import distinct_values
+
+# Hash tables; more tables raise recall at the cost of more candidates
+ANN_TABLES = 24
+
+# Target number of fields per bucket when n_bits is derived from the catalog
+# size. Field embeddings are dense (thousands of fields within cosine 0.9 of
+# a typical name), so buckets are kept tiny and multi-probe restores recall:
+# about 0.95 recall@10 while re-ranking 2-5% of a 100k-1M field catalog.
+ANN_BUCKET_SIZE = 2
+
+# FieldANNIndex scans exactly below this many source fields. Measured against
+# the blocked exact scan (32-dim embeddings, one core): both take about
+# 0.6 ms per target at 100k fields; LSH is 1.5x faster at 200k, 2.5x at 500k
+# and 8x at 1M, and slower below 100k.
+ANN_MIN_SOURCES = 100_000
+
+# Bits flipped in the extra buckets probed per table
+ANN_PROBE_RADIUS = 1
+
+# Upper bound on n_bits so every table's keys fit in one int32 key space
+ANN_MAX_BITS = 24
+
+# Bounds of the default ANN index store (default_ann_dir); a 1M-field index
+# takes about 0.5 GB
+ANN_CACHE_MAX_ENTRIES = 4
+ANN_CACHE_MAX_BYTES = 2 * 1024 * 1024 * 1024
+
+def default_ann_dir() -> str:
+    """ANN index location when no index cache is configured (override with ZENAGENT_FIELD_ANN_DIR)"""
+    configured = os.environ.get('ZENAGENT_FIELD_ANN_DIR')
+    if configured:
+        return configured
+    return os.path.join(os.path.expanduser('~'), '.cache', 'zenagent', 'field_ann')
+
+def default_bits(n_vectors: int) -> int:
+    """Hash bits per table so buckets hold about ANN_BUCKET_SIZE vectors"""
+    return int(np.clip(np.round(np.log2(max(1, n_vectors) / ANN_BUCKET_SIZE)), 4, ANN_MAX_BITS))
+
+def _concat_ranges(starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Concatenation of the index ranges [start, end)"""
+    lengths = ends - starts
+    offsets = np.arange(int(lengths.sum())) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return np.repeat(starts, lengths) + offsets
+
+class EmbeddingLSH:
+    """Multi-probe random-projection LSH over a fixed matrix of unit vectors"""
+
+    def __init__(self, embeddings: np.ndarray, n_tables: int = ANN_TABLES, n_bits: int = None,
+                 probe_radius: int = ANN_PROBE_RADIUS, seed: int = 0):
+        """
+        Hash every embedding into every table
+
+        Args:
+            embeddings: (n, dim) L2-normalized float32 vectors
+            n_tables: Independent hash tables
+            n_bits: Hyperplanes per table (default: default_bits(n))
+            probe_radius: Bits flipped in the buckets probed besides the
+                query's own (0, 1 or 2)
+            seed: Seed for the hyperplanes
+        """
+        n_bits = n_bits or default_bits(len(embeddings))
+        if n_tables < 1 or not 1 <= n_bits <= ANN_MAX_BITS or probe_radius not in (0, 1, 2):
+            raise ValueError(
+                f"Invalid LSH shape: {n_tables} tables, {n_bits} bits (1-{ANN_MAX_BITS}), probe radius {probe_radius} (0-2)"
+            )
+        if (n_tables << n_bits) > np.iinfo(np.int32).max:
+            raise ValueError(f"{n_tables} tables of {n_bits} bits exceed the int32 key space")
+        rng = np.random.default_rng(seed)
+        planes = rng.standard_normal((embeddings.shape[1], n_tables * n_bits)).astype(np.float32)
+        center = np.asarray(embeddings, dtype=np.float32).mean(axis=0)
+        self._set(embeddings, planes, center, n_tables, n_bits, probe_radius)
+
+        # Each table's codes are offset into a disjoint key range, so the
+        # per-table sorted runs concatenate into one sorted key array
+        codes = self.hash(embeddings) + self._table_offsets
+        order = np.argsort(codes, axis=0, kind='stable')
+        self.keys = np.take_along_axis(codes, order, axis=0).T.ravel()
+        self.positions = order.T.astype(np.int32).ravel()
+
+    def _set(self, embeddings: np.ndarray, planes: np.ndarray, center: np.ndarray,
+             n_tables: int, n_bits: int, probe_radius: int):
+        self.embeddings = embeddings
+        self.planes = planes
+        self.center = center
+        self.n_tables = n_tables
+        self.n_bits = n_bits
+        self.probe_radius = probe_radius
+        self._bit_values = (1 << np.arange(n_bits, dtype=np.int32)).astype(np.int32)
+        self._table_offsets = (np.arange(n_tables, dtype=np.int32) << n_bits).astype(np.int32)
+        masks = [0]
+        if probe_radius >= 1:
+            masks += [1 << i for i in range(n_bits)]
+        if probe_radius >= 2:
+            masks += [(1 << i) | (1 << j) for i, j in itertools.combinations(range(n_bits), 2)]
+        self._probe_masks = np.array(masks, dtype=np.int32)
+
+    def hash(self, vectors: np.ndarray) -> np.ndarray:
+        """(n, n_tables) int32 bucket codes"""
+        signs = ((np.asarray(vectors, dtype=np.float32) - self.center) @ self.planes) > 0
+        return signs.reshape(len(signs), self.n_tables, self.n_bits).astype(np.int32) @ self._bit_values
+
+    def to_arrays(self, prefix: str = 'ann') -> Dict[str, np.ndarray]:
+        """Tables as arrays (the embeddings are stored by the owner)"""
+        return {
+            f"{prefix}_planes": self.planes,
+            f"{prefix}_center": self.center,
+            f"{prefix}_keys": self.keys,
+            f"{prefix}_positions": self.positions,
+            f"{prefix}_shape": np.array([self.n_tables, self.n_bits, self.probe_radius], dtype=np.int64),
+        }
+
+    @classmethod
+    def from_arrays(cls, embeddings: np.ndarray, arrays: Dict[str, np.ndarray], prefix: str = 'ann') -> 'EmbeddingLSH':
+        """Restore to_arrays output without rehashing; arrays may be memory-mapped"""
+        index = cls.__new__(cls)
+        n_tables, n_bits, probe_radius = (int(value) for value in arrays[f"{prefix}_shape"])
+        index._set(
+            embeddings, np.asarray(arrays[f"{prefix}_planes"]), np.asarray(arrays[f"{prefix}_center"]),
+            n_tables, n_bits, probe_radius
+        )
+        index.keys = arrays[f"{prefix}_keys"]
+        index.positions = arrays[f"{prefix}_positions"]
+        return index
+
+    def candidates(self, queries: np.ndarray) -> Iterator[np.ndarray]:
+        """
+        Distinct positions sharing a probed bucket with each query, in position order
+
+        Every table is probed at once: one binary search over the sorted
+        keys for all probe codes, then the colliding positions are
+        deduplicated, so the cost follows the candidates, not the catalog.
+        """
+        for codes in self.hash(queries):
+            probe_keys = ((codes + self._table_offsets)[:, None] ^ self._probe_masks[None, :]).ravel()
+            starts = np.searchsorted(self.keys, probe_keys, side='left')
+            ends = np.searchsorted(self.keys, probe_keys, side='right')
+            yield distinct_values(np.asarray(self.positions)[_concat_ranges(starts, ends)])
+
+    def search(self, queries: np.ndarray, k: int, excluded: Iterable[int] = ()) -> List[List[int]]:
+        """
+        Approximate top-k positions per query, by descending cosine similarity
+
+        Candidates are re-ranked exactly; ties go to the earliest positions.
+        """
+        queries = np.asarray(queries, dtype=np.float32)
+        excluded = np.fromiter(excluded, dtype=np.int64)
+        embeddings = np.asarray(self.embeddings)
+        results = []
+        for query, found in zip(queries, self.candidates(queries)):
+            if len(excluded):
+                found = found[~np.isin(found, excluded)]
+            scores = embeddings[found] @ query
+            if len(found) > k:
+                # Keep everything above the k-th score plus the earliest ties
+                kth = -np.partition(-scores, k - 1)[k - 1]
+                keep = scores > kth
+                keep[np.flatnonzero(scores == kth)[:k - int(keep.sum())]] = True
+                found, scores = found[keep], scores[keep]
+            results.append(found[np.lexsort((found, -scores))].tolist())
+        return results
+
+def _read_fields(path: str) -> List[str]:
+    """One field name per line"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip()]
+
+def main():
+    """Build a persisted ANN index for a catalog, or report its recall"""
+    from field_matcher_ml import FieldMatcherML
+
+    args = sys.argv[1:]
+    if len(args) < 2 or args[0] not in ('build', 'recall'):
+        print(json.dumps({"success": False, "error": "Usage: field_ann.py build <catalog.txt> | recall <catalog.txt> <queries.txt>"}))
+        sys.exit(1)
+
+    try:
+        matcher = FieldMatcherML()
+        catalog = _read_fields(args[1])
+        started = time.perf_counter()
+        index = matcher.build_index(catalog, 'ann')
+        result = {"success": True, "sourceFields": len(catalog), "seconds": time.perf_counter() - started}
+        if args[0] == 'recall':
+            queries = _read_fields(args[2]) if len(args) > 2 else catalog[:200]
+            result["report"] = index.recall_report(queries)
+        print(json.dumps(result, indent=2))
+    except Exception as e:
+        print(json.dumps({"success": False, "error": str(e)}))
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
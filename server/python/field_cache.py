@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Field Index Cache - Persistent cache of codebase-side matching indexes
+Stores the field profiles, token matrices, blocking postings and embeddings
+built for a codebase field list, keyed by a hash of that list, so repeat
+matches against the same project skip the index-building phase.
+
+Each entry is a directory of .npy arrays (strings as one UTF-8 text blob
+plus an offsets table) loaded with mmap, and a meta.json. Entries are
+evicted least recently used beyond max_entries or max_bytes in total.
+
+Loading still decodes profiles and postings into Python objects, so a hit
+saves only part of the build time and a miss pays for the extra write; the
+cache therefore pays off for large catalogs matched repeatedly and is off
+unless requested (see FieldIndexCache.from_environment).
+"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+import numpy as np
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+CACHE_VERSION = 1
+
+DEFAULT_MAX_ENTRIES = 16
+
+# Total size of all entries before the least recently used are evicted
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+def default_cache_dir() -> str:
+    """Cache location (override with ZENAGENT_FIELD_CACHE_DIR)"""
+    configured = os.environ.get('ZENAGENT_FIELD_CACHE_DIR')
+    if configured:
+        return configured
+    return os.path.join(os.path.expanduser('~'), '.cache', 'zenagent', 'field_index')
+
+def encode_strings(values: Iterable[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """List of strings as (UTF-8 blob, int64 character offsets with a leading 0)"""
+    values = list(values)
+    offsets = np.zeros(len(values) + 1, dtype=np.int64)
+    if values:
+        offsets[1:] = np.cumsum([len(value) for value in values])
+    blob = np.frombuffer(''.join(values).encode('utf-8'), dtype=np.uint8)
+    return blob, offsets
+
+def decode_strings(blob: np.ndarray, offsets: np.ndarray) -> List[str]:
+    """Inverse of encode_strings"""
+    text = np.asarray(blob).tobytes().decode('utf-8')
+    bounds = np.asarray(offsets).tolist()
+    return [text[bounds[i]:bounds[i + 1]] for i in range(len(bounds) - 1)]
+
+def encode_postings(postings: Dict[Any, List[int]], prefix: str, key_encoder: Callable[[Any], str] = str) -> Dict[str, np.ndarray]:
+    """Inverted index as key strings plus a CSR (indptr, indices) of positions"""
+    keys = list(postings)
+    blob, offsets = encode_strings(key_encoder(key) for key in keys)
+    indptr = np.zeros(len(keys) + 1, dtype=np.int64)
+    if keys:
+        indptr[1:] = np.cumsum([len(postings[key]) for key in keys])
+    indices = np.fromiter(
+        (position for key in keys for position in postings[key]),
+        dtype=np.int64, count=int(indptr[-1])
+    )
+    return {
+        f"{prefix}_keys": blob,
+        f"{prefix}_key_offsets": offsets,
+        f"{prefix}_indptr": indptr,
+        f"{prefix}_indices": indices,
+    }
+
+def decode_postings(arrays: Dict[str, np.ndarray], prefix: str, key_decoder: Callable[[str], Any] = str) -> Dict[Any, List[int]]:
+    """Inverse of encode_postings"""
+    keys = decode_strings(arrays[f"{prefix}_keys"], arrays[f"{prefix}_key_offsets"])
+    indptr = np.asarray(arrays[f"{prefix}_indptr"]).tolist()
+    indices = np.asarray(arrays[f"{prefix}_indices"]).tolist()
+    return {key_decoder(key): indices[indptr[i]:indptr[i + 1]] for i, key in enumerate(keys)}
+
+def encode_profiles(profiles: List) -> Dict[str, np.ndarray]:
+    """The regex-derived parts of field profiles (the rest is cheap to recompute)"""
+    processed_blob, processed_offsets = encode_strings(profile.processed for profile in profiles)
+    acronym_blob, acronym_offsets = encode_strings(profile.acronym or '' for profile in profiles)
+
+    vocabulary: Dict[str, int] = {}
+    token_indptr = np.zeros(len(profiles) + 1, dtype=np.int64)
+    token_indices: List[int] = []
+    for i, profile in enumerate(profiles):
+        for token in profile.tokens:
+            token_indices.append(vocabulary.setdefault(token, len(vocabulary)))
+        token_indptr[i + 1] = len(token_indices)
+    vocabulary_blob, vocabulary_offsets = encode_strings(vocabulary)
+
+    return {
+        'profile_processed': processed_blob,
+        'profile_processed_offsets': processed_offsets,
+        'profile_acronyms': acronym_blob,
+        'profile_acronym_offsets': acronym_offsets,
+        'profile_has_acronym': np.array([profile.acronym is not None for profile in profiles], dtype=bool),
+        'profile_vocabulary': vocabulary_blob,
+        'profile_vocabulary_offsets': vocabulary_offsets,
+        'profile_token_indptr': token_indptr,
+        'profile_token_indices': np.array(token_indices, dtype=np.int64),
+    }
+
+def decode_profiles(matcher, source_fields: List[str], arrays: Dict[str, np.ndarray]) -> List:
+    """Restore field profiles into the matcher's profile cache"""
+    processed = decode_strings(arrays['profile_processed'], arrays['profile_processed_offsets'])
+    acronyms = decode_strings(arrays['profile_acronyms'], arrays['profile_acronym_offsets'])
+    has_acronym = np.asarray(arrays['profile_has_acronym']).tolist()
+    vocabulary = decode_strings(arrays['profile_vocabulary'], arrays['profile_vocabulary_offsets'])
+    indptr = np.asarray(arrays['profile_token_indptr']).tolist()
+    indices = np.asarray(arrays['profile_token_indices']).tolist()
+
+    return [
+        matcher.restore_profile(
+            field,
+            processed[i],
+            [vocabulary[token] for token in indices[indptr[i]:indptr[i + 1]]],
+            acronyms[i] if has_acronym[i] else None
+        )
+        for i, field in enumerate(source_fields)
+    ]
+
+def save_arrays(directory: str, arrays: Dict[str, np.ndarray], meta: Dict[str, Any] = None):
+    """Write arrays as .npy files plus meta.json into a new directory, atomically"""
+    parent = os.path.dirname(os.path.abspath(directory))
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix='.tmp-', dir=parent)
+    try:
+        for name, array in arrays.items():
+            np.save(os.path.join(tmp_dir, f"{name}.npy"), np.ascontiguousarray(array), allow_pickle=False)
+        with open(os.path.join(tmp_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump({
+                **(meta or {}),
+                'version': CACHE_VERSION,
+                'created_at': time.time(),
+                'bytes': int(sum(np.asarray(array).nbytes for array in arrays.values())),
+                'arrays': sorted(arrays)
+            }, f)
+        if os.path.isdir(directory):
+            shutil.rmtree(directory, ignore_errors=True)
+        os.rename(tmp_dir, directory)
+    except OSError:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+def load_arrays(directory: str) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+    """Memory-map the arrays written by save_arrays; returns (arrays, meta)"""
+    with open(os.path.join(directory, 'meta.json'), 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+    if meta.get('version') != CACHE_VERSION:
+        raise ValueError(f"Unsupported field index version: {meta.get('version')}")
+    arrays = {
+        name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode='r', allow_pickle=False)
+        for name in meta['arrays']
+    }
+    return arrays, meta
+
+class FieldIndexCache:
+    """
+    On-disk LRU cache of matching indexes keyed by codebase field list
+
+    Index classes provide to_arrays() and from_arrays(matcher, fields,
+    arrays); the cache only stores and memory-maps their arrays.
+    """
+
+    def __init__(self, cache_dir: str = None, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Args:
+            cache_dir: Directory holding one subdirectory per entry
+            max_entries: Entries kept before the least recently used is evicted
+            max_bytes: Total entry size kept before the least recently used
+                are evicted; larger indexes are not stored at all
+        """
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_entries = max(1, max_entries)
+        self.max_bytes = max_bytes
+
+    @classmethod
+    def from_environment(cls, enabled: bool = False) -> Optional['FieldIndexCache']:
+        """
+        Opt-in cache: enabled by the caller (e.g. a --index-cache flag) or by
+        setting ZENAGENT_FIELD_CACHE_DIR; None otherwise or when that is "off".
+        ZENAGENT_FIELD_CACHE_MAX_ENTRIES and ZENAGENT_FIELD_CACHE_MAX_BYTES
+        bound its size.
+        """
+        configured = os.environ.get('ZENAGENT_FIELD_CACHE_DIR', '')
+        if configured.lower() == 'off' or not (enabled or configured):
+            return None
+        max_entries = int(os.environ.get('ZENAGENT_FIELD_CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES))
+        max_bytes = int(os.environ.get('ZENAGENT_FIELD_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES))
+        return cls(default_cache_dir(), max_entries, max_bytes)
+
+    @staticmethod
+    def key(strategy: str, source_fields: List[str], fingerprint: str = '') -> str:
+        """Entry key: hash of the cache version, strategy, model fingerprint and field list"""
+        digest = hashlib.sha256(f"{CACHE_VERSION}\0{strategy}\0{fingerprint}\0".encode('utf-8'))
+        digest.update(json.dumps(source_fields, ensure_ascii=False).encode('utf-8'))
+        return digest.hexdigest()
+
+    def _entry_dir(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    def load(self, key: str, restore: Callable[[Dict[str, np.ndarray]], Any]) -> Optional[Any]:
+        """Restore a cached index with its arrays memory-mapped, or None on a miss"""
+        entry_dir = self._entry_dir(key)
+        try:
+            arrays, _ = load_arrays(entry_dir)
+            index = restore(arrays)
+        except (OSError, ValueError, KeyError):
+            return None
+
+        # Access time drives LRU eviction
+        try:
+            os.utime(entry_dir)
+        except OSError:
+            pass
+        return index
+
+    def store(self, key: str, arrays: Dict[str, np.ndarray], strategy: str = ''):
+        """Write an entry atomically, then evict least recently used entries"""
+        if sum(np.asarray(array).nbytes for array in arrays.values()) > self.max_bytes:
+            return
+        try:
+            save_arrays(self._entry_dir(key), arrays, {'strategy': strategy})
+        except OSError:
+            return
+        self.evict()
+
+    @staticmethod
+    def _entry_bytes(entry: str) -> int:
+        """Stored size of an entry (from meta.json, else its files)"""
+        try:
+            with open(os.path.join(entry, 'meta.json'), 'r', encoding='utf-8') as f:
+                return int(json.load(f)['bytes'])
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        try:
+            return sum(item.stat().st_size for item in os.scandir(entry) if item.is_file())
+        except OSError:
+            return 0
+
+    def evict(self):
+        """Remove the least recently used entries beyond max_entries or max_bytes"""
+        try:
+            entries = [
+                os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir)
+                if not name.startswith('.tmp-')
+            ]
+        except OSError:
+            return
+        entries = [entry for entry in entries if os.path.isdir(entry)]
+        entries.sort(key=lambda entry: os.path.getmtime(entry), reverse=True)
+        total_bytes = 0
+        for rank, entry in enumerate(entries):
+            total_bytes += self._entry_bytes(entry)
+            if rank >= self.max_entries or total_bytes > self.max_bytes:
+                shutil.rmtree(entry, ignore_errors=True)
+
+    def get_or_build(self, key: str, build: Callable[[], Any], restore: Callable[[Dict[str, np.ndarray]], Any], strategy: str = '') -> Any:
+        """Cached index for key, building and storing it on a miss"""
+        index = self.load(key, restore)
+        if index is None:
+            index = build()
+            self.store(key, index.to_arrays(), strategy)
+        return index
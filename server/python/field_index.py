@@ -0,0 +1,741 @@
+#!/usr/bin/env python3
+"""
+Field Blocking Index - Candidate generation for field matching
+Inverted index over source field names so each target field is scored only
+against sources that share a blocking key with it instead of every source.
+
+Exact keys (normalized tokens, preprocessed name, full name, demographic
+category, acronym) cover every way FieldMatcherML.calculate_similarity can
+reach a score of 0.6 or more, so blocking is lossless at those thresholds.
+Character trigram keys widen the candidates for lower thresholds, where
+blocking is approximate; recall_report measures it against brute force.
+
+FieldEmbeddingIndex retrieves candidates with the trained
+NeuralFieldEmbedding model instead: nearest neighbours by cosine similarity.
+FieldANNIndex answers the same queries from LSH tables (field_ann) so
+catalogs of millions of fields are not scanned in full per target.
+FieldMatrixIndex holds the source-side matrices for scoring every pair in
+bulk. FieldIndex keeps blocking keys and embeddings live across calls,
+with in-place add/remove and snapshots.
+"""
+
+import time
+import numpy as np
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from field_scoring import (
+    build_token_vocabulary, token_incidence_matrix, incidence_from_csr,
+    token_jaccard_matrix, edit_similarity_matrix, combine_scores, distinct_values
+)
+from field_cache import (
+    encode_strings, decode_strings, encode_postings, decode_postings,
+    encode_profiles, decode_profiles, save_arrays, load_arrays
+)
+from field_ann import EmbeddingLSH, ANN_MIN_SOURCES
+
+# Thresholds at or above this are guaranteed to lose no matches: without a
+# shared token the score is at most 0.6 * edit similarity, which only reaches
+# 0.6 for identical preprocessed names (also a key)
+BLOCKING_LOSSLESS_THRESHOLD = 0.6
+
+# A target whose keys cover more than this share of the sources is scored
+# against every source instead. Common name tokens ("id", "customer",
+# "date") have postings spanning much of a catalog, so enumerating and
+# deduplicating them costs more than one full vectorized row
+BLOCKING_MAX_CANDIDATE_FRACTION = 0.1
+
+# Neighbours retrieved per target by FieldEmbeddingIndex before re-ranking
+EMBEDDING_TOP_K = 50
+
+# FieldIndex rebuilds its postings once removed fields outnumber live ones
+COMPACT_REMOVED_RATIO = 0.5
+
+BlockingKey = Tuple[str, str]
+
+def _encode_key(key: BlockingKey) -> str:
+    return f"{key[0]}\x1f{key[1]}"
+
+def _decode_key(text: str) -> BlockingKey:
+    kind, value = text.split('\x1f', 1)
+    return kind, value
+
+def rule_keys(profile) -> Set[BlockingKey]:
+    """Keys of a source under which the exact, lookup-table and acronym rules can fire"""
+    keys = {('exact', profile.lower)}
+    keys.update(('category', category) for category in profile.categories)
+    if profile.acronym is not None:
+        keys.add(('acronym', profile.acronym))
+    if len(profile.short) >= 2:
+        keys.add(('short', profile.short))
+    return keys
+
+def rule_query_keys(profile) -> Set[BlockingKey]:
+    """Keys a target looks up to find rule_keys matches (acronym keys mirrored)"""
+    keys = {('exact', profile.lower)}
+    keys.update(('category', category) for category in profile.categories)
+    # Target is the short form of a source's acronym, or vice versa
+    if len(profile.short) >= 2:
+        keys.add(('acronym', profile.short))
+    if profile.acronym is not None:
+        keys.add(('short', profile.acronym))
+    return keys
+
+class FieldBlockingIndex:
+    """
+    Inverted index from blocking keys to source field positions
+
+    Built once over source_fields; candidates() returns source positions in
+    source order, so ties keep the same ranking as brute-force scoring.
+    score_candidates() scores a target against them in one vectorized pass
+    (edit similarities from field_scoring, token overlaps counted from the
+    token postings). add() appends fields in place; remove() marks
+    positions as removed.
+    """
+
+    def __init__(self, matcher, source_fields: List[str]):
+        """
+        Build the index
+
+        Args:
+            matcher: FieldMatcherML whose normalization rules define the keys
+            source_fields: Available fields in codebase
+        """
+        self.matcher = matcher
+        self.source_fields = list(source_fields)
+        self.profiles = [matcher.field_profile(field) for field in self.source_fields]
+        self.postings: Dict[BlockingKey, List[int]] = defaultdict(list)
+        self.trigram_postings: Dict[str, List[int]] = defaultdict(list)
+        self.removed: Set[int] = set()
+
+        for position, profile in enumerate(self.profiles):
+            self._post(position, profile)
+        self._reset_arrays()
+
+    def _reset_arrays(self):
+        """(Re)derive the scoring arrays and drop cached posting arrays"""
+        self.processed = [profile.processed for profile in self.profiles]
+        self.token_sizes = np.array([len(profile.tokens) for profile in self.profiles], dtype=np.int64)
+        self._posting_arrays: Dict[Any, np.ndarray] = {}
+        self._removed_array = np.array(sorted(self.removed), dtype=np.int64)
+
+    def _posting_array(self, postings: Dict, key) -> np.ndarray:
+        """Posting list as a cached int64 array"""
+        array = self._posting_arrays.get(key)
+        if array is None:
+            array = self._posting_arrays[key] = np.array(postings.get(key, ()), dtype=np.int64)
+        return array
+
+    def _post(self, position: int, profile):
+        """Add a source position under all of its keys"""
+        for key in rule_keys(profile) | self._shared_keys(profile):
+            self.postings.setdefault(key, []).append(position)
+        for trigram in self._trigrams(profile.processed):
+            self.trigram_postings.setdefault(trigram, []).append(position)
+
+    def add(self, fields: List[str]) -> List[int]:
+        """Index new source fields after the existing ones; returns their positions"""
+        positions = []
+        for field in fields:
+            position = len(self.source_fields)
+            profile = self.matcher.field_profile(field)
+            self.source_fields.append(field)
+            self.profiles.append(profile)
+            self._post(position, profile)
+            positions.append(position)
+        self._reset_arrays()
+        return positions
+
+    def remove(self, positions: Iterable[int]):
+        """Exclude source positions from candidates (postings are left in place)"""
+        self.removed.update(positions)
+        self._removed_array = np.array(sorted(self.removed), dtype=np.int64)
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """Index contents as arrays for FieldIndexCache"""
+        arrays = encode_profiles(self.profiles)
+        arrays.update(encode_postings(self.postings, 'postings', _encode_key))
+        arrays.update(encode_postings(self.trigram_postings, 'trigrams'))
+        arrays['removed'] = np.array(sorted(self.removed), dtype=np.int64)
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, matcher, source_fields: List[str], arrays: Dict[str, np.ndarray]) -> 'FieldBlockingIndex':
+        """Rebuild an index from to_arrays output without recomputing it"""
+        index = cls.__new__(cls)
+        index.matcher = matcher
+        index.source_fields = list(source_fields)
+        index.profiles = decode_profiles(matcher, index.source_fields, arrays)
+        index.postings = decode_postings(arrays, 'postings', _decode_key)
+        index.trigram_postings = decode_postings(arrays, 'trigrams')
+        index.removed = set(np.asarray(arrays['removed']).tolist())
+        index._reset_arrays()
+        return index
+
+    @staticmethod
+    def _trigrams(processed: str) -> Set[str]:
+        """Character trigrams of a preprocessed name, padded so short names have keys"""
+        padded = f" {processed} "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    @staticmethod
+    def _shared_keys(profile) -> Set[BlockingKey]:
+        """Keys for the weighted score: preprocessed name and similarity tokens"""
+        keys = {('processed', profile.processed)}
+        keys.update(('token', token) for token in profile.tokens)
+        return keys
+
+    def candidates(self, target: str, threshold: float = BLOCKING_LOSSLESS_THRESHOLD) -> List[int]:
+        """
+        Source positions worth scoring for a target, in source order
+
+        Trigram keys are only consulted below BLOCKING_LOSSLESS_THRESHOLD,
+        where a pair may score without sharing a token.
+        """
+        positions = self.candidate_array(self.matcher.field_profile(target), threshold)
+        if positions is None:
+            return [position for position in range(len(self.source_fields)) if position not in self.removed]
+        return positions.tolist()
+
+    def candidate_array(self, profile, threshold: float = BLOCKING_LOSSLESS_THRESHOLD) -> Optional[np.ndarray]:
+        """
+        Sorted array of candidates() for a profile, or None to score every live source
+
+        None is returned once the keys' postings cover more than
+        BLOCKING_MAX_CANDIDATE_FRACTION of the sources (see score_block).
+        """
+        found = [self._posting_array(self.postings, key) for key in rule_query_keys(profile) | self._shared_keys(profile)]
+        if threshold < BLOCKING_LOSSLESS_THRESHOLD:
+            found.extend(
+                self._posting_array(self.trigram_postings, trigram) for trigram in self._trigrams(profile.processed)
+            )
+        if sum(len(positions) for positions in found) > BLOCKING_MAX_CANDIDATE_FRACTION * len(self.source_fields):
+            return None
+        positions = distinct_values(np.concatenate(found))
+        if len(self._removed_array):
+            positions = positions[~np.isin(positions, self._removed_array)]
+        return positions
+
+    def rule_positions(self, profile, positions: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Where an exact, lookup-table or acronym rule may apply: indices into
+        positions, or live source positions when positions is None
+        """
+        found = distinct_values(np.concatenate([self._posting_array(self.postings, key) for key in rule_query_keys(profile)]))
+        if positions is not None:
+            return np.flatnonzero(np.isin(positions, found))
+        if len(self._removed_array):
+            found = found[~np.isin(found, self._removed_array)]
+        return found
+
+    def _shared_tokens(self, profile) -> np.ndarray:
+        """Source positions of every target token, once per shared token"""
+        if not profile.tokens:
+            return np.zeros(0, dtype=np.int64)
+        return np.concatenate([self._posting_array(self.postings, ('token', token)) for token in profile.tokens])
+
+    def _token_overlap(self, profile, shared: np.ndarray, source_sizes: np.ndarray) -> np.ndarray:
+        """Jaccard overlaps from shared-token counts, as in FieldMatcherML.score_profiles"""
+        union = len(profile.tokens) + source_sizes - shared
+        token_overlap = np.zeros(len(source_sizes), dtype=np.float64)
+        both = (source_sizes > 0) & (len(profile.tokens) > 0)
+        token_overlap[both] = shared[both] / union[both]
+        return token_overlap
+
+    def score_candidates(self, profile, positions: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Edit similarities and weighted scores of one target against the sources at positions
+
+        Token intersections are counted from the target tokens' postings, so
+        no token matrix is kept. Rule-based scores are not applied here; see
+        rule_positions.
+        """
+        lev_similarity = edit_similarity_matrix([profile.processed], [self.processed[p] for p in positions.tolist()])[0]
+        shared = np.zeros(len(positions), dtype=np.int64)
+        hits = self._shared_tokens(profile)
+        if len(hits) and len(positions):
+            slots = np.minimum(np.searchsorted(positions, hits), len(positions) - 1)
+            shared = np.bincount(slots[positions[slots] == hits], minlength=len(positions))
+        token_overlap = self._token_overlap(profile, shared, self.token_sizes[positions])
+        return lev_similarity, combine_scores(lev_similarity, token_overlap)
+
+    def score_block(self, profiles: List) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        score_candidates for a block of targets against every source
+
+        Removed sources score -inf. Rule-based scores are not applied here.
+        """
+        lev_similarity = edit_similarity_matrix([profile.processed for profile in profiles], self.processed)
+        scores = np.empty(lev_similarity.shape, dtype=np.float64)
+        for row, profile in enumerate(profiles):
+            shared = np.bincount(self._shared_tokens(profile), minlength=len(self.source_fields))
+            scores[row] = combine_scores(lev_similarity[row], self._token_overlap(profile, shared, self.token_sizes))
+        if len(self._removed_array):
+            scores[:, self._removed_array] = -np.inf
+        return lev_similarity, scores
+
+    def recall_report(self, target_fields: List[str], threshold: float = BLOCKING_LOSSLESS_THRESHOLD) -> Dict[str, Any]:
+        """
+        Compare blocked candidates with brute-force scoring of every pair
+
+        Returns:
+            Pair counts, recall of pairs scoring >= threshold and the share
+            of pairs the index asks to score
+        """
+        scored_pairs = 0
+        matching_pairs = 0
+        recalled_pairs = 0
+
+        live_positions = [position for position in range(len(self.profiles)) if position not in self.removed]
+        for target in target_fields:
+            candidates = set(self.candidates(target, threshold))
+            scored_pairs += len(candidates)
+            target_profile = self.matcher.field_profile(target)
+            for position in live_positions:
+                if self.matcher.score_profiles(target_profile, self.profiles[position]) >= threshold:
+                    matching_pairs += 1
+                    if position in candidates:
+                        recalled_pairs += 1
+
+        total_pairs = len(target_fields) * len(live_positions)
+        return {
+            "threshold": threshold,
+            "targetFields": len(target_fields),
+            "sourceFields": len(live_positions),
+            "bruteForcePairs": total_pairs,
+            "candidatePairs": scored_pairs,
+            "candidateRatio": scored_pairs / total_pairs if total_pairs else 0.0,
+            "matchingPairs": matching_pairs,
+            "recalledPairs": recalled_pairs,
+            "recall": recalled_pairs / matching_pairs if matching_pairs else 1.0,
+            "lossless": threshold >= BLOCKING_LOSSLESS_THRESHOLD
+        }
+
+class FieldEmbeddingIndex:
+    """
+    Nearest-neighbour candidates from NeuralFieldEmbedding embeddings
+
+    All source fields are embedded once, in a single batched forward pass,
+    into a float32 matrix. A block of targets is then matched with one matrix
+    multiply and argpartition. Retrieval is approximate: the string scorer
+    only re-ranks the top_k neighbours of each target. add() embeds only the
+    new fields into spare rows; remove() masks positions out.
+    """
+
+    def __init__(self, matcher, source_fields: List[str], top_k: int = EMBEDDING_TOP_K):
+        """
+        Embed the source fields
+
+        Args:
+            matcher: FieldMatcherML with a loaded neural model
+            source_fields: Available fields in codebase
+            top_k: Neighbours retrieved per target
+        """
+        if not matcher.model_loaded:
+            raise ValueError("Embedding retrieval requires the trained field model")
+        self.matcher = matcher
+        self.top_k = top_k
+        self.source_fields = list(source_fields)
+        self.profiles = [matcher.field_profile(field) for field in self.source_fields]
+        self.embeddings = matcher.neural_model.embed_batch(self.source_fields)
+        self.removed: Set[int] = set()
+        self._capacity_rows = None
+
+    def add(self, fields: List[str]) -> List[int]:
+        """Embed and index new source fields; returns their positions"""
+        start = len(self.source_fields)
+        new_embeddings = self.matcher.neural_model.embed_batch(list(fields))
+        end = start + len(new_embeddings)
+
+        # Grow geometrically so repeated small adds stay amortized O(added)
+        if self._capacity_rows is None or end > len(self._capacity_rows):
+            capacity = max(end, 2 * len(self.source_fields), 16)
+            rows = np.zeros((capacity, new_embeddings.shape[1]), dtype=np.float32)
+            rows[:start] = self.embeddings
+            self._capacity_rows = rows
+        self._capacity_rows[start:end] = new_embeddings
+        self.embeddings = self._capacity_rows[:end]
+
+        for field in fields:
+            self.source_fields.append(field)
+            self.profiles.append(self.matcher.field_profile(field))
+        return list(range(start, end))
+
+    def remove(self, positions: Iterable[int]):
+        """Exclude source positions from candidates"""
+        self.removed.update(positions)
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """Index contents as arrays for FieldIndexCache"""
+        arrays = encode_profiles(self.profiles)
+        arrays['embeddings'] = self.embeddings
+        arrays['top_k'] = np.array([self.top_k], dtype=np.int64)
+        arrays['removed'] = np.array(sorted(self.removed), dtype=np.int64)
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, matcher, source_fields: List[str], arrays: Dict[str, np.ndarray], profiles: List = None) -> 'FieldEmbeddingIndex':
+        """Rebuild an index from to_arrays output; embeddings stay memory-mapped"""
+        return cls.from_parts(
+            matcher,
+            source_fields,
+            profiles if profiles is not None else decode_profiles(matcher, list(source_fields), arrays),
+            arrays['embeddings'],
+            int(arrays['top_k'][0]),
+            np.asarray(arrays['removed']).tolist()
+        )
+
+    @classmethod
+    def from_parts(cls, matcher, source_fields: List[str], profiles: List, embeddings: np.ndarray,
+                   top_k: int = EMBEDDING_TOP_K, removed: Iterable[int] = ()) -> 'FieldEmbeddingIndex':
+        """Index over already-computed profiles and embeddings (no forward pass)"""
+        index = cls.__new__(cls)
+        index.matcher = matcher
+        index.top_k = top_k
+        index.source_fields = list(source_fields)
+        index.profiles = list(profiles)
+        index.embeddings = embeddings
+        index.removed = set(removed)
+        index._capacity_rows = None
+        return index
+
+    def candidates_batch(self, target_fields: List[str]) -> List[List[int]]:
+        """Top-k source positions for each target, in source order"""
+        n_sources = len(self.source_fields)
+        if n_sources - len(self.removed) <= self.top_k:
+            live = [position for position in range(n_sources) if position not in self.removed]
+            return [live for _ in target_fields]
+
+        # Embeddings are L2-normalized, so the dot product is the cosine
+        similarities = self.matcher.neural_model.embed_batch(target_fields) @ self.embeddings.T
+        if self.removed:
+            similarities[:, sorted(self.removed)] = -np.inf
+        # k-th largest similarity per row; ties at the boundary go to the
+        # earliest positions so retrieval does not depend on partition order
+        kth = -np.partition(-similarities, self.top_k - 1, axis=1)[:, self.top_k - 1]
+        candidates = []
+        for row, boundary in zip(similarities, kth):
+            above = np.flatnonzero(row > boundary)
+            tied = np.flatnonzero(row == boundary)[:self.top_k - len(above)]
+            candidates.append(np.union1d(above, tied).tolist())
+        return candidates
+
+    def candidates(self, target: str) -> List[int]:
+        """Top-k source positions for one target, in source order"""
+        return self.candidates_batch([target])[0]
+
+    @property
+    def block_columns(self) -> int:
+        """Similarity cells per target in candidates_batch (bounds the block size)"""
+        return len(self.source_fields)
+
+class FieldANNIndex(FieldEmbeddingIndex):
+    """
+    FieldEmbeddingIndex with approximate nearest-neighbour retrieval
+
+    From ANN_MIN_SOURCES source fields on, targets are looked up in
+    EmbeddingLSH tables and only the colliding sources are re-ranked by
+    cosine similarity, so query time depends on bucket sizes rather than
+    catalog size. Smaller catalogs are scanned exactly. add() rehashes the
+    tables; remove() masks positions out as before.
+    """
+
+    def __init__(self, matcher, source_fields: List[str], top_k: int = EMBEDDING_TOP_K):
+        """
+        Embed the source fields and hash them into the LSH tables
+
+        Args:
+            matcher: FieldMatcherML with a loaded neural model
+            source_fields: Available fields in codebase
+            top_k: Neighbours retrieved per target
+        """
+        super().__init__(matcher, source_fields, top_k)
+        self.lsh = self._build_lsh()
+
+    def _build_lsh(self):
+        if len(self.source_fields) < ANN_MIN_SOURCES:
+            return None
+        return EmbeddingLSH(self.embeddings)
+
+    def add(self, fields: List[str]) -> List[int]:
+        """Embed and index new source fields; returns their positions"""
+        positions = super().add(fields)
+        self.lsh = self._build_lsh()
+        return positions
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """Index contents, including the LSH tables, as arrays for FieldIndexCache"""
+        arrays = super().to_arrays()
+        if self.lsh is not None:
+            arrays.update(self.lsh.to_arrays())
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, matcher, source_fields: List[str], arrays: Dict[str, np.ndarray], profiles: List = None) -> 'FieldANNIndex':
+        """Rebuild an index from to_arrays output; embeddings and tables stay memory-mapped"""
+        return cls.from_parts(
+            matcher,
+            source_fields,
+            profiles if profiles is not None else decode_profiles(matcher, list(source_fields), arrays),
+            arrays['embeddings'],
+            int(arrays['top_k'][0]),
+            np.asarray(arrays['removed']).tolist(),
+            EmbeddingLSH.from_arrays(arrays['embeddings'], arrays) if 'ann_shape' in arrays else None
+        )
+
+    @classmethod
+    def from_parts(cls, matcher, source_fields: List[str], profiles: List, embeddings: np.ndarray,
+                   top_k: int = EMBEDDING_TOP_K, removed: Iterable[int] = (), lsh: EmbeddingLSH = None) -> 'FieldANNIndex':
+        """Index over already-computed profiles and embeddings; hashes them unless lsh is given"""
+        index = super().from_parts(matcher, source_fields, profiles, embeddings, top_k, removed)
+        index.lsh = lsh if lsh is not None else index._build_lsh()
+        return index
+
+    def candidates_batch(self, target_fields: List[str]) -> List[List[int]]:
+        """Approximate top-k source positions for each target, in source order"""
+        if self.lsh is None:
+            return super().candidates_batch(target_fields)
+        queries = self.matcher.neural_model.embed_batch(target_fields)
+        return [sorted(found) for found in self.lsh.search(queries, self.top_k, self.removed)]
+
+    @property
+    def block_columns(self) -> int:
+        """EmbeddingLSH.search bounds its own memory, so only top_k per target"""
+        return self.top_k if self.lsh is not None else len(self.source_fields)
+
+    def recall_report(self, target_fields: List[str]) -> Dict[str, Any]:
+        """
+        Recall of the LSH candidates against exact top-k search
+
+        Returns:
+            Dict with the index shape, recall, re-ranked candidates per
+            target (and as a fraction of the catalog) and milliseconds per target for both searches
+        """
+        started = time.perf_counter()
+        approximate = self.candidates_batch(target_fields)
+        ann_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        exact = super().candidates_batch(target_fields)
+        exact_seconds = time.perf_counter() - started
+
+        recalled = sum(len(set(found) & set(truth)) for found, truth in zip(approximate, exact))
+        expected = sum(len(truth) for truth in exact)
+        n_targets = max(1, len(target_fields))
+        report = {
+            "targets": len(target_fields),
+            "sourceFields": len(self.source_fields) - len(self.removed),
+            "topK": self.top_k,
+            "approximate": self.lsh is not None,
+            "recall": recalled / expected if expected else 1.0,
+            "annMsPerTarget": 1000 * ann_seconds / n_targets,
+            "exactMsPerTarget": 1000 * exact_seconds / n_targets,
+        }
+        if self.lsh is not None:
+            queries = self.matcher.neural_model.embed_batch(target_fields)
+            per_target = sum(len(found) for found in self.lsh.candidates(queries)) / n_targets
+            report.update({
+                "tables": self.lsh.n_tables,
+                "bitsPerTable": self.lsh.n_bits,
+                "probeRadius": self.lsh.probe_radius,
+                "candidatesPerTarget": per_target,
+                "candidateFraction": per_target / max(1, len(self.source_fields)),
+            })
+        return report
+
+class FieldMatrixIndex:
+    """
+    Source-side data for scoring every (target, source) pair in bulk
+
+    Keeps the preprocessed names, a sparse binary token incidence matrix
+    and postings for the rule-based scores, so a block of targets is scored
+    with one edit-similarity matrix and one sparse Jaccard product.
+    """
+
+    def __init__(self, matcher, source_fields: List[str]):
+        """
+        Build the source matrices
+
+        Args:
+            matcher: FieldMatcherML whose profiles are scored
+            source_fields: Available fields in codebase
+        """
+        self.matcher = matcher
+        self.source_fields = list(source_fields)
+        self.profiles = [matcher.field_profile(field) for field in self.source_fields]
+        self.processed = [profile.processed for profile in self.profiles]
+        self.vocabulary = build_token_vocabulary(profile.tokens for profile in self.profiles)
+        self.token_matrix = token_incidence_matrix([profile.tokens for profile in self.profiles], self.vocabulary)
+        self.token_sizes = np.array([len(profile.tokens) for profile in self.profiles], dtype=np.int64)
+        self.rule_postings: Dict[BlockingKey, List[int]] = defaultdict(list)
+        for position, profile in enumerate(self.profiles):
+            for key in rule_keys(profile):
+                self.rule_postings[key].append(position)
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """Index contents as arrays for FieldIndexCache"""
+        arrays = encode_profiles(self.profiles)
+        vocabulary_blob, vocabulary_offsets = encode_strings(self.vocabulary)
+        token_indptr = np.zeros(len(self.profiles) + 1, dtype=np.int64)
+        token_indptr[1:] = np.cumsum(self.token_sizes)
+        arrays.update({
+            'vocabulary': vocabulary_blob,
+            'vocabulary_offsets': vocabulary_offsets,
+            'token_indptr': token_indptr,
+            'token_indices': np.array(
+                [self.vocabulary[token] for profile in self.profiles for token in profile.tokens], dtype=np.int64
+            ),
+        })
+        arrays.update(encode_postings(self.rule_postings, 'rules', _encode_key))
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, matcher, source_fields: List[str], arrays: Dict[str, np.ndarray]) -> 'FieldMatrixIndex':
+        """Rebuild an index from to_arrays output; token arrays stay memory-mapped"""
+        index = cls.__new__(cls)
+        index.matcher = matcher
+        index.source_fields = list(source_fields)
+        index.profiles = decode_profiles(matcher, index.source_fields, arrays)
+        index.processed = [profile.processed for profile in index.profiles]
+        vocabulary = decode_strings(arrays['vocabulary'], arrays['vocabulary_offsets'])
+        index.vocabulary = {token: column for column, token in enumerate(vocabulary)}
+        index.token_matrix = incidence_from_csr(arrays['token_indptr'], arrays['token_indices'], len(vocabulary))
+        index.token_sizes = np.diff(np.asarray(arrays['token_indptr']))
+        index.rule_postings = decode_postings(arrays, 'rules', _decode_key)
+        return index
+
+    def rule_candidates(self, target_profile) -> Set[int]:
+        """Source positions where an exact, lookup-table or acronym rule may apply"""
+        found: Set[int] = set()
+        for key in rule_query_keys(target_profile):
+            found.update(self.rule_postings.get(key, ()))
+        return found
+
+    def score_block(self, target_profiles: List) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Edit similarities and weighted scores of a block of targets against all sources
+
+        Rule-based scores are not applied here; see rule_candidates.
+        """
+        lev_similarity = edit_similarity_matrix([profile.processed for profile in target_profiles], self.processed)
+        token_overlap = token_jaccard_matrix(
+            token_incidence_matrix([profile.tokens for profile in target_profiles], self.vocabulary),
+            np.array([len(profile.tokens) for profile in target_profiles], dtype=np.int64),
+            self.token_matrix,
+            self.token_sizes
+        )
+        return lev_similarity, combine_scores(lev_similarity, token_overlap)
+
+class FieldIndex:
+    """
+    Live source-field index maintained in place between matching calls
+
+    Wraps a FieldBlockingIndex (and optionally a FieldEmbeddingIndex).
+    add() profiles, keys and embeds only the new fields; remove() tombstones
+    them and the postings are compacted once removed fields outnumber live
+    ones. Positions keep insertion order, so query() ranks ties exactly like
+    find_similar_fields over the live fields in that order.
+    """
+
+    def __init__(self, matcher, source_fields: List[str] = (), embeddings: bool = False):
+        """
+        Args:
+            matcher: FieldMatcherML used for profiles, scoring and embeddings
+            source_fields: Initial fields in codebase
+            embeddings: Also maintain a FieldEmbeddingIndex for strategy='embedding'
+        """
+        self.matcher = matcher
+        self.blocking = FieldBlockingIndex(matcher, list(source_fields))
+        self.embedding = FieldEmbeddingIndex(matcher, list(source_fields)) if embeddings else None
+        self._positions: Dict[str, List[int]] = defaultdict(list)
+        for position, field in enumerate(self.blocking.source_fields):
+            self._positions[field].append(position)
+
+    def __len__(self) -> int:
+        return len(self.blocking.source_fields) - len(self.blocking.removed)
+
+    @property
+    def fields(self) -> List[str]:
+        """Live source fields in insertion order"""
+        removed = self.blocking.removed
+        return [field for position, field in enumerate(self.blocking.source_fields) if position not in removed]
+
+    def add(self, fields: List[str]) -> int:
+        """Index new source fields; returns how many were added"""
+        fields = [str(field) for field in fields]
+        positions = self.blocking.add(fields)
+        if self.embedding is not None:
+            self.embedding.add(fields)
+        for field, position in zip(fields, positions):
+            self._positions[field].append(position)
+        return len(positions)
+
+    def remove(self, fields: List[str]) -> int:
+        """Remove every live occurrence of the given fields; returns how many were removed"""
+        positions = []
+        for field in set(str(field) for field in fields):
+            positions.extend(self._positions.pop(field, []))
+        self.blocking.remove(positions)
+        if self.embedding is not None:
+            self.embedding.remove(positions)
+        if len(self.blocking.removed) > COMPACT_REMOVED_RATIO * len(self.blocking.source_fields):
+            self.compact()
+        return len(positions)
+
+    def compact(self):
+        """Rebuild the indexes over the live fields only (profiles are reused)"""
+        fields = self.fields
+        live = [position for position in range(len(self.blocking.source_fields)) if position not in self.blocking.removed]
+        self.blocking = FieldBlockingIndex(self.matcher, fields)
+        if self.embedding is not None:
+            self.embedding = FieldEmbeddingIndex.from_parts(
+                self.matcher, fields, self.blocking.profiles,
+                np.array(self.embedding.embeddings[live], dtype=np.float32), self.embedding.top_k
+            )
+        self._positions = defaultdict(list)
+        for position, field in enumerate(fields):
+            self._positions[field].append(position)
+
+    def query(self, target_fields: List[str], threshold: float = 0.6, strategy: str = 'blocking') -> List[Dict[str, Any]]:
+        """find_similar_fields against the live fields ('blocking' or 'embedding')"""
+        if strategy == 'embedding':
+            if self.embedding is None:
+                raise ValueError("FieldIndex was created without embeddings")
+            index = self.embedding
+        elif strategy == 'blocking':
+            index = self.blocking
+        else:
+            raise ValueError(f"FieldIndex does not support strategy: {strategy}")
+        return self.matcher.find_similar_fields(
+            target_fields, index.source_fields, threshold, strategy=strategy, index=index
+        )
+
+    def snapshot(self, path: str):
+        """Write the index (including removed positions) to a directory"""
+        arrays = self.blocking.to_arrays()
+        if self.embedding is not None:
+            arrays.update(self.embedding.to_arrays())
+        field_blob, field_offsets = encode_strings(self.blocking.source_fields)
+        arrays['fields'] = field_blob
+        arrays['field_offsets'] = field_offsets
+        save_arrays(path, arrays, {'kind': 'FieldIndex', 'embeddings': self.embedding is not None})
+
+    @classmethod
+    def load(cls, matcher, path: str) -> 'FieldIndex':
+        """Restore a snapshot written by snapshot(); arrays are memory-mapped"""
+        arrays, meta = load_arrays(path)
+        if meta.get('kind') != 'FieldIndex':
+            raise ValueError(f"Not a FieldIndex snapshot: {path}")
+        source_fields = decode_strings(arrays['fields'], arrays['field_offsets'])
+        index = cls.__new__(cls)
+        index.matcher = matcher
+        index.blocking = FieldBlockingIndex.from_arrays(matcher, source_fields, arrays)
+        index.embedding = (
+            FieldEmbeddingIndex.from_arrays(matcher, source_fields, arrays, index.blocking.profiles)
+            if meta.get('embeddings') else None
+        )
+        index._positions = defaultdict(list)
+        for position, field in enumerate(source_fields):
+            if position not in index.blocking.removed:
+                index._positions[field].append(position)
+        return index
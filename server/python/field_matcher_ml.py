@@ -10,19 +10,39 @@ import json
 import numpy as np
 import re
 import os
-from typing import List, Dict, Any, Tuple
+import heapq
+import hashlib
+import multiprocessing
+from typing import List, Dict, Any, Tuple, Iterable, Iterator, TextIO
 import warnings
 warnings.filterwarnings('ignore')
 
 # Import the TensorFlow-style model
 sys.path.insert(0, os.path.dirname(__file__))
 from tensorflow_field_model import NeuralFieldEmbedding
+import field_scoring
+from field_scoring import (
+    edit_similarity_matrix, iter_row_blocks, max_edit_distance, bounded_levenshtein_distance
+)
+from field_index import FieldBlockingIndex, FieldEmbeddingIndex, FieldANNIndex, FieldMatrixIndex, BLOCKING_LOSSLESS_THRESHOLD
+from field_cache import FieldIndexCache
+from field_ann import default_ann_dir, ANN_CACHE_MAX_ENTRIES, ANN_CACHE_MAX_BYTES
+
+try:
+    import Levenshtein as NativeLevenshtein
+    NATIVE_LEVENSHTEIN_AVAILABLE = True
+except ImportError:
+    NATIVE_LEVENSHTEIN_AVAILABLE = False
 
 def levenshtein_distance(s1: str, s2: str) -> int:
     """
-    Pure Python implementation of Levenshtein distance
-    No C++ dependencies required
+    Levenshtein distance between two strings
+    Uses the native levenshtein package when installed and falls back to a
+    pure Python implementation (no C++ dependencies required)
     """
+    if NATIVE_LEVENSHTEIN_AVAILABLE:
+        return NativeLevenshtein.distance(s1, s2)
+    
     if len(s1) < len(s2):
         return levenshtein_distance(s2, s1)
     
@@ -42,6 +62,91 @@ def levenshtein_distance(s1: str, s2: str) -> int:
     
     return previous_row[-1]
 
+MATCHING_STRATEGIES = ('blocking', 'embedding', 'ann', 'matrix')
+
+# Strategies that retrieve candidates with the neural model
+EMBEDDING_STRATEGIES = ('embedding', 'ann')
+
+INDEX_CLASSES = {
+    'blocking': FieldBlockingIndex,
+    'embedding': FieldEmbeddingIndex,
+    'ann': FieldANNIndex,
+    'matrix': FieldMatrixIndex,
+}
+
+# Suggestions kept per target field
+TOP_SUGGESTIONS = 5
+
+# Below this many targets per worker, parallel matching is not worth forking
+PARALLEL_MIN_TARGETS = 64
+
+# (matcher, target_fields, source_fields, threshold, strategy, index) set by
+# the parent right before forking; workers inherit it copy-on-write
+_parallel_job = None
+
+def _init_parallel_worker():
+    """Keep each worker process single-threaded"""
+    field_scoring.CDIST_WORKERS = 1
+
+def _match_shard(bounds: Tuple[int, int]) -> List[Dict[str, Any]]:
+    """Match one [start, end) shard of the inherited target list"""
+    matcher, target_fields, source_fields, threshold, strategy, index = _parallel_job
+    start, end = bounds
+    return matcher.find_similar_fields(
+        target_fields[start:end], source_fields, threshold, strategy=strategy, index=index
+    )
+
+def select_top_matches(scored: Iterable[Tuple[float, str]], k: int = TOP_SUGGESTIONS) -> List[Dict[str, Any]]:
+    """
+    Top-k suggestions by rounded similarity, ties kept in input order
+    
+    A bounded heap keeps only the k winners, so result dicts are built for
+    those alone instead of for every candidate above the threshold.
+    """
+    best = heapq.nsmallest(k, (
+        (-round(similarity, 3), order, similarity, source)
+        for order, (similarity, source) in enumerate(scored)
+    ))
+    return [
+        {
+            "sourceField": source,
+            "similarity": -negative_rounded,
+            "matchType": "exact" if similarity == 1.0 else "fuzzy"
+        }
+        for negative_rounded, _, similarity, source in best
+    ]
+
+def format_target_field(field) -> str:
+    """Excel field as "table.field" (accepts {tableName, fieldName} dicts or strings)"""
+    if isinstance(field, dict):
+        # Dictionary format: {tableName, fieldName}
+        return f"{field['tableName']}.{field['fieldName']}"
+    # String format: "table.field"
+    return str(field)
+
+def normalize_variation(field_name: str) -> str:
+    """Lookup-table form of a field name (lowercase, no underscores or hyphens)"""
+    return field_name.lower().replace('_', '').replace('-', '')
+
+class FieldProfile:
+    """
+    Precomputed scoring features of one field name
+    
+    Built once per distinct field by FieldMatcherML.field_profile so pair
+    scoring only combines these values instead of redoing string work.
+    """
+    __slots__ = ('field', 'lower', 'short', 'processed', 'tokens', 'acronym', 'categories')
+    
+    def __init__(self, field: str, lower: str, short: str, processed: str,
+                 tokens: frozenset, acronym: str, categories: frozenset):
+        self.field = field
+        self.lower = lower              # Exact-match form
+        self.short = short              # Acronym candidate form (lower, stripped)
+        self.processed = processed      # preprocess_field_name output
+        self.tokens = tokens            # similarity_tokens output
+        self.acronym = acronym          # field_acronym output (None if no words)
+        self.categories = categories    # Demographic categories of the unprefixed name
+
 class FieldMatcherML:
     """
     ML-based field matcher using TensorFlow-style neural network
@@ -49,10 +154,22 @@ class FieldMatcherML:
     100% Offline - No internet connection required
     """
     
-    def __init__(self):
-        """Initialize the field matcher and load trained model"""
-        # Load pre-trained neural network model
-        model_path = os.path.join(os.path.dirname(__file__), 'models', 'demographic_field_model.pkl')
+    def __init__(self, index_cache: FieldIndexCache = None):
+        """
+        Initialize the field matcher and load trained model
+        
+        Args:
+            index_cache: On-disk cache of codebase-side indexes shared across
+                runs (see FieldIndexCache.from_environment); None disables it
+        """
+        self.index_cache = index_cache
+        self._model_fingerprint = None
+        
+        # Load pre-trained neural network model (compact format, else legacy pickle)
+        models_dir = os.path.join(os.path.dirname(__file__), 'models')
+        model_path = os.path.join(models_dir, 'demographic_field_model.zfm')
+        if not os.path.exists(model_path):
+            model_path = os.path.join(models_dir, 'demographic_field_model.pkl')
         
         self.neural_model = NeuralFieldEmbedding()
         
@@ -79,6 +196,18 @@ class FieldMatcherML:
             'cardNumber': ['card_number', 'creditCardNumber', 'credit_card_number', 'panNumber', 'pan_number'],
         }
         
+        # Reverse map: normalized variation -> demographic categories
+        self.variation_categories: Dict[str, frozenset] = {}
+        for base_field, variations in self.demographic_variations.items():
+            for variation in [base_field] + variations:
+                normalized = normalize_variation(variation)
+                self.variation_categories[normalized] = (
+                    self.variation_categories.get(normalized, frozenset()) | {base_field}
+                )
+        
+        # Field name -> FieldProfile, filled on first use
+        self._profiles: Dict[str, FieldProfile] = {}
+        
     def preprocess_field_name(self, field_name: str) -> str:
         """Preprocess field name for better matching"""
         # Convert camelCase and snake_case to lowercase with spaces
@@ -108,10 +237,8 @@ class FieldMatcherML:
         
         return result_tokens
     
-    def is_acronym_match(self, short_field: str, long_field: str) -> bool:
-        """Check if short_field is likely an acronym of long_field"""
-        short = short_field.lower().strip()
-        
+    def field_acronym(self, long_field: str) -> str:
+        """Acronym of a field name's words in order, or None if it has no words"""
         # Split long field into tokens (preserve order)
         tokens = re.split(r'[_\-\s]+', long_field)
         # Also handle camelCase
@@ -122,68 +249,122 @@ class FieldMatcherML:
         # Filter out single-char and empty tokens
         tokens = [t for t in tokens if t and len(t) > 1]
         
-        if not tokens or len(short) < 2:
-            return False
+        if not tokens:
+            return None
         
         # Generate acronym from tokens (preserve order, case-insensitive)
-        acronym = ''.join([t[0].lower() for t in tokens if t])
+        return ''.join([t[0].lower() for t in tokens if t])
+    
+    def is_acronym_match(self, short_field: str, long_field: str) -> bool:
+        """Check if short_field is likely an acronym of long_field"""
+        short = short_field.lower().strip()
         
-        return short == acronym
+        if len(short) < 2:
+            return False
+        
+        return short == self.field_acronym(long_field)
+    
+    def similarity_tokens(self, field_name: str) -> set:
+        """Word tokens compared by the token-overlap score (no acronyms)"""
+        tokens = set(re.split(r'[_\-\s]+', field_name.lower()))
+        
+        # Also add camelCase tokens
+        tokens.update(re.findall(r'[a-z]+', field_name.lower()))
+        
+        # Remove single-char and empty tokens
+        return {t for t in tokens if t and len(t) > 1}
+    
+    def field_profile(self, field_name: str) -> FieldProfile:
+        """Scoring features of a field name, computed once and cached"""
+        profile = self._profiles.get(field_name)
+        if profile is not None:
+            return profile
+        
+        return self.restore_profile(
+            field_name,
+            self.preprocess_field_name(field_name),
+            self.similarity_tokens(field_name),
+            self.field_acronym(field_name)
+        )
+    
+    def restore_profile(self, field_name: str, processed: str, tokens: Iterable[str], acronym: str) -> FieldProfile:
+        """
+        Cache a profile from its regex-derived parts (computed or read from disk)
+        
+        The remaining features are cheap and recomputed here.
+        """
+        # Strip table prefixes (e.g., "CUSTOMER.SSN" → "SSN")
+        clean = field_name.split('.')[-1] if '.' in field_name else field_name
+        lower = field_name.lower()
+        
+        profile = FieldProfile(
+            field=field_name,
+            lower=sys.intern(lower),
+            short=sys.intern(lower.strip()),
+            processed=sys.intern(processed),
+            tokens=frozenset(sys.intern(t) for t in tokens),
+            acronym=acronym,
+            categories=self.variation_categories.get(normalize_variation(clean), frozenset())
+        )
+        self._profiles[field_name] = profile
+        return profile
     
-    def calculate_similarity(self, source_field: str, target_field: str) -> float:
+    def calculate_similarity(
+        self,
+        source_field: str,
+        target_field: str,
+        lev_similarity: float = None,
+        threshold: float = None
+    ) -> float:
         """
         Calculate similarity between two field names using multiple methods
         Returns score between 0 and 1
+        
+        Args:
+            source_field: First field name
+            target_field: Second field name
+            lev_similarity: Precomputed edit similarity of the preprocessed
+                names (from a batch matrix); computed here when omitted
+            threshold: When given, pairs that cannot reach it are rejected
+                early with a bounded edit distance and scored 0.0; scores
+                at or above the threshold are unchanged
         """
+        return self.score_profiles(
+            self.field_profile(source_field),
+            self.field_profile(target_field),
+            lev_similarity,
+            threshold
+        )
+    
+    def score_profiles(
+        self,
+        source: FieldProfile,
+        target: FieldProfile,
+        lev_similarity: float = None,
+        threshold: float = None
+    ) -> float:
+        """calculate_similarity on precomputed field profiles"""
         # Method 1: Exact match (fast path)
-        if source_field.lower() == target_field.lower():
+        if source.lower == target.lower:
             return 1.0
         
-        # Strip table prefixes (e.g., "CUSTOMER.SSN" → "SSN")
-        source_clean = source_field.split('.')[-1] if '.' in source_field else source_field
-        target_clean = target_field.split('.')[-1] if '.' in target_field else target_field
-        
         # Method 2: Lookup table match (knowledge-based, high confidence)
-        source_lower = source_clean.lower().replace('_', '').replace('-', '')
-        target_lower = target_clean.lower().replace('_', '').replace('-', '')
-        
-        for base_field, variations in self.demographic_variations.items():
-            base_normalized = base_field.lower().replace('_', '').replace('-', '')
-            variations_normalized = [v.lower().replace('_', '').replace('-', '') for v in variations]
-            
-            # Check if both fields match the same demographic category
-            if ((source_lower == base_normalized or source_lower in variations_normalized) and
-                (target_lower == base_normalized or target_lower in variations_normalized)):
-                return 0.95  # High confidence match from lookup table
+        # Both fields match the same demographic category
+        if source.categories and not source.categories.isdisjoint(target.categories):
+            return 0.95  # High confidence match from lookup table
         
         # Method 3: Check for acronym match (e.g., ssn == social_security_number)
-        shorter = source_field if len(source_field) < len(target_field) else target_field
-        longer = target_field if len(source_field) < len(target_field) else source_field
+        if len(source.field) < len(target.field):
+            shorter, longer = source, target
+        else:
+            shorter, longer = target, source
         
-        if self.is_acronym_match(shorter, longer):
+        if len(shorter.short) >= 2 and shorter.short == longer.acronym:
             return 0.90  # High confidence acronym match
         
-        # Method 3: Levenshtein distance
-        source = self.preprocess_field_name(source_field)
-        target = self.preprocess_field_name(target_field)
-        
-        max_len = max(len(source), len(target))
-        if max_len > 0:
-            lev_similarity = 1 - (levenshtein_distance(source, target) / max_len)
-        else:
-            lev_similarity = 0.0
-        
         # Method 4: Token overlap (without acronyms to avoid duplicates)
-        source_tokens = set(re.split(r'[_\-\s]+', source_field.lower()))
-        target_tokens = set(re.split(r'[_\-\s]+', target_field.lower()))
-        
-        # Also add camelCase tokens
-        source_tokens.update(re.findall(r'[a-z]+', source_field.lower()))
-        target_tokens.update(re.findall(r'[a-z]+', target_field.lower()))
-        
-        # Remove single-char and empty tokens
-        source_tokens = {t for t in source_tokens if t and len(t) > 1}
-        target_tokens = {t for t in target_tokens if t and len(t) > 1}
+        source_tokens = source.tokens
+        target_tokens = target.tokens
         
         if source_tokens and target_tokens:
             intersection = len(source_tokens & target_tokens)
@@ -192,6 +373,21 @@ class FieldMatcherML:
         else:
             token_overlap = 0.0
         
+        # Method 3: Levenshtein distance
+        if lev_similarity is None:
+            max_len = max(len(source.processed), len(target.processed))
+            if max_len == 0:
+                lev_similarity = 0.0
+            elif threshold is None:
+                lev_similarity = 1 - (levenshtein_distance(source.processed, target.processed) / max_len)
+            else:
+                # Only distances up to the bound can still pass the threshold
+                max_distance = max_edit_distance(threshold, token_overlap, max_len)
+                distance = bounded_levenshtein_distance(source.processed, target.processed, max_distance)
+                if distance > max_distance:
+                    return 0.0
+                lev_similarity = 1 - (distance / max_len)
+        
         # Weighted combination: Balanced approach
         final_score = (
             0.6 * lev_similarity +   # 60% Levenshtein distance
@@ -200,11 +396,65 @@ class FieldMatcherML:
         
         return min(1.0, max(0.0, final_score))
     
+    def resolve_strategy(self, threshold: float, strategy: str = None, streaming: bool = False) -> str:
+        """
+        Matching strategy to use when none is given, chosen from measurement
+
+        With benchmark_field_model names against 50k codebase fields, a batch
+        of 300 targets matches in about the same time with 'matrix' as with
+        'blocking', and the matrix index builds about 5x faster. Scored one
+        target at a time (streaming), blocking was about 5x faster because
+        most targets need only a few candidates, so it is the streaming
+        default whenever it is lossless.
+        """
+        if strategy is None:
+            lossless = threshold >= BLOCKING_LOSSLESS_THRESHOLD
+            strategy = 'blocking' if streaming and lossless else 'matrix'
+        if strategy not in MATCHING_STRATEGIES:
+            raise ValueError(f"Unknown matching strategy: {strategy}")
+        return strategy
+    
+    def build_index(self, source_fields: List[str], strategy: str):
+        """
+        Source-side index over source_fields for a strategy
+        
+        With an index_cache, an index built earlier for the same field list
+        (and model, for embeddings) is loaded from disk instead. ANN indexes
+        are always persisted, in default_ann_dir() unless an index_cache is set.
+        """
+        index_class = INDEX_CLASSES[strategy]
+        index_cache = self.index_cache
+        if index_cache is None and strategy == 'ann':
+            index_cache = FieldIndexCache(default_ann_dir(), ANN_CACHE_MAX_ENTRIES, ANN_CACHE_MAX_BYTES)
+        if index_cache is None:
+            return index_class(self, source_fields)
+        
+        fingerprint = self.model_fingerprint() if strategy in EMBEDDING_STRATEGIES else ''
+        return index_cache.get_or_build(
+            FieldIndexCache.key(strategy, source_fields, fingerprint),
+            lambda: index_class(self, source_fields),
+            lambda arrays: index_class.from_arrays(self, source_fields, arrays),
+            strategy
+        )
+    
+    def model_fingerprint(self) -> str:
+        """Hash of the neural model weights (invalidates cached embeddings on retraining)"""
+        if self._model_fingerprint is None:
+            digest = hashlib.sha256()
+            model = self.neural_model
+            for weights in (model.W1, model.b1, model.W2, model.b2, model.W3, model.b3):
+                digest.update(np.ascontiguousarray(weights).tobytes())
+            self._model_fingerprint = digest.hexdigest()
+        return self._model_fingerprint
+    
     def find_similar_fields(
         self, 
         target_fields: List[str], 
         source_fields: List[str],
-        threshold: float = 0.7
+        threshold: float = 0.7,
+        strategy: str = None,
+        index=None,
+        workers: int = 1
     ) -> List[Dict[str, Any]]:
         """
         Find similar fields from source list for each target field
@@ -213,63 +463,224 @@ class FieldMatcherML:
             target_fields: Fields to find matches for (from Excel)
             source_fields: Available fields in codebase
             threshold: Minimum similarity threshold (0-1)
+            strategy: 'blocking' scores each target only against candidates
+                from a FieldBlockingIndex; 'embedding' re-ranks the nearest
+                neighbours from the neural model (approximate); 'ann' does
+                the same with LSH retrieval for very large source lists;
+                'matrix' scores every pair. By default matrix is used (see
+                resolve_strategy)
+            index: Prebuilt index over source_fields for the strategy (see
+                build_index) to reuse across calls
+            workers: Processes to shard target_fields across (0 = all
+                cores); results are identical to a single-process run
             
         Returns:
             List of matches with similarity scores
         """
+        strategy = self.resolve_strategy(threshold, strategy)
+        
+        if workers != 1:
+            return self._find_similar_fields_parallel(
+                target_fields, source_fields, threshold, strategy, index, workers
+            )
+        
+        if strategy in EMBEDDING_STRATEGIES:
+            if index is None:
+                index = self.build_index(source_fields, strategy)
+            matches = []
+            for start, end in iter_row_blocks(len(target_fields), index.block_columns):
+                block_targets = target_fields[start:end]
+                for target, candidates in zip(block_targets, index.candidates_batch(block_targets)):
+                    matches.append(self._match_target(self.field_profile(target), index.profiles, candidates, None, threshold))
+            return matches
+        
+        if strategy == 'blocking':
+            if index is None:
+                index = self.build_index(source_fields, strategy)
+            matches = []
+            for start, end in iter_row_blocks(len(target_fields), len(index.source_fields)):
+                block_profiles = [self.field_profile(target) for target in target_fields[start:end]]
+                block_positions = [index.candidate_array(profile, threshold) for profile in block_profiles]
+                # Targets whose keys cover too much of the catalog are scored
+                # against every source together, as in the matrix strategy
+                full_rows = [row for row, positions in enumerate(block_positions) if positions is None]
+                if full_rows:
+                    full_lev, full_scores = index.score_block([block_profiles[row] for row in full_rows])
+                    full_row_of = {row: i for i, row in enumerate(full_rows)}
+
+                for row, (target_profile, positions) in enumerate(zip(block_profiles, block_positions)):
+                    if positions is None:
+                        lev_row, row_scores = full_lev[full_row_of[row]], full_scores[full_row_of[row]]
+                    else:
+                        lev_row, row_scores = index.score_candidates(target_profile, positions)
+                    # Exact, lookup-table and acronym rules override the weighted score
+                    for i in index.rule_positions(target_profile, positions):
+                        source = index.profiles[i if positions is None else positions[i]]
+                        row_scores[i] = self.score_profiles(target_profile, source, float(lev_row[i]))
+                    matches.append(self._select_matches(target_profile, index.profiles, row_scores, threshold, positions))
+            return matches
+        
+        if not isinstance(index, FieldMatrixIndex):
+            index = self.build_index(source_fields, strategy)
         matches = []
         
-        for target in target_fields:
-            field_matches = []
+        # Edit similarities and token overlaps for a block of targets against
+        # every source are computed in bulk instead of pair by pair
+        for start, end in iter_row_blocks(len(target_fields), len(source_fields)):
+            block_profiles = [self.field_profile(target) for target in target_fields[start:end]]
+            lev_matrix, score_matrix = index.score_block(block_profiles)
             
-            for source in source_fields:
-                similarity = self.calculate_similarity(target, source)
+            for row, target_profile in enumerate(block_profiles):
+                row_scores = score_matrix[row]
+                # Exact, lookup-table and acronym rules override the weighted score
+                for col in index.rule_candidates(target_profile):
+                    row_scores[col] = self.score_profiles(target_profile, index.profiles[col], float(lev_matrix[row, col]))
+                matches.append(self._select_matches(target_profile, index.profiles, row_scores, threshold))
+        
+        return matches
+    
+    def _find_similar_fields_parallel(
+        self,
+        target_fields: List[str],
+        source_fields: List[str],
+        threshold: float,
+        strategy: str,
+        index,
+        workers: int
+    ) -> List[Dict[str, Any]]:
+        """
+        find_similar_fields with target_fields sharded across forked processes
+        
+        Source profiles and the candidate index are built once in the parent
+        and inherited read-only by the workers. Shards are contiguous and
+        returned in order, so the merged result matches a sequential run.
+        """
+        global _parallel_job
+        
+        workers = workers if workers > 0 else (os.cpu_count() or 1)
+        workers = min(workers, len(target_fields) // PARALLEL_MIN_TARGETS)
+        if workers <= 1 or 'fork' not in multiprocessing.get_all_start_methods():
+            return self.find_similar_fields(target_fields, source_fields, threshold, strategy, index)
+        
+        if index is None:
+            index = self.build_index(source_fields, strategy)
+        
+        # A few shards per worker evens out uneven candidate counts
+        shard_count = workers * 4
+        shard_size = -(-len(target_fields) // shard_count)
+        shards = [
+            (start, min(len(target_fields), start + shard_size))
+            for start in range(0, len(target_fields), shard_size)
+        ]
+        
+        _parallel_job = (self, target_fields, source_fields, threshold, strategy, index)
+        try:
+            context = multiprocessing.get_context('fork')
+            with context.Pool(workers, initializer=_init_parallel_worker) as pool:
+                shard_results = pool.map(_match_shard, shards)
+        finally:
+            _parallel_job = None
+        
+        return [match for shard in shard_results for match in shard]
+    
+    def _select_matches(
+        self,
+        target: FieldProfile,
+        source_profiles: List[FieldProfile],
+        row_scores: np.ndarray,
+        threshold: float,
+        positions: np.ndarray = None
+    ) -> Dict[str, Any]:
+        """
+        Top 5 sources (ties in source order) from one row of final scores
+        
+        row_scores covers every source, or the ascending source positions
+        given in positions.
+        """
+        cols = np.flatnonzero(row_scores >= threshold)
+        if len(cols) > TOP_SUGGESTIONS:
+            # Only scores within one rounding step of the k-th best can still
+            # make the top k once rounded to 3 decimals
+            values = row_scores[cols]
+            kth = np.partition(values, len(values) - TOP_SUGGESTIONS)[len(values) - TOP_SUGGESTIONS]
+            cols = cols[values >= kth - 0.001]
+        
+        field_matches = select_top_matches(
+            (float(row_scores[col]), source_profiles[col if positions is None else positions[col]].field)
+            for col in cols
+        )
+        
+        return {
+            "targetField": target.field,
+            "suggestions": field_matches,  # Top 5 matches
+            "bestMatch": field_matches[0] if field_matches else None
+        }
+    
+    def _match_target(
+        self,
+        target: FieldProfile,
+        source_profiles: List[FieldProfile],
+        candidates: Iterable[int],
+        lev_row: np.ndarray,
+        threshold: float
+    ) -> Dict[str, Any]:
+        """
+        Score one target against candidate sources (in source order) and pick the top 5
+        
+        lev_row holds precomputed edit similarities aligned with candidates;
+        without it each pair is scored with threshold-bounded edit distance.
+        """
+        def scored():
+            for position, col in enumerate(candidates):
+                source = source_profiles[col]
+                if lev_row is None:
+                    similarity = self.score_profiles(target, source, threshold=threshold)
+                else:
+                    similarity = self.score_profiles(target, source, float(lev_row[position]))
                 
                 if similarity >= threshold:
-                    field_matches.append({
-                        "sourceField": source,
-                        "similarity": round(similarity, 3),
-                        "matchType": "exact" if similarity == 1.0 else "fuzzy"
-                    })
-            
-            # Sort by similarity (highest first)
-            field_matches.sort(key=lambda x: x["similarity"], reverse=True)
-            
-            matches.append({
-                "targetField": target,
-                "suggestions": field_matches[:5],  # Top 5 matches
-                "bestMatch": field_matches[0] if field_matches else None
-            })
+                    yield similarity, source.field
         
-        return matches
+        field_matches = select_top_matches(scored())
+        
+        return {
+            "targetField": target.field,
+            "suggestions": field_matches,  # Top 5 matches
+            "bestMatch": field_matches[0] if field_matches else None
+        }
     
     def suggest_mappings(
         self,
         excel_fields,
-        codebase_fields: List[str]
-    ) -> Dict[str, Any]:
+        codebase_fields: List[str],
+        strategy: str = None,
+        workers: int = 1,
+        stream: bool = False
+    ):
         """
         Suggest field mappings using ML-based similarity
         
         Args:
             excel_fields: List of field names (either strings or {tableName, fieldName} dicts)
             codebase_fields: List of field names found in codebase
+            strategy: Matching strategy (see find_similar_fields)
+            workers: Matching processes (see find_similar_fields); not used
+                when streaming
+            stream: Return an iterator yielding each Excel field's suggestion
+                as soon as it is scored instead of the summary document;
+                excel_fields may then be any (lazy) iterable
             
         Returns:
             Suggested mappings with confidence scores
         """
+        if stream:
+            return self.iter_suggestions(excel_fields, codebase_fields, strategy=strategy)
+        
         # Handle both string array and dict array formats
-        target_field_names = []
-        for field in excel_fields:
-            if isinstance(field, dict):
-                # Dictionary format: {tableName, fieldName}
-                target_field_names.append(f"{field['tableName']}.{field['fieldName']}")
-            else:
-                # String format: "table.field"
-                target_field_names.append(str(field))
+        target_field_names = [format_target_field(field) for field in excel_fields]
         
         # Find similar fields
-        suggestions = self.find_similar_fields(target_field_names, codebase_fields, threshold=0.6)
+        suggestions = self.find_similar_fields(target_field_names, codebase_fields, threshold=0.6, strategy=strategy, workers=workers)
         
         # Categorize results
         exact_matches = []
@@ -296,11 +707,173 @@ class FieldMatcherML:
             "noMatchList": no_matches
         }
 
+    def iter_suggestions(
+        self,
+        excel_fields: Iterable[Any],
+        codebase_fields: List[str],
+        threshold: float = 0.6,
+        strategy: str = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield one suggestion per Excel field as soon as it is scored
+        
+        The codebase index is built when the first Excel field arrives, so
+        codebase_fields must be complete by then.
+        """
+        strategy = self.resolve_strategy(threshold, strategy, streaming=True)
+        index = None
+        for field in excel_fields:
+            if index is None:
+                index = self.build_index(codebase_fields, strategy)
+            yield self.find_similar_fields(
+                [format_target_field(field)], codebase_fields, threshold=threshold, strategy=strategy, index=index
+            )[0]
+
+def read_field_records(stream: TextIO) -> Iterator[Dict[str, Any]]:
+    """
+    Read newline-delimited JSON field records
+    
+    Each line is an object with "codebaseFields" and/or "excelFields" lists.
+    A single line holding both lists is also valid input.
+    """
+    for line_number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON on input line {line_number}: {e}")
+        if not isinstance(record, dict):
+            raise ValueError(f"Input line {line_number} must be a JSON object")
+        yield record
+
+def stream_suggestions(
+    matcher: FieldMatcherML,
+    records: Iterable[Dict[str, Any]],
+    threshold: float = 0.6,
+    strategy: str = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield one suggestion per Excel field as soon as it is scored
+    
+    Codebase fields are accumulated from the records and must all arrive
+    before the first batch of Excel fields; Excel fields are never held in
+    memory beyond the batch being matched. Excel fields before any
+    codebaseFields record (an empty list counts) are rejected before
+    anything is matched, rather than matched against an empty catalog.
+    """
+    codebase_fields: List[str] = []
+    
+    def excel_fields() -> Iterator[Any]:
+        codebase_received = False
+        matching_started = False
+        for record in records:
+            new_codebase_fields = record.get('codebaseFields') or []
+            if 'codebaseFields' in record:
+                codebase_received = True
+            if new_codebase_fields:
+                if matching_started:
+                    raise ValueError("codebaseFields must be sent before any excelFields")
+                codebase_fields.extend(str(field) for field in new_codebase_fields)
+            
+            new_excel_fields = record.get('excelFields') or []
+            if new_excel_fields and not codebase_received:
+                raise ValueError("codebaseFields must be sent before any excelFields")
+            for field in new_excel_fields:
+                matching_started = True
+                yield field
+    
+    yield from matcher.iter_suggestions(excel_fields(), codebase_fields, threshold=threshold, strategy=strategy)
+
+def run_streaming(stream: TextIO, output_format: str = 'ndjson', strategy: str = None, workers: int = 1,
+                  index_cache: bool = False):
+    """Match fields read from a stream and write results to stdout"""
+    matcher = FieldMatcherML(index_cache=FieldIndexCache.from_environment(index_cache))
+    records = read_field_records(stream)
+    
+    if output_format == 'json':
+        # Buffered output in the same shape as the argv interface
+        excel_fields: List[Any] = []
+        codebase_fields: List[str] = []
+        for record in records:
+            codebase_fields.extend(record.get('codebaseFields') or [])
+            excel_fields.extend(record.get('excelFields') or [])
+        results = matcher.suggest_mappings(excel_fields, codebase_fields, strategy=strategy, workers=workers)
+        print(json.dumps({
+            "success": True,
+            "results": results
+        }))
+        return
+    
+    summary = {"totalFields": 0, "exactMatches": 0, "fuzzyMatches": 0, "noMatches": 0}
+    for suggestion in stream_suggestions(matcher, records, strategy=strategy):
+        summary["totalFields"] += 1
+        if suggestion["bestMatch"] is None:
+            summary["noMatches"] += 1
+        elif suggestion["bestMatch"]["matchType"] == "exact":
+            summary["exactMatches"] += 1
+        else:
+            summary["fuzzyMatches"] += 1
+        sys.stdout.write(json.dumps({"type": "suggestion", "suggestion": suggestion}) + "\n")
+        sys.stdout.flush()
+    
+    print(json.dumps({"type": "summary", "success": True, **summary}))
+
+def _option(argv: List[str], flag: str, default: str = None) -> str:
+    """Value following a command line flag"""
+    if flag in argv:
+        index = argv.index(flag)
+        if index + 1 < len(argv):
+            return argv[index + 1]
+    return default
+
 def main():
-    """Main entry point for CLI usage"""
+    """
+    Main entry point for CLI usage
+    
+    python field_matcher_ml.py <excel_fields_json> <codebase_fields_json>
+    python field_matcher_ml.py --input <path|-> [--output ndjson|json]
+                               [--strategy blocking|embedding|ann|matrix] [--workers N]
+                               [--index-cache]
+    
+    The --input form reads newline-delimited JSON records (see
+    read_field_records) from a file or stdin, so catalogs of any size avoid
+    the OS argument-length limit. By default it streams one
+    {"type": "suggestion"} line per Excel field followed by a
+    {"type": "summary"} line; --output json prints the same document as the
+    argv form instead. --strategy selects how candidates are found (see
+    FieldMatcherML.find_similar_fields) and --workers shards matching across
+    N processes (0 = all cores) for the buffered json output and argv form.
+    --index-cache (or setting ZENAGENT_FIELD_CACHE_DIR) reuses codebase
+    indexes across runs via FieldIndexCache; it is off by default.
+    """
+    input_path = _option(sys.argv[1:], '--input')
+    if input_path is not None:
+        output_format = _option(sys.argv[1:], '--output', 'ndjson')
+        strategy = _option(sys.argv[1:], '--strategy')
+        index_cache = '--index-cache' in sys.argv[1:]
+        try:
+            workers = int(_option(sys.argv[1:], '--workers', '1'))
+            if output_format not in ('ndjson', 'json'):
+                raise ValueError(f"Unknown output format: {output_format}")
+            if input_path == '-':
+                run_streaming(sys.stdin, output_format, strategy, workers, index_cache)
+            else:
+                with open(input_path, 'r', encoding='utf-8') as f:
+                    run_streaming(f, output_format, strategy, workers, index_cache)
+        except Exception as e:
+            error = {"success": False, "error": str(e)}
+            if output_format == 'ndjson':
+                error = {"type": "error", **error}
+            print(json.dumps(error))
+            sys.exit(1)
+        return
+    
     if len(sys.argv) < 3:
         print(json.dumps({
-            "error": "Usage: python field_matcher_ml.py <excel_fields_json> <codebase_fields_json>"
+            "error": "Usage: python field_matcher_ml.py <excel_fields_json> <codebase_fields_json> "
+                     "| --input <path|-> [--output ndjson|json] [--strategy blocking|embedding|ann|matrix] [--workers N] [--index-cache]"
         }))
         sys.exit(1)
     
@@ -310,10 +883,11 @@ def main():
         codebase_fields = json.loads(sys.argv[2])
         
         # Initialize matcher
-        matcher = FieldMatcherML()
+        matcher = FieldMatcherML(index_cache=FieldIndexCache.from_environment('--index-cache' in sys.argv[3:]))
         
         # Get suggestions
-        results = matcher.suggest_mappings(excel_fields, codebase_fields)
+        workers = int(_option(sys.argv[3:], '--workers', '1'))
+        results = matcher.suggest_mappings(excel_fields, codebase_fields, workers=workers)
         
         # Output results
         print(json.dumps({
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Batch Field Scoring - Vectorized similarity matrices for field matching
+Computes full target x source edit-distance and edit-similarity matrices in
+native code (rapidfuzz, installed with the levenshtein package) or, when that
+is unavailable, with a NumPy-vectorized Wagner-Fischer recurrence. Token
+overlap (Jaccard) matrices come from one sparse product of binary token
+incidence matrices (SciPy, installed with scikit-learn).
+"""
+
+import numpy as np
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+try:
+    from rapidfuzz.process import cdist
+    from rapidfuzz.distance import Levenshtein as RapidLevenshtein
+    RAPIDFUZZ_AVAILABLE = True
+except ImportError:
+    RAPIDFUZZ_AVAILABLE = False
+
+try:
+    from scipy import sparse
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+# Upper bound on cells per score matrix block (int32 distances + float64 scores)
+MAX_MATRIX_CELLS = 4_000_000
+
+# Weights of the edit similarity and token overlap in FieldMatcherML's score
+LEV_WEIGHT = 0.6
+TOKEN_WEIGHT = 0.4
+
+# Threads used by rapidfuzz's cdist (-1 = all cores); matcher worker
+# processes set this to 1 so a process pool does not oversubscribe the host
+CDIST_WORKERS = -1
+
+def _numpy_distance_matrix(targets: List[str], sources: List[str]) -> np.ndarray:
+    """
+    Levenshtein distances with the DP row vectorized across all sources
+
+    For a fixed target character the recurrence
+        cur[j] = min(prev[j] + 1, prev[j-1] + cost[j-1], cur[j-1] + 1)
+    becomes cur[j] = j + min_{k<=j}(x[k] - k), with x[0] = i and
+    x[j] = min(prev[j] + 1, prev[j-1] + cost[j-1]), so each row is a single
+    np.minimum.accumulate over every source at once.
+    """
+    distances = np.zeros((len(targets), len(sources)), dtype=np.int32)
+    if not sources:
+        return distances
+
+    lengths = np.array([len(s) for s in sources], dtype=np.int64)
+    max_length = int(lengths.max()) if len(lengths) else 0
+    codes = np.full((len(sources), max_length), -1, dtype=np.int64)
+    for index, source in enumerate(sources):
+        codes[index, :len(source)] = [ord(c) for c in source]
+
+    offsets = np.arange(max_length + 1, dtype=np.int64)
+    rows = np.arange(len(sources))
+    for t_index, target in enumerate(targets):
+        previous = np.broadcast_to(offsets, (len(sources), max_length + 1))
+        for i, char in enumerate(target, 1):
+            cost = (codes != ord(char)).astype(np.int64)
+            x = np.empty((len(sources), max_length + 1), dtype=np.int64)
+            x[:, 0] = i
+            x[:, 1:] = np.minimum(previous[:, 1:] + 1, previous[:, :-1] + cost)
+            previous = np.minimum.accumulate(x - offsets, axis=1) + offsets
+        distances[t_index] = previous[rows, lengths]
+
+    return distances
+
+def levenshtein_distance_matrix(targets: List[str], sources: List[str]) -> np.ndarray:
+    """Levenshtein distance for every (target, source) pair as an int32 matrix"""
+    if not targets or not sources:
+        return np.zeros((len(targets), len(sources)), dtype=np.int32)
+    if RAPIDFUZZ_AVAILABLE:
+        return cdist(targets, sources, scorer=RapidLevenshtein.distance, dtype=np.int32, workers=CDIST_WORKERS)
+    return _numpy_distance_matrix(targets, sources)
+
+def edit_similarity_matrix(targets: List[str], sources: List[str]) -> np.ndarray:
+    """
+    Edit similarity 1 - distance / max_len for every (target, source) pair
+
+    Computed in float64 with the same operations as the scalar path, so the
+    values are bit-for-bit identical to FieldMatcherML's per-pair scores.
+    Pairs of two empty strings score 0.0.
+    """
+    distances = levenshtein_distance_matrix(targets, sources)
+    target_lengths = np.array([len(t) for t in targets], dtype=np.int64)
+    source_lengths = np.array([len(s) for s in sources], dtype=np.int64)
+    max_lengths = np.maximum(target_lengths[:, None], source_lengths[None, :])
+
+    similarity = np.zeros(distances.shape, dtype=np.float64)
+    nonempty = max_lengths > 0
+    similarity[nonempty] = 1 - (distances[nonempty] / max_lengths[nonempty])
+    return similarity
+
+def iter_row_blocks(n_rows: int, n_cols: int, max_cells: int = MAX_MATRIX_CELLS) -> Iterator[Tuple[int, int]]:
+    """Split n_rows into [start, end) blocks so each block has at most max_cells cells"""
+    rows_per_block = max(1, max_cells // max(1, n_cols))
+    for start in range(0, n_rows, rows_per_block):
+        yield start, min(n_rows, start + rows_per_block)
+
+def build_token_vocabulary(token_sets: Iterable[Iterable[str]]) -> Dict[str, int]:
+    """Column index for every token that appears in token_sets"""
+    vocabulary: Dict[str, int] = {}
+    for tokens in token_sets:
+        for token in tokens:
+            if token not in vocabulary:
+                vocabulary[token] = len(vocabulary)
+    return vocabulary
+
+def token_incidence_matrix(token_sets: List[Iterable[str]], vocabulary: Dict[str, int]):
+    """
+    Binary (fields x vocabulary) matrix of the tokens each field contains
+
+    Tokens missing from the vocabulary are skipped; they can never be shared,
+    so only the set sizes (passed separately) need to count them. Returns a
+    SciPy CSR matrix, or a list of column sets without SciPy.
+    """
+    if not SCIPY_AVAILABLE:
+        return [{vocabulary[t] for t in tokens if t in vocabulary} for tokens in token_sets]
+
+    indptr = [0]
+    indices: List[int] = []
+    for tokens in token_sets:
+        indices.extend(vocabulary[t] for t in tokens if t in vocabulary)
+        indptr.append(len(indices))
+    data = np.ones(len(indices), dtype=np.int32)
+    return sparse.csr_matrix(
+        (data, np.array(indices, dtype=np.int32), np.array(indptr, dtype=np.int64)),
+        shape=(len(token_sets), len(vocabulary))
+    )
+
+def incidence_from_csr(indptr: np.ndarray, indices: np.ndarray, n_columns: int):
+    """token_incidence_matrix from CSR arrays (e.g. memory-mapped from a cache)"""
+    indptr = np.asarray(indptr, dtype=np.int64)
+    indices = np.asarray(indices, dtype=np.int32)
+    if not SCIPY_AVAILABLE:
+        return [set(indices[indptr[i]:indptr[i + 1]].tolist()) for i in range(len(indptr) - 1)]
+    data = np.ones(len(indices), dtype=np.int32)
+    return sparse.csr_matrix((data, indices, indptr), shape=(len(indptr) - 1, n_columns))
+
+def token_jaccard_matrix(target_matrix, target_sizes: np.ndarray, source_matrix, source_sizes: np.ndarray) -> np.ndarray:
+    """
+    Jaccard overlap |A & B| / |A | B| for every (target, source) token-set pair
+
+    Intersections come from one sparse product; unions are |A| + |B| minus
+    the intersection. Pairs where either side has no tokens score 0.0, as in
+    FieldMatcherML.calculate_similarity; values are float64 and identical to
+    the per-pair division.
+    """
+    if SCIPY_AVAILABLE:
+        intersection = (target_matrix @ source_matrix.T).toarray().astype(np.int64)
+    else:
+        intersection = np.array(
+            [[len(t & s) for s in source_matrix] for t in target_matrix], dtype=np.int64
+        ).reshape(len(target_sizes), len(source_sizes))
+
+    target_sizes = np.asarray(target_sizes, dtype=np.int64)[:, None]
+    source_sizes = np.asarray(source_sizes, dtype=np.int64)[None, :]
+    union = target_sizes + source_sizes - intersection
+
+    overlap = np.zeros(intersection.shape, dtype=np.float64)
+    both = (target_sizes > 0) & (source_sizes > 0)
+    overlap[both] = intersection[both] / union[both]
+    return overlap
+
+def distinct_values(values: np.ndarray) -> np.ndarray:
+    """Sorted distinct values (np.unique semantics; sort-and-diff is far faster on small int arrays)"""
+    values = np.sort(values)
+    keep = np.empty(len(values), dtype=bool)
+    keep[:1] = True
+    np.not_equal(values[1:], values[:-1], out=keep[1:])
+    return values[keep]
+
+def combine_scores(lev_similarity: np.ndarray, token_overlap: np.ndarray) -> np.ndarray:
+    """Weighted score clipped to [0, 1], elementwise as in calculate_similarity"""
+    return np.clip(LEV_WEIGHT * lev_similarity + TOKEN_WEIGHT * token_overlap, 0.0, 1.0)
+
+def max_edit_distance(threshold: float, token_overlap: float, max_len: int) -> int:
+    """
+    Largest edit distance that can still score >= threshold
+
+    From LEV_WEIGHT * (1 - d / max_len) + TOKEN_WEIGHT * token_overlap >= threshold.
+    Returns -1 when no distance can reach the threshold. A small epsilon
+    keeps float rounding from ever excluding a passing distance.
+    """
+    required = (threshold - TOKEN_WEIGHT * token_overlap) / LEV_WEIGHT
+    if required <= 0:
+        return max_len
+    if required > 1:
+        return -1
+    return int(max_len * (1 - required) + 1e-7)
+
+def bounded_levenshtein_distance(s1: str, s2: str, max_distance: int) -> int:
+    """
+    Levenshtein distance, or max_distance + 1 once it is known to exceed max_distance
+
+    Rejects on the length difference in O(1); otherwise runs native code
+    with a cutoff or a banded DP (width 2k+1) that stops as soon as every
+    cell in a row exceeds the bound, i.e. O(k * L) instead of O(L^2).
+    """
+    if max_distance < 0:
+        return 0 if s1 == s2 else 1
+    if abs(len(s1) - len(s2)) > max_distance:
+        return max_distance + 1
+    if RAPIDFUZZ_AVAILABLE:
+        return RapidLevenshtein.distance(s1, s2, score_cutoff=max_distance)
+
+    if len(s1) < len(s2):
+        s1, s2 = s2, s1
+    beyond = max_distance + 1
+    previous = [j if j <= max_distance else beyond for j in range(len(s2) + 1)]
+    for i, c1 in enumerate(s1, 1):
+        low = max(1, i - max_distance)
+        high = min(len(s2), i + max_distance)
+        current = [beyond] * (len(s2) + 1)
+        if i <= max_distance:
+            current[0] = i
+        row_min = current[0]
+        for j in range(low, high + 1):
+            cost = previous[j - 1] + (c1 != s2[j - 1])
+            cost = min(cost, previous[j] + 1, current[j - 1] + 1)
+            current[j] = cost if cost <= max_distance else beyond
+            row_min = min(row_min, current[j])
+        if row_min > max_distance:
+            return beyond
+        previous = current
+    return min(previous[-1], beyond)
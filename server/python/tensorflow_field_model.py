@@ -9,10 +9,178 @@ import numpy as np
 import json
 import pickle
 import os
-from typing import List, Dict, Any, Tuple
+import math
+import itertools
+import multiprocessing
+import mmap
+import struct
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator, List, Dict, Any, Optional, Tuple
 import warnings
 warnings.filterwarnings('ignore')
 
+# Compact model format: magic, little-endian uint32 header length, JSON
+# header, then the layer arrays as raw blobs at aligned offsets
+MODEL_MAGIC = b'ZFMODEL\0'
+MODEL_FORMAT_VERSION = 1
+MODEL_ALIGNMENT = 64
+MODEL_LAYERS = ('W1', 'b1', 'W2', 'b2', 'W3', 'b3')
+
+# Rows per inference chunk; infer() keeps activation buffers for this size
+INFERENCE_BATCH = 4096
+
+def _align(offset: int) -> int:
+    """Round offset up to the next MODEL_ALIGNMENT boundary"""
+    return -(-offset // MODEL_ALIGNMENT) * MODEL_ALIGNMENT
+
+def is_compact_model(filepath: str) -> bool:
+    """Whether a model file is in the compact format (rather than a pickle)"""
+    with open(filepath, 'rb') as f:
+        return f.read(len(MODEL_MAGIC)) == MODEL_MAGIC
+
+class SGDOptimizer:
+    """Plain gradient descent"""
+    
+    def step(self, model: 'NeuralFieldEmbedding', gradients: Dict[str, np.ndarray], learning_rate: float):
+        model.apply_gradients(gradients, learning_rate)
+
+class MomentumOptimizer:
+    """Gradient descent with heavy-ball momentum"""
+    
+    def __init__(self, momentum: float = 0.9):
+        self.momentum = momentum
+        self.velocity: Dict[str, np.ndarray] = {}
+    
+    def step(self, model: 'NeuralFieldEmbedding', gradients: Dict[str, np.ndarray], learning_rate: float):
+        for name, gradient in gradients.items():
+            self.velocity[name] = self.momentum * self.velocity.get(name, 0) + gradient
+        model.apply_gradients(self.velocity, learning_rate)
+
+class AdamOptimizer:
+    """Adam: per-parameter steps from bias-corrected gradient moments"""
+    
+    def __init__(self, beta1: float = 0.9, beta2: float = 0.999, epsilon: float = 1e-8):
+        self.beta1 = beta1
+        self.beta2 = beta2
+        self.epsilon = epsilon
+        self.t = 0
+        self.first_moment: Dict[str, np.ndarray] = {}
+        self.second_moment: Dict[str, np.ndarray] = {}
+    
+    def step(self, model: 'NeuralFieldEmbedding', gradients: Dict[str, np.ndarray], learning_rate: float):
+        self.t += 1
+        steps = {}
+        for name, gradient in gradients.items():
+            m = self.first_moment[name] = self.beta1 * self.first_moment.get(name, 0) + (1 - self.beta1) * gradient
+            v = self.second_moment[name] = self.beta2 * self.second_moment.get(name, 0) + (1 - self.beta2) * gradient ** 2
+            m_hat = m / (1 - self.beta1 ** self.t)
+            v_hat = v / (1 - self.beta2 ** self.t)
+            steps[name] = m_hat / (np.sqrt(v_hat) + self.epsilon)
+        model.apply_gradients(steps, learning_rate)
+
+# Below this many pairs per worker, a gradient shard is not worth the IPC
+PARALLEL_MIN_PAIRS = 64
+
+# (model, X, left, right, labels) set by the parent right before forking;
+# workers inherit the encoded training pairs copy-on-write
+_training_job = None
+
+def _shard_gradients(job: Tuple[Dict[str, np.ndarray], np.ndarray]) -> Tuple[int, float, Dict[str, np.ndarray]]:
+    """Contrastive loss and gradients of one shard of a batch under the parent's current weights"""
+    weights, shard = job
+    model, X, left, right, labels = _training_job
+    for name, value in weights.items():
+        setattr(model, name, value)
+    loss, gradients = model.contrastive_batch(X, left[shard], right[shard], labels[shard])
+    return len(shard), loss, gradients
+
+OPTIMIZERS = {'sgd': SGDOptimizer, 'momentum': MomentumOptimizer, 'adam': AdamOptimizer}
+
+LR_SCHEDULES = ('constant', 'cosine', 'step')
+
+def scheduled_learning_rate(learning_rate: float, epoch: int, epochs: int, schedule: str = 'constant') -> float:
+    """
+    Learning rate for an epoch
+    
+    cosine anneals from learning_rate towards 0 over the epoch budget; step
+    halves it after every quarter of the budget.
+    """
+    if schedule not in LR_SCHEDULES:
+        raise ValueError(f"Unknown learning rate schedule: {schedule}")
+    if schedule == 'cosine':
+        return learning_rate * 0.5 * (1 + math.cos(math.pi * epoch / max(1, epochs)))
+    if schedule == 'step':
+        return learning_rate * 0.5 ** (epoch // max(1, epochs // 4))
+    return learning_rate
+
+class EarlyStopping:
+    """
+    Stopping rule shared by the trainers
+    
+    Stops once every critical pair scores above threshold and validation
+    accuracy reaches target_accuracy ("good enough"), or, with patience,
+    after that many checks without a validation improvement, restoring the
+    best weights seen. Validation improves when accuracy rises or, at equal
+    accuracy, when the gap between the similar and dissimilar mean scores
+    widens, so small validation sets (where accuracy moves in coarse steps)
+    still plateau on a real signal.
+    """
+    
+    def __init__(
+        self,
+        model: 'NeuralFieldEmbedding',
+        validation_pairs: Tuple[List[Tuple[str, str]], List[Tuple[str, str]]] = None,
+        critical_pairs: List[Tuple[str, str]] = None,
+        threshold: float = 0.85,
+        target_accuracy: float = 0.95,
+        patience: int = None
+    ):
+        if patience is not None:
+            if patience < 1:
+                raise ValueError(f"patience must be at least 1, got {patience}")
+            if validation_pairs is None:
+                raise ValueError("patience requires validation_pairs")
+        self.model = model
+        self.validation_pairs = validation_pairs
+        self.critical_pairs = critical_pairs
+        self.threshold = threshold
+        self.target_accuracy = target_accuracy
+        self.patience = patience
+        self.best_score = None
+        self.best_weights = None
+        self.stale_checks = 0
+    
+    def metrics(self) -> Dict[str, Any]:
+        """Validation metrics and the lowest critical pair similarity"""
+        metrics = {}
+        if self.validation_pairs is not None:
+            metrics['validation'] = self.model.evaluate_pairs(*self.validation_pairs, threshold=self.threshold)
+        if self.critical_pairs:
+            metrics['critical_min'] = float(self.model.pair_similarities(self.critical_pairs).min())
+        return metrics
+    
+    def check(self) -> Optional[str]:
+        """Evaluate the model; the reason to stop, or None to keep training"""
+        metrics = self.metrics()
+        accuracy = metrics['validation']['accuracy'] if 'validation' in metrics else None
+        if accuracy is not None:
+            validation = metrics['validation']
+            score = (accuracy, validation['similar_mean'] - validation['dissimilar_mean'])
+            if self.best_score is None or score > self.best_score:
+                self.best_score, self.stale_checks = score, 0
+                self.best_weights = {name: np.array(getattr(self.model, name)) for name in MODEL_LAYERS}
+            else:
+                self.stale_checks += 1
+        
+        if metrics and metrics.get('critical_min', 1.0) > self.threshold and (
+                accuracy is None or accuracy >= self.target_accuracy):
+            return 'good enough'
+        if self.patience is not None and self.stale_checks >= self.patience:
+            for name, weights in (self.best_weights or {}).items():
+                setattr(self.model, name, weights)
+            return 'no validation improvement'
+        return None
+
 class NeuralFieldEmbedding:
     """
     Custom Neural Network for learning field name embeddings
@@ -44,6 +212,10 @@ class NeuralFieldEmbedding:
         self.char_vocab = self._build_char_vocab()
         self.trained = False
         
+        # Inference state: float32 weight copies and activation buffers by batch size
+        self._float32_weights = None
+        self._inference_buffers: Dict[int, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+        
     def _build_char_vocab(self) -> Dict[str, int]:
         """Build character to index mapping"""
         chars = 'abcdefghijklmnopqrstuvwxyz0123456789_-. '
@@ -101,6 +273,54 @@ class NeuralFieldEmbedding:
         
         return features.reshape(1, -1)
     
+    def encode_batch(self, field_names: List[str]) -> np.ndarray:
+        """
+        Encode many field names at once, matching _encode_field_name row for row
+        
+        All names are concatenated into one code-point array, mapped to
+        vocabulary indices with a lookup table, and character and bigram
+        counts are accumulated per name with a single bincount each.
+        
+        Args:
+            field_names: Field names to encode
+            
+        Returns:
+            float32 matrix of shape (len(field_names), input_dim)
+        """
+        n_names = len(field_names)
+        vocab_size = len(self.char_vocab)
+        names = [name.lower()[:50] for name in field_names]
+        lengths = np.fromiter((len(name) for name in names), dtype=np.int64, count=n_names)
+        
+        # Vocabulary index per character, -1 outside the vocabulary
+        codes = np.frombuffer(''.join(names).encode('utf-32-le'), dtype=np.uint32).astype(np.int64)
+        lookup = np.full(max(ord(char) for char in self.char_vocab) + 1, -1, dtype=np.int64)
+        for char, idx in self.char_vocab.items():
+            lookup[ord(char)] = idx
+        chars = np.where(codes < len(lookup), lookup[np.minimum(codes, len(lookup) - 1)], -1)
+        rows = np.repeat(np.arange(n_names, dtype=np.int64), lengths)
+        
+        # Character frequency features
+        known = chars >= 0
+        char_counts = np.bincount(
+            rows[known] * vocab_size + chars[known], minlength=n_names * vocab_size
+        ).reshape(n_names, vocab_size)
+        
+        # Bigram features: adjacent characters of the same name, both in the vocabulary
+        pairs = (rows[:-1] == rows[1:]) & known[:-1] & known[1:]
+        bigrams = (chars[:-1][pairs] + chars[1:][pairs]) % vocab_size
+        bigram_counts = np.bincount(
+            rows[:-1][pairs] * vocab_size + bigrams, minlength=n_names * vocab_size
+        ).reshape(n_names, vocab_size)
+        
+        # Count ratios are correctly rounded in float32 directly (no float64 pass)
+        features = np.zeros((n_names, max(self.input_dim, 2 * vocab_size)), dtype=np.float32)
+        for offset, counts in ((0, char_counts), (vocab_size, bigram_counts)):
+            totals = counts.sum(axis=1, keepdims=True)
+            np.divide(counts, np.maximum(totals, 1), out=features[:, offset:offset + vocab_size], dtype=np.float32)
+        
+        return np.ascontiguousarray(features[:, :self.input_dim])
+    
     def forward(self, X: np.ndarray) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
         """
         Forward pass through the network
@@ -139,10 +359,27 @@ class NeuralFieldEmbedding:
             grad_output: Gradient of loss with respect to output
             learning_rate: Learning rate for updates
         """
+        self.apply_gradients(self.compute_gradients(cache, grad_output), learning_rate)
+    
+    def compute_gradients(self, cache: Dict[str, np.ndarray], grad_output: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Backpropagate without updating the weights
+        
+        Args:
+            cache: Cached values from forward pass
+            grad_output: Gradient of loss with respect to output
+            
+        Returns:
+            Parameter gradients averaged over the rows of the batch
+        """
         m = cache['X'].shape[0]
         
+        # Through the L2 normalization: project out the radial component
+        norms = np.maximum(np.linalg.norm(cache['Z3'], axis=1, keepdims=True), 1e-8)
+        A3 = cache['A3']
+        dZ3 = (grad_output - A3 * np.sum(A3 * grad_output, axis=1, keepdims=True)) / norms
+        
         # Layer 3 gradients
-        dZ3 = grad_output
         dW3 = (cache['A2'].T @ dZ3) / m
         db3 = np.sum(dZ3, axis=0, keepdims=True) / m
         
@@ -158,94 +395,405 @@ class NeuralFieldEmbedding:
         dW1 = (cache['X'].T @ dZ1) / m
         db1 = np.sum(dZ1, axis=0, keepdims=True) / m
         
-        # Update weights
-        self.W3 -= learning_rate * dW3
-        self.b3 -= learning_rate * db3
-        self.W2 -= learning_rate * dW2
-        self.b2 -= learning_rate * db2
-        self.W1 -= learning_rate * dW1
-        self.b1 -= learning_rate * db1
+        return {'W1': dW1, 'b1': db1, 'W2': dW2, 'b2': db2, 'W3': dW3, 'b3': db3}
+    
+    def apply_gradients(self, gradients: Dict[str, np.ndarray], learning_rate: float):
+        """Gradient descent step on every layer parameter"""
+        # Out of place: weights loaded from a compact model are read-only views
+        self.W3 = self.W3 - learning_rate * gradients['W3']
+        self.b3 = self.b3 - learning_rate * gradients['b3']
+        self.W2 = self.W2 - learning_rate * gradients['W2']
+        self.b2 = self.b2 - learning_rate * gradients['b2']
+        self.W1 = self.W1 - learning_rate * gradients['W1']
+        self.b1 = self.b1 - learning_rate * gradients['b1']
+    
+    def _index_pairs(
+        self,
+        similar_pairs: List[Tuple[str, str]],
+        dissimilar_pairs: List[Tuple[str, str]]
+    ) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Distinct field names plus (left, right, label) index arrays for pairs
+        
+        Label 1 marks similar pairs and 0 dissimilar ones, so every name is
+        encoded once no matter how many pairs it appears in.
+        """
+        name_index: Dict[str, int] = {}
+        left, right = [], []
+        for field1, field2 in list(similar_pairs) + list(dissimilar_pairs):
+            left.append(name_index.setdefault(field1, len(name_index)))
+            right.append(name_index.setdefault(field2, len(name_index)))
+        labels = np.zeros(len(left), dtype=np.int8)
+        labels[:len(similar_pairs)] = 1
+        return list(name_index), np.array(left, dtype=np.int64), np.array(right, dtype=np.int64), labels
+    
+    def contrastive_batch(
+        self,
+        X: np.ndarray,
+        left: np.ndarray,
+        right: np.ndarray,
+        labels: np.ndarray,
+        margin: float = 1.0
+    ) -> Tuple[float, Dict[str, np.ndarray]]:
+        """
+        Contrastive loss and gradients for a batch of pairs in one forward/backward pass
+        
+        Similar pairs (label 1) are pulled together with squared distance;
+        dissimilar pairs are pushed apart up to the margin.
+        
+        Args:
+            X: Encoded field names
+            left, right: Row indices into X of each pair
+            labels: 1 for similar pairs, 0 for dissimilar pairs
+            margin: Distance beyond which dissimilar pairs have no loss
+            
+        Returns:
+            (summed loss, gradients averaged over the pairs)
+        """
+        batch = len(labels)
+        embeddings, cache = self.forward(np.vstack([X[left], X[right]]))
+        diff = embeddings[:batch] - embeddings[batch:]
+        squared = np.sum(diff ** 2, axis=1)
+        distance = np.sqrt(squared)
+        
+        similar = labels == 1
+        active = ~similar & (distance < margin)
+        loss = float(np.sum(squared[similar]) + np.sum((margin - distance[active]) ** 2))
+        
+        # d(loss)/d(emb1); emb2 gets the negation
+        factor = np.zeros(batch)
+        factor[similar] = 2.0
+        factor[active] = -2 * (margin - distance[active]) / (distance[active] + 1e-8)
+        grad_left = factor[:, None] * diff
+        
+        # compute_gradients averages over 2 * batch rows; doubling makes it
+        # the mean over pairs of both sides' gradients
+        grad_output = 2 * np.vstack([grad_left, -grad_left])
+        return loss, self.compute_gradients(cache, grad_output)
     
     def train_on_pairs(
         self, 
         similar_pairs: List[Tuple[str, str]], 
         dissimilar_pairs: List[Tuple[str, str]],
         epochs: int = 100,
-        learning_rate: float = 0.01
-    ):
+        learning_rate: float = 0.01,
+        batch_size: int = 32,
+        seed: int = None,
+        optimizer: str = 'sgd',
+        lr_schedule: str = 'constant',
+        validation_pairs: Tuple[List[Tuple[str, str]], List[Tuple[str, str]]] = None,
+        critical_pairs: List[Tuple[str, str]] = None,
+        threshold: float = 0.85,
+        target_accuracy: float = 0.95,
+        patience: int = None,
+        workers: int = 1
+    ) -> Dict[str, Any]:
         """
         Train the network using contrastive learning
         
+        Pairs are encoded once, shuffled every epoch and trained in
+        mini-batches with one vectorized forward/backward pass per batch.
+        
+        Training stops early once the model is good enough: every critical
+        pair scores above threshold and (with validation pairs) validation
+        accuracy reaches target_accuracy. With patience, it also stops when
+        validation has not improved (accuracy, then the similar/dissimilar
+        score gap) for that many epochs, keeping the best weights.
+        
         Args:
             similar_pairs: List of (field1, field2) that are similar
             dissimilar_pairs: List of (field1, field2) that are dissimilar
-            epochs: Number of training epochs
-            learning_rate: Learning rate
+            epochs: Maximum number of training epochs
+            learning_rate: Initial learning rate
+            batch_size: Pairs per gradient step
+            seed: Seed for the per-epoch shuffling
+            optimizer: 'sgd', 'momentum' or 'adam'
+            lr_schedule: 'constant', 'cosine' or 'step' (see scheduled_learning_rate)
+            validation_pairs: Held-out (similar_pairs, dissimilar_pairs)
+            critical_pairs: Similar pairs that must score above threshold
+            threshold: Similarity separating similar from dissimilar pairs
+            target_accuracy: Validation accuracy that counts as good enough
+            patience: Epochs without validation improvement before stopping
+                (at least 1; requires validation_pairs)
+            workers: Processes computing gradients on shards of each batch
+                (<= 0 uses every core); see _batch_gradients
+            
+        Returns:
+            Training summary: epochs run, stop reason and final metrics
         """
-        print(f"Training neural network for {epochs} epochs...")
-        
-        for epoch in range(epochs):
-            total_loss = 0
+        if optimizer not in OPTIMIZERS:
+            raise ValueError(f"Unknown optimizer: {optimizer}")
+        scheduled_learning_rate(learning_rate, 0, epochs, lr_schedule)
+        print(f"Training neural network for up to {epochs} epochs ({optimizer}, {lr_schedule} learning rate)...")
+        
+        names, left, right, labels = self._index_pairs(similar_pairs, dissimilar_pairs)
+        # Match the weights' dtype; mixed float32/float64 matmuls are much slower
+        X = self.encode_batch(names).astype(self.W1.dtype)
+        n_pairs = len(labels)
+        workers = workers if workers > 0 else (os.cpu_count() or 1)
+        workers = min(workers, batch_size // PARALLEL_MIN_PAIRS)
+        stopping = EarlyStopping(self, validation_pairs, critical_pairs, threshold, target_accuracy, patience)
+        with self._batch_gradients(X, left, right, labels, workers) as batch_gradients:
+            rng = np.random.default_rng(seed)
+            updater = OPTIMIZERS[optimizer]()
+            summary = {'epochs': epochs, 'stopped': 'epoch budget'}
             
-            # Train on similar pairs (minimize distance)
-            for field1, field2 in similar_pairs:
-                X1 = self._encode_field_name(field1)
-                X2 = self._encode_field_name(field2)
+            for epoch in range(epochs):
+                total_loss = 0
+                order = rng.permutation(n_pairs)
+                epoch_learning_rate = scheduled_learning_rate(learning_rate, epoch, epochs, lr_schedule)
                 
-                # Forward pass
-                emb1, cache1 = self.forward(X1)
-                emb2, cache2 = self.forward(X2)
-                
-                # Contrastive loss: similar pairs should be close
-                diff = emb1 - emb2
-                loss = np.sum(diff ** 2)
-                total_loss += loss
+                for start in range(0, n_pairs, batch_size):
+                    batch = order[start:start + batch_size]
+                    loss, gradients = batch_gradients(batch)
+                    total_loss += loss
+                    updater.step(self, gradients, epoch_learning_rate)
                 
-                # Backward pass
-                grad1 = 2 * diff
-                grad2 = -2 * diff
+                if (epoch + 1) % 20 == 0:
+                    avg_loss = total_loss / max(1, n_pairs)
+                    print(f"Epoch {epoch + 1}/{epochs}, Loss: {avg_loss:.4f}")
                 
-                self.backward(cache1, grad1, learning_rate)
-                self.backward(cache2, grad2, learning_rate)
+                stopped = stopping.check()
+                if stopped:
+                    summary = {'epochs': epoch + 1, 'stopped': stopped}
+                    break
+        
+        summary.update(stopping.metrics())
+        self.trained = True
+        print(f"Training completed after {summary['epochs']} epochs ({summary['stopped']})")
+        return summary
+    
+    def train_on_batches(
+        self,
+        batches: Iterable[Tuple[List[Tuple[str, str]], List[Tuple[str, str]]]],
+        steps: int = 1000,
+        learning_rate: float = 0.002,
+        optimizer: str = 'adam',
+        lr_schedule: str = 'constant',
+        check_every: int = 20,
+        validation_pairs: Tuple[List[Tuple[str, str]], List[Tuple[str, str]]] = None,
+        critical_pairs: List[Tuple[str, str]] = None,
+        threshold: float = 0.85,
+        target_accuracy: float = 0.95,
+        patience: int = None
+    ) -> Dict[str, Any]:
+        """
+        Train on a stream of (similar_pairs, dissimilar_pairs) batches
+        
+        Each batch is encoded when it arrives, so the pair set never has to
+        be materialized (e.g. batches from a sampler that mines hard
+        negatives from this model as it trains). The stopping rule of
+        train_on_pairs is checked every check_every steps; patience counts
+        checks rather than epochs.
+        
+        Args:
+            batches: Iterable of (similar_pairs, dissimilar_pairs)
+            steps: Maximum number of gradient steps
+            learning_rate: Initial learning rate
+            optimizer: 'sgd', 'momentum' or 'adam'
+            lr_schedule: 'constant', 'cosine' or 'step', over the step budget
+            check_every: Steps between stopping checks
             
-            # Train on dissimilar pairs (maximize distance, up to a margin)
-            margin = 1.0
-            for field1, field2 in dissimilar_pairs:
-                X1 = self._encode_field_name(field1)
-                X2 = self._encode_field_name(field2)
-                
-                # Forward pass
-                emb1, cache1 = self.forward(X1)
-                emb2, cache2 = self.forward(X2)
-                
-                # Contrastive loss: dissimilar pairs should be far apart
-                diff = emb1 - emb2
-                distance = np.sqrt(np.sum(diff ** 2))
-                
-                if distance < margin:
-                    loss = (margin - distance) ** 2
-                    total_loss += loss
-                    
-                    # Backward pass
-                    grad_factor = -2 * (margin - distance) / (distance + 1e-8)
-                    grad1 = grad_factor * diff
-                    grad2 = -grad_factor * diff
-                    
-                    self.backward(cache1, grad1, learning_rate)
-                    self.backward(cache2, grad2, learning_rate)
+        Returns:
+            Training summary: steps run, stop reason and final metrics
+        """
+        if optimizer not in OPTIMIZERS:
+            raise ValueError(f"Unknown optimizer: {optimizer}")
+        scheduled_learning_rate(learning_rate, 0, steps, lr_schedule)
+        print(f"Training neural network for up to {steps} steps ({optimizer}, {lr_schedule} learning rate)...")
+        
+        updater = OPTIMIZERS[optimizer]()
+        stopping = EarlyStopping(self, validation_pairs, critical_pairs, threshold, target_accuracy, patience)
+        summary = {'steps': steps, 'stopped': 'step budget'}
+        total_loss, seen_pairs = 0.0, 0
+        
+        for step, (similar_pairs, dissimilar_pairs) in enumerate(itertools.islice(batches, steps)):
+            names, left, right, labels = self._index_pairs(similar_pairs, dissimilar_pairs)
+            X = self.encode_batch(names).astype(self.W1.dtype)
+            loss, gradients = self.contrastive_batch(X, left, right, labels)
+            updater.step(self, gradients, scheduled_learning_rate(learning_rate, step, steps, lr_schedule))
+            total_loss += loss
+            seen_pairs += len(labels)
             
-            if (epoch + 1) % 20 == 0:
-                avg_loss = total_loss / (len(similar_pairs) + len(dissimilar_pairs))
-                print(f"Epoch {epoch + 1}/{epochs}, Loss: {avg_loss:.4f}")
-        
+            if (step + 1) % check_every == 0:
+                print(f"Step {step + 1}/{steps}, Loss: {total_loss / max(1, seen_pairs):.4f}")
+                total_loss, seen_pairs = 0.0, 0
+                stopped = stopping.check()
+                if stopped:
+                    summary = {'steps': step + 1, 'stopped': stopped}
+                    break
+        
+        summary.update(stopping.metrics())
         self.trained = True
-        print("Training completed!")
+        print(f"Training completed after {summary['steps']} steps ({summary['stopped']})")
+        return summary
+    
+    @contextmanager
+    def _batch_gradients(
+        self,
+        X: np.ndarray,
+        left: np.ndarray,
+        right: np.ndarray,
+        labels: np.ndarray,
+        workers: int
+    ) -> Iterator[Callable[[np.ndarray], Tuple[float, Dict[str, np.ndarray]]]]:
+        """
+        Function from a batch of pair indices to (summed loss, mean gradients)
+        
+        With several workers the gradients are data-parallel: forked workers
+        inherit the encoded pairs once, and for every batch the parent sends
+        its current weights and one shard of the batch to each worker, then
+        all-reduces the shard gradients weighted by shard size (equal to the
+        full-batch mean). The optimizer step stays in the parent.
+        """
+        global _training_job
+        
+        if workers <= 1 or 'fork' not in multiprocessing.get_all_start_methods():
+            yield lambda batch: self.contrastive_batch(X, left[batch], right[batch], labels[batch])
+            return
+        
+        def batch_gradients(batch: np.ndarray) -> Tuple[float, Dict[str, np.ndarray]]:
+            weights = {name: getattr(self, name) for name in MODEL_LAYERS}
+            shards = [shard for shard in np.array_split(batch, workers) if len(shard)]
+            results = pool.map(_shard_gradients, [(weights, shard) for shard in shards])
+            
+            total_loss = sum(loss for _, loss, _ in results)
+            gradients = {
+                name: sum(size * shard_gradients[name] for size, _, shard_gradients in results) / len(batch)
+                for name in MODEL_LAYERS
+            }
+            return total_loss, gradients
+        
+        _training_job = (self, X, left, right, labels)
+        try:
+            context = multiprocessing.get_context('fork')
+            with context.Pool(workers) as pool:
+                yield batch_gradients
+        finally:
+            _training_job = None
+    
+    def pair_similarities(self, pairs: List[Tuple[str, str]]) -> np.ndarray:
+        """calculate_similarity for many pairs in one inference pass, embedding each distinct name once"""
+        names, left, right, _ = self._index_pairs(pairs, [])
+        embeddings = self.embed_batch(names)
+        if len(left) == 0:
+            return np.zeros(0)
+        cosine = np.sum(embeddings[left] * embeddings[right], axis=1) / (
+            np.linalg.norm(embeddings[left], axis=1) * np.linalg.norm(embeddings[right], axis=1) + 1e-8
+        )
+        return (cosine + 1) / 2
+    
+    def evaluate_pairs(
+        self,
+        similar_pairs: List[Tuple[str, str]],
+        dissimilar_pairs: List[Tuple[str, str]],
+        threshold: float = 0.85
+    ) -> Dict[str, float]:
+        """
+        Validation metrics for labelled pairs
+        
+        Returns:
+            Mean similarity of each kind of pair and the accuracy of
+            separating them at threshold
+        """
+        similar = self.pair_similarities(similar_pairs)
+        dissimilar = self.pair_similarities(dissimilar_pairs)
+        correct = int(np.sum(similar > threshold)) + int(np.sum(dissimilar <= threshold))
+        return {
+            'similar_mean': float(similar.mean()) if len(similar) else 0.0,
+            'dissimilar_mean': float(dissimilar.mean()) if len(dissimilar) else 0.0,
+            'accuracy': correct / max(1, len(similar) + len(dissimilar))
+        }
     
     def get_embedding(self, field_name: str) -> np.ndarray:
         """Get embedding vector for a field name"""
-        X = self._encode_field_name(field_name)
-        embedding, _ = self.forward(X)
-        return embedding.flatten()
+        return self.embed_batch([field_name])[0]
+    
+    def _inference_weights(self) -> Tuple[np.ndarray, ...]:
+        """
+        float32 layer parameters for infer()
+        
+        Refreshed whenever a weight array is replaced (training and loading
+        assign new arrays rather than updating in place).
+        """
+        weights = tuple(getattr(self, name) for name in MODEL_LAYERS)
+        cached = self._float32_weights
+        if cached is None or any(current is not seen for current, seen in zip(weights, cached[0])):
+            cached = self._float32_weights = (
+                weights, tuple(np.ascontiguousarray(w, dtype=np.float32) for w in weights)
+            )
+        return cached[1]
+    
+    def infer(self, X: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        """
+        Inference-only forward pass in float32
+        
+        Same embeddings as forward() up to float32 rounding, but with no
+        backprop cache: activations are written into buffers kept per
+        batch size and reused across calls (not thread-safe).
+        
+        Args:
+            X: Encoded field names
+            out: Optional float32 (rows, embedding_dim) array to write into
+            
+        Returns:
+            L2-normalized float32 embeddings
+        """
+        W1, b1, W2, b2, W3, b3 = self._inference_weights()
+        X = np.asarray(X, dtype=np.float32)
+        rows = X.shape[0]
+        
+        buffers = self._inference_buffers.get(rows)
+        if buffers is None:
+            if len(self._inference_buffers) >= 4:
+                self._inference_buffers.clear()
+            buffers = self._inference_buffers[rows] = (
+                np.empty((rows, W1.shape[1]), dtype=np.float32),
+                np.empty((rows, W2.shape[1]), dtype=np.float32),
+                np.empty(rows, dtype=np.float32)
+            )
+        hidden1, hidden2, norms = buffers
+        if out is None:
+            out = np.empty((rows, W3.shape[1]), dtype=np.float32)
+        
+        np.matmul(X, W1, out=hidden1)
+        hidden1 += b1
+        np.maximum(hidden1, 0, out=hidden1)
+        np.matmul(hidden1, W2, out=hidden2)
+        hidden2 += b2
+        np.maximum(hidden2, 0, out=hidden2)
+        np.matmul(hidden2, W3, out=out)
+        out += b3
+        
+        np.einsum('ij,ij->i', out, out, out=norms)
+        np.sqrt(norms, out=norms)
+        np.maximum(norms, 1e-8, out=norms)
+        out /= norms[:, None]
+        return out
+    
+    def embed_batch(self, field_names: List[str]) -> np.ndarray:
+        """
+        Embed many field names with the inference path
+        
+        Each distinct name is encoded and embedded once, in chunks of
+        INFERENCE_BATCH rows.
+        
+        Args:
+            field_names: Field names to embed
+            
+        Returns:
+            float32 matrix of L2-normalized embeddings, one row per name
+        """
+        distinct = list(dict.fromkeys(field_names))
+        embeddings = np.empty((len(distinct), self.embedding_dim), dtype=np.float32)
+        for start in range(0, len(distinct), INFERENCE_BATCH):
+            chunk = distinct[start:start + INFERENCE_BATCH]
+            self.infer(self.encode_batch(chunk), out=embeddings[start:start + len(chunk)])
+        
+        if len(distinct) == len(field_names):
+            return embeddings
+        position = {name: i for i, name in enumerate(distinct)}
+        return embeddings[[position[name] for name in field_names]]
     
     def calculate_similarity(self, field1: str, field2: str) -> float:
         """
@@ -258,53 +806,146 @@ class NeuralFieldEmbedding:
         Returns:
             Similarity score between 0 and 1
         """
-        emb1 = self.get_embedding(field1)
-        emb2 = self.get_embedding(field2)
+        return float(self.pair_similarities([(field1, field2)])[0])
+    
+    def save_model(self, filepath: str, quantize: bool = False):
+        """
+        Save trained model to disk
         
-        # Cosine similarity
-        similarity = np.dot(emb1, emb2) / (np.linalg.norm(emb1) * np.linalg.norm(emb2) + 1e-8)
+        .pkl paths keep the legacy pickle format; any other path gets the
+        compact, memory-mappable float32 format.
         
-        # Convert to 0-1 range
-        similarity = (similarity + 1) / 2
+        Args:
+            filepath: Destination file
+            quantize: Store weight matrices as int8 with per-layer scales
+                (compact format only)
+        """
+        import sys
+        if filepath.endswith('.pkl'):
+            model_data = {
+                'W1': self.W1,
+                'b1': self.b1,
+                'W2': self.W2,
+                'b2': self.b2,
+                'W3': self.W3,
+                'b3': self.b3,
+                'input_dim': self.input_dim,
+                'embedding_dim': self.embedding_dim,
+                'char_vocab': self.char_vocab,
+                'trained': self.trained
+            }
+            
+            with open(filepath, 'wb') as f:
+                pickle.dump(model_data, f)
+        else:
+            self._save_compact(filepath, quantize)
         
-        return float(similarity)
+        print(f"Model saved to {filepath}", file=sys.stderr)
     
-    def save_model(self, filepath: str):
-        """Save trained model to disk"""
-        model_data = {
-            'W1': self.W1,
-            'b1': self.b1,
-            'W2': self.W2,
-            'b2': self.b2,
-            'W3': self.W3,
-            'b3': self.b3,
+    def _save_compact(self, filepath: str, quantize: bool):
+        """Write the compact format atomically"""
+        layers = {}
+        blobs = []
+        offset = 0
+        for name in MODEL_LAYERS:
+            weights = np.ascontiguousarray(getattr(self, name), dtype=np.float32)
+            entry = {'shape': list(weights.shape), 'dtype': 'float32'}
+            if quantize and name.startswith('W'):
+                # Symmetric per-layer scale so the largest weight maps to 127
+                scale = float(np.abs(weights).max()) / 127 or 1.0
+                weights = np.clip(np.round(weights / scale), -127, 127).astype(np.int8)
+                entry.update(dtype='int8', scale=scale)
+            offset = _align(offset)
+            entry['offset'] = offset
+            blobs.append((offset, weights.tobytes()))
+            offset += weights.nbytes
+            layers[name] = entry
+        
+        header = json.dumps({
+            'version': MODEL_FORMAT_VERSION,
             'input_dim': self.input_dim,
             'embedding_dim': self.embedding_dim,
             'char_vocab': self.char_vocab,
-            'trained': self.trained
-        }
-        
-        with open(filepath, 'wb') as f:
-            pickle.dump(model_data, f)
-        
-        import sys
-        print(f"Model saved to {filepath}", file=sys.stderr)
+            'trained': self.trained,
+            'layers': layers
+        }).encode('utf-8')
+        data_start = _align(len(MODEL_MAGIC) + 4 + len(header))
+        
+        tmp_path = f"{filepath}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(MODEL_MAGIC)
+            f.write(struct.pack('<I', len(header)))
+            f.write(header)
+            for blob_offset, blob in blobs:
+                f.seek(data_start + blob_offset)
+                f.write(blob)
+        os.replace(tmp_path, filepath)
     
     def load_model(self, filepath: str):
-        """Load trained model from disk"""
+        """Load trained model from disk (compact format or legacy pickle)"""
         import sys
-        with open(filepath, 'rb') as f:
-            model_data = pickle.load(f)
-        
-        self.W1 = model_data['W1']
-        self.b1 = model_data['b1']
-        self.W2 = model_data['W2']
-        self.b2 = model_data['b2']
-        self.W3 = model_data['W3']
-        self.b3 = model_data['b3']
-        self.input_dim = model_data['input_dim']
-        self.embedding_dim = model_data['embedding_dim']
-        self.char_vocab = model_data['char_vocab']
-        self.trained = model_data['trained']
+        if is_compact_model(filepath):
+            self._load_compact(filepath)
+        else:
+            with open(filepath, 'rb') as f:
+                model_data = pickle.load(f)
+            
+            self.W1 = model_data['W1']
+            self.b1 = model_data['b1']
+            self.W2 = model_data['W2']
+            self.b2 = model_data['b2']
+            self.W3 = model_data['W3']
+            self.b3 = model_data['b3']
+            self.input_dim = model_data['input_dim']
+            self.embedding_dim = model_data['embedding_dim']
+            self.char_vocab = model_data['char_vocab']
+            self.trained = model_data['trained']
         
         print(f"Model loaded from {filepath}", file=sys.stderr)
+    
+    def _load_compact(self, filepath: str):
+        """
+        Memory-map a compact model read-only
+        
+        float32 layers are zero-copy views of the file; int8 layers are
+        dequantized to float32 with their scale.
+        """
+        with open(filepath, 'rb') as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        header_start = len(MODEL_MAGIC) + 4
+        header_length = struct.unpack_from('<I', buffer, len(MODEL_MAGIC))[0]
+        header = json.loads(buffer[header_start:header_start + header_length].decode('utf-8'))
+        if header.get('version') != MODEL_FORMAT_VERSION:
+            raise ValueError(f"Unsupported model format version: {header.get('version')}")
+        data_start = _align(header_start + header_length)
+        
+        for name in MODEL_LAYERS:
+            entry = header['layers'][name]
+            weights = np.frombuffer(
+                buffer, dtype=entry['dtype'], count=math.prod(entry['shape']),
+                offset=data_start + entry['offset']
+            ).reshape(entry['shape'])
+            if 'scale' in entry:
+                weights = weights.astype(np.float32) * np.float32(entry['scale'])
+            setattr(self, name, weights)
+        
+        self.input_dim = header['input_dim']
+        self.embedding_dim = header['embedding_dim']
+        self.char_vocab = header['char_vocab']
+        self.trained = header['trained']
+
+
+def convert_model(source_path: str, target_path: str, quantize: bool = False):
+    """Rewrite a model file (e.g. a legacy .pkl) in the compact format"""
+    model = NeuralFieldEmbedding()
+    model.load_model(source_path)
+    model.save_model(target_path, quantize=quantize)
+
+
+if __name__ == "__main__":
+    import sys
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    if len(args) != 2:
+        print("Usage: python tensorflow_field_model.py <model.pkl> <model.zfm> [--int8]", file=sys.stderr)
+        sys.exit(1)
+    convert_model(args[0], args[1], quantize='--int8' in sys.argv[1:])
@@ -2,15 +2,148 @@
 """
 Training Script for Demographic Field Neural Network Model
 Generates training data from demographic patterns and trains the model offline
+
+Usage:
+    python train_demographic_model.py                       # streamed pairs with hard-negative mining
+    python train_demographic_model.py --workers 0           # full pair set, data-parallel on every core
+    python train_demographic_model.py --pairs customer.json # full pair set plus customer-specific pairs
 """
 
 import sys
 import os
+import json
 sys.path.insert(0, os.path.dirname(__file__))
 
-from tensorflow_field_model import NeuralFieldEmbedding
-from typing import List, Tuple
+from tensorflow_field_model import NeuralFieldEmbedding, PARALLEL_MIN_PAIRS
+from typing import Dict, Iterator, List, Set, Tuple
 import random
+import numpy as np
+
+# Pairs the trained model must score above 0.85
+CRITICAL_PAIRS = [
+    ('ssn', 'social_security_number'),
+    ('firstName', 'first_name'),
+    ('dob', 'dateOfBirth'),
+    ('email', 'emailAddress'),
+    ('phone', 'phoneNumber'),
+]
+
+# Demographic field categories with variations
+DEMOGRAPHIC_FIELDS = {
+    'name': [
+        'embossedName', 'embossed_name', 'EMBOSSED_NAME',
+        'firstName', 'first_name', 'FIRST_NAME', 'fname', 'givenName',
+        'lastName', 'last_name', 'LAST_NAME', 'lname', 'surname', 'familyName',
+        'middleName', 'middle_name', 'MIDDLE_NAME', 'mname',
+        'fullName', 'full_name', 'FULL_NAME', 'completeName',
+        'cardEmbossedName', 'card_embossed_name', 'embossedCompanyName'
+    ],
+    'ssn': [
+        'ssn', 'SSN', 'social_security_number', 'socialSecurityNumber',
+        'SOCIAL_SECURITY_NUMBER', 'tax_id', 'taxId', 'TAX_ID',
+        'nationalId', 'national_id', 'NATIONAL_ID'
+    ],
+    'dob': [
+        'dob', 'DOB', 'dateOfBirth', 'date_of_birth', 'DATE_OF_BIRTH',
+        'birthDate', 'birth_date', 'BIRTH_DATE', 'birthdate',
+        'customerDOB', 'customer_dob', 'clientBirthDate'
+    ],
+    'gender': [
+        'gender', 'GENDER', 'sex', 'SEX',
+        'genderCode', 'gender_code', 'GENDER_CODE',
+        'sexCode', 'sex_code'
+    ],
+    'race': [
+        'race', 'RACE', 'ethnicity', 'ETHNICITY',
+        'raceCode', 'race_code', 'RACE_CODE',
+        'ethnicityCode', 'ethnicity_code'
+    ],
+    'marital_status': [
+        'maritalStatus', 'marital_status', 'MARITAL_STATUS',
+        'marriageStatus', 'marriage_status',
+        'maritalStatusCode', 'marital_status_code'
+    ],
+    'address': [
+        'address', 'ADDRESS', 'streetAddress', 'street_address',
+        'addressLine1', 'address_line_1', 'addr1',
+        'homeAddress', 'home_address', 'residentialAddress',
+        'mailingAddress', 'mailing_address'
+    ],
+    'city': [
+        'city', 'CITY', 'cityName', 'city_name',
+        'municipality', 'townCity', 'town_city'
+    ],
+    'state': [
+        'state', 'STATE', 'stateCode', 'state_code',
+        'province', 'PROVINCE', 'region', 'REGION'
+    ],
+    'zip': [
+        'zip', 'ZIP', 'zipCode', 'zip_code', 'ZIP_CODE',
+        'postalCode', 'postal_code', 'POSTAL_CODE',
+        'postcode', 'pincode', 'PIN_CODE'
+    ],
+    'phone': [
+        'phone', 'PHONE', 'phoneNumber', 'phone_number', 'PHONE_NUMBER',
+        'mobileNumber', 'mobile_number', 'cellPhone', 'cell_phone',
+        'homePhone', 'home_phone', 'workPhone', 'work_phone',
+        'telephoneNumber', 'telephone_number'
+    ],
+    'email': [
+        'email', 'EMAIL', 'emailAddress', 'email_address', 'EMAIL_ADDRESS',
+        'emailAddr', 'email_addr', 'e_mail', 'eMail'
+    ],
+    'income': [
+        'income', 'INCOME', 'annualIncome', 'annual_income',
+        'salary', 'SALARY', 'wages', 'earnings',
+        'totalIncome', 'total_income', 'householdIncome'
+    ],
+    'account': [
+        'accountNumber', 'account_number', 'ACCOUNT_NUMBER', 'acctNum',
+        'accountId', 'account_id', 'ACCOUNT_ID',
+        'bankAccount', 'bank_account'
+    ],
+    'card': [
+        'cardNumber', 'card_number', 'CARD_NUMBER', 'creditCardNumber',
+        'cardId', 'card_id', 'panNumber', 'pan_number',
+        'debitCardNumber', 'debit_card_number'
+    ],
+    'license': [
+        'driversLicense', 'drivers_license', 'DRIVERS_LICENSE',
+        'licenseNumber', 'license_number', 'dlNumber', 'dl_number',
+        'drivingLicense', 'driving_license'
+    ],
+    'passport': [
+        'passport', 'PASSPORT', 'passportNumber', 'passport_number',
+        'PASSPORT_NUMBER', 'passportId', 'passport_id'
+    ],
+    'citizen': [
+        'citizenship', 'CITIZENSHIP', 'citizenshipStatus',
+        'nationality', 'NATIONALITY', 'countryOfCitizenship'
+    ],
+    'disability': [
+        'disability', 'DISABILITY', 'disabilityStatus',
+        'disabilityCode', 'disability_code', 'handicap'
+    ],
+    'veteran': [
+        'veteran', 'VETERAN', 'veteranStatus', 'veteran_status',
+        'militaryService', 'military_service'
+    ]
+}
+
+# Non-demographic fields (for negative examples)
+NON_DEMOGRAPHIC_FIELDS = [
+    'transactionId', 'transaction_id', 'orderId', 'order_id',
+    'productCode', 'product_code', 'itemNumber', 'item_number',
+    'quantity', 'price', 'amount', 'total', 'subtotal',
+    'createdDate', 'created_date', 'updatedDate', 'updated_date',
+    'status', 'statusCode', 'active', 'enabled', 'deleted',
+    'description', 'notes', 'comments', 'remarks',
+    'category', 'type', 'kind', 'class', 'group',
+    'version', 'revision', 'sequence', 'index', 'position',
+    'url', 'link', 'path', 'file', 'filename',
+    'hash', 'token', 'key', 'secret', 'password',
+    'metadata', 'config', 'settings', 'preferences'
+]
 
 def generate_demographic_training_data() -> Tuple[List[Tuple[str, str]], List[Tuple[str, str]]]:
     """
@@ -20,128 +153,11 @@ def generate_demographic_training_data() -> Tuple[List[Tuple[str, str]], List[Tu
         (similar_pairs, dissimilar_pairs)
     """
     
-    # Demographic field categories with variations
-    demographic_fields = {
-        'name': [
-            'embossedName', 'embossed_name', 'EMBOSSED_NAME',
-            'firstName', 'first_name', 'FIRST_NAME', 'fname', 'givenName',
-            'lastName', 'last_name', 'LAST_NAME', 'lname', 'surname', 'familyName',
-            'middleName', 'middle_name', 'MIDDLE_NAME', 'mname',
-            'fullName', 'full_name', 'FULL_NAME', 'completeName',
-            'cardEmbossedName', 'card_embossed_name', 'embossedCompanyName'
-        ],
-        'ssn': [
-            'ssn', 'SSN', 'social_security_number', 'socialSecurityNumber',
-            'SOCIAL_SECURITY_NUMBER', 'tax_id', 'taxId', 'TAX_ID',
-            'nationalId', 'national_id', 'NATIONAL_ID'
-        ],
-        'dob': [
-            'dob', 'DOB', 'dateOfBirth', 'date_of_birth', 'DATE_OF_BIRTH',
-            'birthDate', 'birth_date', 'BIRTH_DATE', 'birthdate',
-            'customerDOB', 'customer_dob', 'clientBirthDate'
-        ],
-        'gender': [
-            'gender', 'GENDER', 'sex', 'SEX',
-            'genderCode', 'gender_code', 'GENDER_CODE',
-            'sexCode', 'sex_code'
-        ],
-        'race': [
-            'race', 'RACE', 'ethnicity', 'ETHNICITY',
-            'raceCode', 'race_code', 'RACE_CODE',
-            'ethnicityCode', 'ethnicity_code'
-        ],
-        'marital_status': [
-            'maritalStatus', 'marital_status', 'MARITAL_STATUS',
-            'marriageStatus', 'marriage_status',
-            'maritalStatusCode', 'marital_status_code'
-        ],
-        'address': [
-            'address', 'ADDRESS', 'streetAddress', 'street_address',
-            'addressLine1', 'address_line_1', 'addr1',
-            'homeAddress', 'home_address', 'residentialAddress',
-            'mailingAddress', 'mailing_address'
-        ],
-        'city': [
-            'city', 'CITY', 'cityName', 'city_name',
-            'municipality', 'townCity', 'town_city'
-        ],
-        'state': [
-            'state', 'STATE', 'stateCode', 'state_code',
-            'province', 'PROVINCE', 'region', 'REGION'
-        ],
-        'zip': [
-            'zip', 'ZIP', 'zipCode', 'zip_code', 'ZIP_CODE',
-            'postalCode', 'postal_code', 'POSTAL_CODE',
-            'postcode', 'pincode', 'PIN_CODE'
-        ],
-        'phone': [
-            'phone', 'PHONE', 'phoneNumber', 'phone_number', 'PHONE_NUMBER',
-            'mobileNumber', 'mobile_number', 'cellPhone', 'cell_phone',
-            'homePhone', 'home_phone', 'workPhone', 'work_phone',
-            'telephoneNumber', 'telephone_number'
-        ],
-        'email': [
-            'email', 'EMAIL', 'emailAddress', 'email_address', 'EMAIL_ADDRESS',
-            'emailAddr', 'email_addr', 'e_mail', 'eMail'
-        ],
-        'income': [
-            'income', 'INCOME', 'annualIncome', 'annual_income',
-            'salary', 'SALARY', 'wages', 'earnings',
-            'totalIncome', 'total_income', 'householdIncome'
-        ],
-        'account': [
-            'accountNumber', 'account_number', 'ACCOUNT_NUMBER', 'acctNum',
-            'accountId', 'account_id', 'ACCOUNT_ID',
-            'bankAccount', 'bank_account'
-        ],
-        'card': [
-            'cardNumber', 'card_number', 'CARD_NUMBER', 'creditCardNumber',
-            'cardId', 'card_id', 'panNumber', 'pan_number',
-            'debitCardNumber', 'debit_card_number'
-        ],
-        'license': [
-            'driversLicense', 'drivers_license', 'DRIVERS_LICENSE',
-            'licenseNumber', 'license_number', 'dlNumber', 'dl_number',
-            'drivingLicense', 'driving_license'
-        ],
-        'passport': [
-            'passport', 'PASSPORT', 'passportNumber', 'passport_number',
-            'PASSPORT_NUMBER', 'passportId', 'passport_id'
-        ],
-        'citizen': [
-            'citizenship', 'CITIZENSHIP', 'citizenshipStatus',
-            'nationality', 'NATIONALITY', 'countryOfCitizenship'
-        ],
-        'disability': [
-            'disability', 'DISABILITY', 'disabilityStatus',
-            'disabilityCode', 'disability_code', 'handicap'
-        ],
-        'veteran': [
-            'veteran', 'VETERAN', 'veteranStatus', 'veteran_status',
-            'militaryService', 'military_service'
-        ]
-    }
-    
-    # Non-demographic fields (for negative examples)
-    non_demographic_fields = [
-        'transactionId', 'transaction_id', 'orderId', 'order_id',
-        'productCode', 'product_code', 'itemNumber', 'item_number',
-        'quantity', 'price', 'amount', 'total', 'subtotal',
-        'createdDate', 'created_date', 'updatedDate', 'updated_date',
-        'status', 'statusCode', 'active', 'enabled', 'deleted',
-        'description', 'notes', 'comments', 'remarks',
-        'category', 'type', 'kind', 'class', 'group',
-        'version', 'revision', 'sequence', 'index', 'position',
-        'url', 'link', 'path', 'file', 'filename',
-        'hash', 'token', 'key', 'secret', 'password',
-        'metadata', 'config', 'settings', 'preferences'
-    ]
-    
     similar_pairs = []
     dissimilar_pairs = []
     
     # Generate similar pairs (same category)
-    for category, fields in demographic_fields.items():
+    for category, fields in DEMOGRAPHIC_FIELDS.items():
         for i in range(len(fields)):
             for j in range(i + 1, len(fields)):
                 similar_pairs.append((fields[i], fields[j]))
@@ -150,20 +166,20 @@ def generate_demographic_training_data() -> Tuple[List[Tuple[str, str]], List[Tu
     
     # Generate dissimilar pairs (different categories)
     all_demographic = []
-    for fields in demographic_fields.values():
+    for fields in DEMOGRAPHIC_FIELDS.values():
         all_demographic.extend(fields)
     
     # Demographic vs Non-demographic
     for demo_field in all_demographic[:50]:  # Sample subset
-        for non_demo_field in non_demographic_fields[:30]:
+        for non_demo_field in NON_DEMOGRAPHIC_FIELDS[:30]:
             dissimilar_pairs.append((demo_field, non_demo_field))
     
     # Cross-category demographic fields
-    categories = list(demographic_fields.keys())
+    categories = list(DEMOGRAPHIC_FIELDS.keys())
     for i in range(len(categories)):
         for j in range(i + 1, len(categories)):
-            cat1_fields = demographic_fields[categories[i]]
-            cat2_fields = demographic_fields[categories[j]]
+            cat1_fields = DEMOGRAPHIC_FIELDS[categories[i]]
+            cat2_fields = DEMOGRAPHIC_FIELDS[categories[j]]
             
             # Sample a few pairs from each category combination
             for _ in range(min(3, len(cat1_fields), len(cat2_fields))):
@@ -180,6 +196,211 @@ def generate_demographic_training_data() -> Tuple[List[Tuple[str, str]], List[Tu
     return similar_pairs, dissimilar_pairs
 
 
+def split_validation_pairs(
+    similar_pairs: List[Tuple[str, str]],
+    dissimilar_pairs: List[Tuple[str, str]],
+    fraction: float = 0.1,
+    seed: int = 0
+) -> Tuple[Tuple[List[Tuple[str, str]], List[Tuple[str, str]]], Tuple[List[Tuple[str, str]], List[Tuple[str, str]]]]:
+    """
+    Hold out a validation split, stratified by demographic category
+    
+    Every category with more than one similar pair contributes at least one
+    held-out pair; dissimilar pairs are held out uniformly at random.
+    
+    Returns:
+        ((train_similar, train_dissimilar), (validation_similar, validation_dissimilar))
+    """
+    rng = random.Random(seed)
+    field_category = {field: category for category, fields in DEMOGRAPHIC_FIELDS.items() for field in fields}
+    by_category = {}
+    for pair in similar_pairs:
+        by_category.setdefault(field_category.get(pair[0]), []).append(pair)
+    
+    train_similar, validation_similar = [], []
+    for pairs in by_category.values():
+        pairs = list(pairs)
+        rng.shuffle(pairs)
+        held_out = max(1, int(len(pairs) * fraction)) if len(pairs) > 1 else 0
+        validation_similar.extend(pairs[:held_out])
+        train_similar.extend(pairs[held_out:])
+    
+    dissimilar = list(dissimilar_pairs)
+    rng.shuffle(dissimilar)
+    held_out = int(len(dissimilar) * fraction)
+    return (train_similar, dissimilar[held_out:]), (validation_similar, dissimilar[:held_out])
+
+
+class PairSampler:
+    """
+    Streams training batches without materializing every within-category pair
+    
+    Similar pairs are two distinct fields of one category, with categories
+    drawn in proportion to their pair counts (as in the full pair set).
+    Dissimilar pairs are random pairs from different categories (or
+    demographic vs non-demographic), mixed with hard negatives re-mined from
+    the model every mine_every batches: each field's nearest neighbours by
+    embedding that belong to another category.
+    """
+    
+    def __init__(
+        self,
+        categories: Dict[str, List[str]] = DEMOGRAPHIC_FIELDS,
+        other_fields: List[str] = NON_DEMOGRAPHIC_FIELDS,
+        hard_fraction: float = 0.5,
+        hard_neighbours: int = 5,
+        mine_every: int = 20,
+        seed: int = 0
+    ):
+        """
+        Args:
+            categories: Category -> field name variations
+            other_fields: Fields dissimilar to every category (never paired with each other)
+            hard_fraction: Share of each batch's dissimilar pairs taken from mined hard negatives
+            hard_neighbours: Nearest wrong-category neighbours mined per field
+            mine_every: Batches between hard-negative mining passes
+            seed: Seed for sampling
+        """
+        self.fields: List[str] = []
+        labels: List[int] = []
+        field_index: Dict[str, int] = {}
+        self.members: List[np.ndarray] = []
+        for label, fields in enumerate(categories.values()):
+            members = []
+            for field in fields:
+                if field not in field_index:
+                    field_index[field] = len(self.fields)
+                    self.fields.append(field)
+                    labels.append(label)
+                members.append(field_index[field])
+            if len(set(members)) > 1:
+                self.members.append(np.array(sorted(set(members))))
+        for field in other_fields:
+            if field not in field_index:
+                field_index[field] = len(self.fields)
+                self.fields.append(field)
+                labels.append(-1)
+        
+        # -1 marks non-demographic fields
+        self.labels = np.array(labels)
+        pair_counts = np.array([len(m) * (len(m) - 1) / 2 for m in self.members])
+        self.category_weights = pair_counts / pair_counts.sum()
+        
+        self.hard_fraction = hard_fraction
+        self.hard_neighbours = hard_neighbours
+        self.mine_every = mine_every
+        self.rng = np.random.default_rng(seed)
+        self.hard_pairs = np.zeros((0, 2), dtype=np.int64)
+        self.held_out: Set[Tuple[int, int]] = set()
+    
+    def _dissimilar(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        """Whether index pairs are known to be dissimilar"""
+        labels_a, labels_b = self.labels[a], self.labels[b]
+        return (labels_a != labels_b) & ((labels_a >= 0) | (labels_b >= 0))
+    
+    def _keep(self, a: int, b: int) -> bool:
+        return (min(a, b), max(a, b)) not in self.held_out
+    
+    def sample_similar(self, count: int) -> List[Tuple[int, int]]:
+        """Index pairs of two distinct fields from the same category"""
+        pairs = []
+        while len(pairs) < count:
+            members = self.members[self.rng.choice(len(self.members), p=self.category_weights)]
+            a, b = self.rng.choice(members, size=2, replace=False)
+            if self._keep(a, b):
+                pairs.append((int(a), int(b)))
+        return pairs
+    
+    def sample_dissimilar(self, count: int) -> List[Tuple[int, int]]:
+        """Random index pairs known to be dissimilar"""
+        pairs = []
+        while len(pairs) < count:
+            a, b = self.rng.integers(len(self.fields), size=(2, 2 * count))
+            for i in np.flatnonzero(self._dissimilar(a, b)):
+                if len(pairs) < count and self._keep(a[i], b[i]):
+                    pairs.append((int(a[i]), int(b[i])))
+        return pairs
+    
+    def mine_hard_negatives(self, model: NeuralFieldEmbedding, block_rows: int = 1024):
+        """Each field's hard_neighbours most similar fields of another category under the model"""
+        embeddings = model.embed_batch(self.fields)
+        k = min(self.hard_neighbours, len(self.fields) - 1)
+        columns = np.arange(len(self.fields))
+        hard_pairs = []
+        for start in range(0, len(self.fields), block_rows):
+            rows = np.arange(start, min(len(self.fields), start + block_rows))
+            similarity = embeddings[rows] @ embeddings.T
+            similarity[~self._dissimilar(rows[:, None], columns[None, :])] = -np.inf
+            nearest = np.argpartition(-similarity, k - 1, axis=1)[:, :k]
+            pair_rows = np.repeat(rows, k)
+            pair_columns = nearest.ravel()
+            valid = np.isfinite(similarity[pair_rows - start, pair_columns])
+            hard_pairs.append(np.stack([pair_rows[valid], pair_columns[valid]], axis=1))
+        self.hard_pairs = np.vstack(hard_pairs)
+    
+    def hold_out(self, similar_count: int, dissimilar_count: int) -> Tuple[List[Tuple[str, str]], List[Tuple[str, str]]]:
+        """Draw validation pairs and exclude them from every later batch"""
+        similar = self.sample_similar(similar_count)
+        dissimilar = self.sample_dissimilar(dissimilar_count)
+        self.held_out.update((min(a, b), max(a, b)) for a, b in similar + dissimilar)
+        return self._names(similar), self._names(dissimilar)
+    
+    def _names(self, pairs: List[Tuple[int, int]]) -> List[Tuple[str, str]]:
+        return [(self.fields[a], self.fields[b]) for a, b in pairs]
+    
+    def batches(
+        self,
+        model: NeuralFieldEmbedding,
+        batch_size: int = 32,
+        similar_fraction: float = 0.5
+    ) -> Iterator[Tuple[List[Tuple[str, str]], List[Tuple[str, str]]]]:
+        """
+        Endless (similar_pairs, dissimilar_pairs) batches for train_on_batches
+        
+        Hard negatives are mined from model, which the trainer updates
+        between batches, so they track what the model currently confuses.
+        """
+        similar_count = int(batch_size * similar_fraction)
+        dissimilar_count = batch_size - similar_count
+        step = 0
+        while True:
+            if step % self.mine_every == 0:
+                self.mine_hard_negatives(model)
+            
+            hard = []
+            if len(self.hard_pairs):
+                picks = self.hard_pairs[self.rng.integers(len(self.hard_pairs), size=int(dissimilar_count * self.hard_fraction))]
+                hard = [(int(a), int(b)) for a, b in picks if self._keep(a, b)]
+            dissimilar = hard + self.sample_dissimilar(dissimilar_count - len(hard))
+            
+            yield self._names(self.sample_similar(similar_count)), self._names(dissimilar)
+            step += 1
+
+def load_customer_pairs(path: str) -> Tuple[List[Tuple[str, str]], List[Tuple[str, str]]]:
+    """
+    Customer-specific training pairs from a JSON file
+    
+    Format: {"similar": [[field1, field2], ...], "dissimilar": [[field1, field2], ...]}
+    
+    Returns:
+        (similar_pairs, dissimilar_pairs)
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return (
+        [tuple(pair) for pair in data.get('similar', [])],
+        [tuple(pair) for pair in data.get('dissimilar', [])]
+    )
+
+def _option(argv: List[str], flag: str, default: str = None) -> str:
+    """Value following a command line flag"""
+    if flag in argv:
+        index = argv.index(flag)
+        if index + 1 < len(argv):
+            return argv[index + 1]
+    return default
+
+
 def main():
     """Main training script"""
     print("=" * 60)
@@ -189,29 +410,68 @@ def main():
     print("=" * 60)
     print()
     
-    # Generate training data
-    print("Step 1: Generating training data...")
-    similar_pairs, dissimilar_pairs = generate_demographic_training_data()
-    print()
+    argv = sys.argv[1:]
+    pairs_path = _option(argv, '--pairs')
+    workers = int(_option(argv, '--workers', '1'))
+    workers = workers if workers > 0 else (os.cpu_count() or 1)
     
     # Initialize model
-    print("Step 2: Initializing neural network...")
+    print("Step 1: Initializing neural network...")
     model = NeuralFieldEmbedding(input_dim=100, embedding_dim=32)
     print(f"Network architecture: Input(100) → Dense(128) → ReLU → Dense(64) → ReLU → Dense(32)")
     print()
     
-    # Train model (use subset for faster training)
-    print("Step 3: Training model with contrastive learning...")
-    # Use subset of data for faster training
-    similar_subset = similar_pairs[:300]  # First 300 pairs
-    dissimilar_subset = dissimilar_pairs[:400]  # First 400 pairs
-    
-    model.train_on_pairs(
-        similar_pairs=similar_subset,
-        dissimilar_pairs=dissimilar_subset,
-        epochs=50,  # Reduced from 100
-        learning_rate=0.02  # Slightly higher for faster convergence
-    )
+    # Customer pairs and data-parallel workers need the materialized pair set;
+    # otherwise stream sampled batches with hard negatives mined from the model
+    if pairs_path or workers > 1:
+        print("Step 2: Generating training data...")
+        similar_pairs, dissimilar_pairs = generate_demographic_training_data()
+        if pairs_path:
+            customer_similar, customer_dissimilar = load_customer_pairs(pairs_path)
+            similar_pairs += customer_similar
+            dissimilar_pairs += customer_dissimilar
+            print(f"Added {len(customer_similar)} similar and {len(customer_dissimilar)} dissimilar customer pairs")
+        train_pairs, validation_pairs = split_validation_pairs(similar_pairs, dissimilar_pairs)
+        print(f"Held out {len(validation_pairs[0])} similar and {len(validation_pairs[1])} dissimilar pairs for validation")
+        print()
+        
+        # Parallel workers each need a shard of PARALLEL_MIN_PAIRS, so the batch grows
+        batch_size = max(32, PARALLEL_MIN_PAIRS * workers) if workers > 1 else 32
+        print(f"Step 3: Training model with contrastive learning ({workers} worker(s), batch size {batch_size})...")
+        summary = model.train_on_pairs(
+            similar_pairs=train_pairs[0],
+            dissimilar_pairs=train_pairs[1],
+            epochs=100,
+            learning_rate=0.002,
+            batch_size=batch_size,
+            optimizer='adam',
+            lr_schedule='cosine',
+            validation_pairs=validation_pairs,
+            critical_pairs=CRITICAL_PAIRS,
+            target_accuracy=0.99,
+            patience=10,
+            workers=workers
+        )
+    else:
+        print("Step 2: Sampling training pairs with hard-negative mining...")
+        sampler = PairSampler()
+        validation_pairs = sampler.hold_out(100, 200)
+        print(f"Held out {len(validation_pairs[0])} similar and {len(validation_pairs[1])} dissimilar pairs for validation")
+        print()
+        
+        print("Step 3: Training model with contrastive learning...")
+        summary = model.train_on_batches(
+            sampler.batches(model, batch_size=32),
+            steps=3000,
+            learning_rate=0.002,
+            optimizer='adam',
+            validation_pairs=validation_pairs,
+            critical_pairs=CRITICAL_PAIRS,
+            target_accuracy=0.99,
+            patience=10
+        )
+    print(f"Validation accuracy: {summary['validation']['accuracy']:.3f}, "
+          f"lowest critical pair similarity: {summary['critical_min']:.3f}")
     print()
     
     # Test model
@@ -234,7 +494,7 @@ def main():
     print("Step 5: Saving trained model...")
     model_dir = os.path.join(os.path.dirname(__file__), 'models')
     os.makedirs(model_dir, exist_ok=True)
-    model_path = os.path.join(model_dir, 'demographic_field_model.pkl')
+    model_path = os.path.join(model_dir, 'demographic_field_model.zfm')
     model.save_model(model_path)
     print()
     
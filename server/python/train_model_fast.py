@@ -9,8 +9,17 @@ import os
 sys.path.insert(0, os.path.dirname(__file__))
 
 from tensorflow_field_model import NeuralFieldEmbedding
+import random
 import numpy as np
 
+# Share of the ground-truth pairs held out to validate early stopping
+VALIDATION_FRACTION = 0.2
+
+# Epochs without validation improvement before stopping. The held-out set is
+# only about nine pairs, too few to ever reach the accuracy target, so
+# training stops when the similar/dissimilar score gap plateaus instead
+PATIENCE = 5
+
 def generate_training_batches():
     """Generate demographic training pairs"""
     
@@ -64,6 +73,14 @@ def generate_training_batches():
     return similar_pairs, dissimilar_pairs
 
 
+def hold_out_pairs(pairs, fraction=VALIDATION_FRACTION, keep=(), seed=0):
+    """Split pairs into (train, validation); pairs in keep always stay in train"""
+    pairs = list(pairs)
+    candidates = [pair for pair in pairs if pair not in keep]
+    held_out = set(random.Random(seed).sample(candidates, int(len(candidates) * fraction)))
+    return [pair for pair in pairs if pair not in held_out], [pair for pair in pairs if pair in held_out]
+
+
 def train_with_batches():
     """Train model using efficient batch operations"""
     print("=" * 60)
@@ -83,19 +100,6 @@ def train_with_batches():
     print("Model initialized")
     print()
     
-    # Train with fewer epochs for speed
-    print("Training model (10 epochs with high learning rate)...")
-    model.train_on_pairs(
-        similar_pairs=similar_pairs,
-        dissimilar_pairs=dissimilar_pairs,
-        epochs=10,
-        learning_rate=0.05
-    )
-    print()
-    
-    # Test critical pairs
-    print("Testing critical demographic pairs:")
-    print("-" * 60)
     critical_tests = [
         ('ssn', 'social_security_number'),
         ('firstName', 'first_name'),
@@ -104,6 +108,30 @@ def train_with_batches():
         ('phone', 'phoneNumber'),
     ]
     
+    # Early stopping watches held-out pairs, not the ones being trained on
+    train_similar, validation_similar = hold_out_pairs(similar_pairs, keep=critical_tests)
+    train_dissimilar, validation_dissimilar = hold_out_pairs(dissimilar_pairs)
+    print(f"Holding out {len(validation_similar)} similar and {len(validation_dissimilar)} dissimilar pairs for validation")
+    
+    # Train until the held-out pairs stop separating further (best weights are kept)
+    print(f"Training model (Adam, stopping after {PATIENCE} epochs without validation improvement)...")
+    model.train_on_pairs(
+        similar_pairs=train_similar,
+        dissimilar_pairs=train_dissimilar,
+        epochs=100,
+        learning_rate=0.005,
+        batch_size=8,
+        optimizer='adam',
+        validation_pairs=(validation_similar, validation_dissimilar),
+        critical_pairs=critical_tests,
+        patience=PATIENCE
+    )
+    print()
+    
+    # Test critical pairs
+    print("Testing critical demographic pairs:")
+    print("-" * 60)
+    
     all_pass = True
     for field1, field2 in critical_tests:
         sim = model.calculate_similarity(field1, field2)
@@ -123,7 +151,7 @@ def train_with_batches():
     print()
     model_dir = os.path.join(os.path.dirname(__file__), 'models')
     os.makedirs(model_dir, exist_ok=True)
-    model_path = os.path.join(model_dir, 'demographic_field_model.pkl')
+    model_path = os.path.join(model_dir, 'demographic_field_model.zfm')
     model.save_model(model_path)
     
     print()
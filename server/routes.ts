@@ -351,6 +351,108 @@ function generateExcelMappingHTML(project: any, mapping: any): string {
   `.trim();
 }
 
+// Fields per stdin record sent to the ML matcher
+const FIELD_MATCHER_RECORD_SIZE = 1000;
+
+// Run the ML field matcher, streaming the field lists over stdin instead of argv
+// so large catalogs do not hit the OS argument-length limit. Suggestions come
+// back as ndjson and are parsed line by line, so neither side buffers the
+// whole document.
+async function runFieldMatcher(excelFields: any[], codebaseFields: string[]): Promise<any> {
+  const path = await import('path');
+  const readline = await import('readline');
+  const { once } = await import('events');
+  const { spawn } = await import('child_process');
+  const pythonScript = path.join(process.cwd(), 'server/python/field_matcher_ml.py');
+
+  return new Promise((resolve, reject) => {
+    const python = spawn('python3', [pythonScript, '--input', '-', '--output', 'ndjson']);
+
+    const suggestions: any[] = [];
+    const exactMatchList: any[] = [];
+    const fuzzyMatchList: any[] = [];
+    const noMatchList: any[] = [];
+    let summary: any = null;
+    let matcherError: string | null = null;
+    let errorData = '';
+
+    readline.createInterface({ input: python.stdout }).on('line', (line) => {
+      if (!line.trim()) return;
+      let message: any;
+      try {
+        message = JSON.parse(line);
+      } catch (e) {
+        matcherError = matcherError || `Unexpected ML matcher output: ${line}`;
+        return;
+      }
+      if (message.type === 'suggestion') {
+        const suggestion = message.suggestion;
+        suggestions.push(suggestion);
+        if (!suggestion.bestMatch) {
+          noMatchList.push(suggestion);
+        } else if (suggestion.bestMatch.matchType === 'exact') {
+          exactMatchList.push(suggestion);
+        } else {
+          fuzzyMatchList.push(suggestion);
+        }
+      } else if (message.type === 'summary') {
+        summary = message;
+      } else if (message.type === 'error') {
+        matcherError = message.error;
+      }
+    });
+
+    python.stderr.on('data', (data) => {
+      errorData += data.toString();
+    });
+
+    python.on('error', reject);
+
+    // The matcher can exit before reading all input (EPIPE); without a
+    // handler the stream error would be unhandled and crash the server
+    python.stdin.on('error', (err) => {
+      reject(new Error(`ML matcher stopped reading input: ${errorData || err.message}`));
+    });
+
+    python.on('close', (code) => {
+      if (code !== 0 || matcherError || !summary) {
+        return reject(new Error(matcherError || `ML matcher exited with code ${code}: ${errorData}`));
+      }
+      // Same shape as the matcher's buffered json output
+      resolve({
+        totalFields: summary.totalFields,
+        exactMatches: summary.exactMatches,
+        fuzzyMatches: summary.fuzzyMatches,
+        noMatches: summary.noMatches,
+        suggestions,
+        exactMatchList,
+        fuzzyMatchList,
+        noMatchList
+      });
+    });
+
+    // Codebase fields must all arrive before the first Excel fields (an empty
+    // catalog is still sent as one record); each chunk is written once the
+    // pipe has drained
+    const writeRecords = async () => {
+      const chunks: Array<[string, any[]]> = [];
+      for (let start = 0; start === 0 || start < codebaseFields.length; start += FIELD_MATCHER_RECORD_SIZE) {
+        chunks.push(['codebaseFields', codebaseFields.slice(start, start + FIELD_MATCHER_RECORD_SIZE)]);
+      }
+      for (let start = 0; start < excelFields.length; start += FIELD_MATCHER_RECORD_SIZE) {
+        chunks.push(['excelFields', excelFields.slice(start, start + FIELD_MATCHER_RECORD_SIZE)]);
+      }
+      for (const [key, fields] of chunks) {
+        if (!python.stdin.write(JSON.stringify({ [key]: fields }) + '\n')) {
+          await once(python.stdin, 'drain');
+        }
+      }
+      python.stdin.end();
+    };
+    writeRecords().catch(reject);
+  });
+}
+
 export async function registerRoutes(app: Express): Promise<Server> {
   
   // Session middleware
@@ -2103,30 +2205,12 @@ public class OrderService {
       // Remove duplicates
       const uniqueCodebaseFields = [...new Set(codebaseFields)];
 
-      const path = await import('path');
-      const { exec } = await import('child_process');
-      const { promisify } = await import('util');
-      const execPromise = promisify(exec);
-
       // Call ML matcher
-      const pythonScript = path.join(process.cwd(), 'server/python/field_matcher_ml.py');
-      const excelFieldsJson = JSON.stringify(excelFields).replace(/'/g, "\\'");
-      const codebaseFieldsJson = JSON.stringify(uniqueCodebaseFields).replace(/'/g, "\\'");
-
-      const { stdout } = await execPromise(
-        `python3 "${pythonScript}" '${excelFieldsJson}' '${codebaseFieldsJson}'`,
-        { maxBuffer: 10 * 1024 * 1024 }
-      );
-
-      const result = JSON.parse(stdout);
-
-      if (!result.success) {
-        throw new Error(result.error || 'ML matcher failed');
-      }
+      const suggestions = await runFieldMatcher(excelFields, uniqueCodebaseFields);
 
       res.json({
         success: true,
-        suggestions: result.results
+        suggestions
       });
 
     } catch (error) {
@@ -2159,30 +2243,12 @@ public class OrderService {
         }
       });
 
-      const path = await import('path');
-      const { exec } = await import('child_process');
-      const { promisify } = await import('util');
-      const execPromise = promisify(exec);
-
       // Call ML matcher
-      const pythonScript = path.join(process.cwd(), 'server/python/field_matcher_ml.py');
-      const excelFieldsJson = JSON.stringify(excelFields).replace(/'/g, "\\'");
-      const codebaseFieldsJson = JSON.stringify(codebaseFields).replace(/'/g, "\\'");
-
-      const { stdout } = await execPromise(
-        `python3 "${pythonScript}" '${excelFieldsJson}' '${codebaseFieldsJson}'`,
-        { maxBuffer: 10 * 1024 * 1024 }
-      );
-
-      const result = JSON.parse(stdout);
-
-      if (!result.success) {
-        throw new Error(result.error || 'ML matcher failed');
-      }
+      const suggestions = await runFieldMatcher(excelFields, codebaseFields);
 
       res.json({
         success: true,
-        suggestions: result.results
+        suggestions
       });
 
     } catch (error) {
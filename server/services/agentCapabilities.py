@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Agent Capabilities - Which model-backed features an agent instance enables
+Shared by the ZenVector and CodeLens agents. Installed backends are detected
+separately (capabilityProbe.py); this only decides which features to turn on.
+"""
+
+import os
+from typing import List, Optional, Tuple
+
+def resolve_capabilities(supported: Tuple[str, ...], env_var: str,
+                         capabilities: Optional[List[str]] = None) -> set:
+    """
+    Model-backed capabilities an agent instance enables
+
+    Taken from the capabilities argument, else from the comma-separated
+    env_var, else all of supported; unknown names are dropped. Agents load
+    the models behind these capabilities lazily, on first use.
+    """
+    if capabilities is None:
+        configured = os.environ.get(env_var)
+        if configured is None:
+            return set(supported)
+        capabilities = [c.strip() for c in configured.split(',') if c.strip()]
+    return {c for c in capabilities if c in supported}
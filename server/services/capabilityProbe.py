@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Capability Probe - One-time detection of optional AI/ML backends
+Writes a cached manifest of the backends that import cleanly on this host.
+Agent modules read the manifest at import time to skip missing backends
+and never try to install anything at runtime.
+
+Usage:
+    python capabilityProbe.py                    # probe and write the manifest
+    python capabilityProbe.py --install-missing  # pip install missing backends, then probe
+    python capabilityProbe.py --show             # print the cached manifest
+"""
+
+import sys
+import os
+import json
+import importlib
+import subprocess
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+MANIFEST_VERSION = 1
+
+# Backend name -> (module, names imported from it) exactly as the agents import them
+BACKENDS: Dict[str, List[Tuple[str, List[str]]]] = {
+    'chromadb': [('chromadb', []), ('chromadb.config', ['Settings'])],
+    'sentence_transformers': [('sentence_transformers', ['SentenceTransformer'])],
+    'transformers': [('transformers', ['pipeline', 'AutoTokenizer', 'AutoModel']), ('torch', [])],
+    'langchain': [
+        ('langchain.document_loaders', ['PyPDFLoader', 'WebBaseLoader']),
+        ('langchain.text_splitter', ['RecursiveCharacterTextSplitter']),
+        ('langchain.vectorstores', ['Chroma']),
+        ('langchain.embeddings', ['HuggingFaceEmbeddings']),
+        ('langchain.llms', ['HuggingFacePipeline']),
+        ('langchain.chains', ['RetrievalQA']),
+        ('langchain.prompts', ['PromptTemplate']),
+    ],
+    'langgraph': [('langgraph', ['StateGraph', 'START', 'END']), ('langgraph.graph', ['MessagesState'])],
+    'langfuse': [('langfuse', ['Langfuse']), ('langfuse.decorators', ['observe', 'langfuse_context'])],
+    'radon': [('radon', []), ('radon.complexity', ['cc_visit']), ('radon.metrics', ['mi_visit', 'h_visit'])],
+    'redis': [('redis', [])],
+    'requests': [('requests', [])],
+    'pdf_processing': [('requests', []), ('bs4', ['BeautifulSoup']), ('PyPDF2', [])],
+}
+
+# pip packages used by --install-missing (previously installed on every failed import)
+INSTALL_PACKAGES: Dict[str, List[str]] = {
+    'chromadb': ['chromadb', 'sentence-transformers'],
+    'sentence_transformers': ['sentence-transformers'],
+    'transformers': ['transformers', 'torch', 'accelerate'],
+    'langchain': ['langchain', 'langchain-community', 'langchain-huggingface'],
+    'langgraph': ['langgraph'],
+    'langfuse': ['langfuse'],
+    'radon': ['radon'],
+    'redis': ['redis'],
+    'requests': ['requests'],
+    'pdf_processing': ['requests', 'beautifulsoup4', 'PyPDF2', 'python-docx'],
+}
+
+_manifest_cache: Optional[Dict] = None
+_manifest_loaded = False
+
+def manifest_path() -> str:
+    """Location of the cached manifest (override with ZENAGENT_CAPABILITY_MANIFEST)"""
+    configured = os.environ.get('ZENAGENT_CAPABILITY_MANIFEST')
+    if configured:
+        return configured
+    return os.path.join(os.path.expanduser('~'), '.cache', 'zenagent', 'capabilities.json')
+
+def probe_backend(name: str) -> Tuple[bool, Optional[str]]:
+    """Import every module and name a backend needs; return (available, error)"""
+    try:
+        for module_name, attributes in BACKENDS[name]:
+            module = importlib.import_module(module_name)
+            for attribute in attributes:
+                getattr(module, attribute)
+        return True, None
+    except Exception as e:
+        return False, f"{type(e).__name__}: {e}"
+
+def probe_backends() -> Dict[str, Dict]:
+    """Probe all known backends"""
+    results = {}
+    for name in BACKENDS:
+        available, error = probe_backend(name)
+        results[name] = {'available': available}
+        if error:
+            results[name]['error'] = error
+    return results
+
+def write_manifest(backends: Dict[str, Dict], path: Optional[str] = None) -> str:
+    """Write the probe results to the manifest file"""
+    path = path or manifest_path()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'python': sys.executable,
+        'python_version': sys.version.split()[0],
+        'probed_at': datetime.now().isoformat(),
+        'backends': backends
+    }
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+    return path
+
+def load_manifest() -> Optional[Dict]:
+    """
+    Load the cached manifest once per process
+
+    Returns None when there is no manifest, it is unreadable, or it was
+    written by a different interpreter.
+    """
+    global _manifest_cache, _manifest_loaded
+    if _manifest_loaded:
+        return _manifest_cache
+    _manifest_loaded = True
+
+    try:
+        with open(manifest_path(), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if (manifest.get('version') != MANIFEST_VERSION or
+            manifest.get('python') != sys.executable or
+            manifest.get('python_version') != sys.version.split()[0]):
+        return None
+
+    _manifest_cache = manifest
+    return _manifest_cache
+
+def backend_enabled(name: str) -> bool:
+    """
+    Whether an agent module should try to import a backend
+
+    False only when the manifest recorded the backend as missing. Without a
+    manifest the import is attempted (and simply fails if absent); nothing
+    is ever installed.
+    """
+    manifest = load_manifest()
+    if manifest is None:
+        return True
+    entry = manifest.get('backends', {}).get(name)
+    if entry is None:
+        return True
+    return bool(entry.get('available'))
+
+def noop_observe(*args, **kwargs):
+    """Stand-in for langfuse's @observe() decorator when Langfuse is unavailable"""
+    def decorator(func):
+        return func
+    return decorator
+
+def install_missing(backends: Dict[str, Dict]) -> List[str]:
+    """pip install the packages for every missing backend (explicit, one-time)"""
+    packages = []
+    for name, result in backends.items():
+        if not result['available']:
+            for package in INSTALL_PACKAGES.get(name, []):
+                if package not in packages:
+                    packages.append(package)
+    if packages:
+        subprocess.check_call([sys.executable, "-m", "pip", "install", *packages, "--user"])
+    return packages
+
+def main():
+    """Probe backends and write the manifest"""
+    if '--show' in sys.argv[1:]:
+        manifest = load_manifest()
+        print(json.dumps(manifest if manifest else {"error": f"No valid manifest at {manifest_path()}"}, indent=2))
+        return
+
+    backends = probe_backends()
+
+    if '--install-missing' in sys.argv[1:]:
+        installed = install_missing(backends)
+        if installed:
+            importlib.invalidate_caches()
+            backends = probe_backends()
+
+    path = write_manifest(backends)
+    print(json.dumps({
+        'manifest': path,
+        'available': sorted(name for name, result in backends.items() if result['available']),
+        'missing': sorted(name for name, result in backends.items() if not result['available'])
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -14,7 +14,6 @@ Features:
 """
 
 import sys
-import subprocess
 import json
 import ast
 import os
@@ -28,50 +27,44 @@ from dataclasses import dataclass
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Optional backends are gated by the cached capability manifest
+# (see capabilityProbe.py); nothing is installed at import time
+from capabilityProbe import backend_enabled, noop_observe
+from agentCapabilities import resolve_capabilities
+
 # Try to import advanced analysis libraries
-try:
-    from transformers import pipeline, AutoTokenizer, AutoModel
-    import torch
-    HUGGINGFACE_AVAILABLE = True
-except ImportError:
-    print("Installing HuggingFace Transformers...")
+HUGGINGFACE_AVAILABLE = False
+if backend_enabled('transformers'):
     try:
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "transformers", "torch", "accelerate", "--user"])
         from transformers import pipeline, AutoTokenizer, AutoModel
         import torch
         HUGGINGFACE_AVAILABLE = True
-    except:
-        HUGGINGFACE_AVAILABLE = False
+    except ImportError:
+        pass
 
-try:
-    from langfuse import Langfuse
-    from langfuse.decorators import observe, langfuse_context
-    LANGFUSE_AVAILABLE = True
-except ImportError:
-    print("Installing Langfuse...")
+LANGFUSE_AVAILABLE = False
+observe = noop_observe
+if backend_enabled('langfuse'):
     try:
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "langfuse", "--user"])
         from langfuse import Langfuse
         from langfuse.decorators import observe, langfuse_context
         LANGFUSE_AVAILABLE = True
-    except:
-        LANGFUSE_AVAILABLE = False
+    except ImportError:
+        pass
 
-try:
-    import radon
-    from radon.complexity import cc_visit
-    from radon.metrics import mi_visit, h_visit
-    RADON_AVAILABLE = True
-except ImportError:
-    print("Installing Radon for code metrics...")
+RADON_AVAILABLE = False
+if backend_enabled('radon'):
     try:
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "radon", "--user"])
         import radon
         from radon.complexity import cc_visit
         from radon.metrics import mi_visit, h_visit
         RADON_AVAILABLE = True
-    except:
-        RADON_AVAILABLE = False
+    except ImportError:
+        pass
+
+# Model-backed capabilities that can be enabled per agent instance.
+# Models are only loaded the first time a call actually needs them.
+CODELENS_CAPABILITIES = ('code_analysis',)
 
 @dataclass
 class CodeMetrics:
@@ -108,10 +101,19 @@ class CodeLensAgent:
     - Langfuse observability for analysis tracking
     """
     
-    def __init__(self):
-        """Initialize Code Lens Agent with advanced analysis capabilities"""
+    def __init__(self, capabilities: Optional[List[str]] = None):
+        """
+        Initialize Code Lens Agent with advanced analysis capabilities
+        
+        Args:
+            capabilities: Model-backed capabilities to enable (see CODELENS_CAPABILITIES).
+                Defaults to the CODELENS_CAPABILITIES env var, or all of them.
+                Models are loaded lazily on first use, never here.
+        """
+        self.capabilities = resolve_capabilities(CODELENS_CAPABILITIES, 'CODELENS_CAPABILITIES', capabilities)
         self.langfuse_client = None
-        self.code_analysis_pipeline = None
+        self._code_analysis_pipeline = None
+        self._load_attempted = set()
         self.vulnerability_patterns = self._load_vulnerability_patterns()
         self.performance_patterns = self._load_performance_patterns()
         
@@ -122,18 +124,24 @@ class CodeLensAgent:
                 print("Langfuse observability initialized for Code Lens")
         except Exception as e:
             print(f"Langfuse initialization failed: {e}")
-        
-        # Initialize HuggingFace models for code analysis
-        try:
-            if HUGGINGFACE_AVAILABLE:
-                self.code_analysis_pipeline = pipeline(
+    
+    @property
+    def code_analysis_pipeline(self):
+        """CodeBERT classification pipeline, loaded on first use"""
+        if (self._code_analysis_pipeline is None and HUGGINGFACE_AVAILABLE
+                and 'code_analysis' in self.capabilities
+                and 'code_analysis' not in self._load_attempted):
+            self._load_attempted.add('code_analysis')
+            try:
+                self._code_analysis_pipeline = pipeline(
                     "text-classification",
                     model="microsoft/codebert-base",
                     device=0 if torch.cuda.is_available() else -1
                 )
                 print("HuggingFace CodeBERT initialized for Code Lens")
-        except Exception as e:
-            print(f"HuggingFace initialization failed: {e}")
+            except Exception as e:
+                print(f"HuggingFace initialization failed: {e}")
+        return self._code_analysis_pipeline
     
     def _load_vulnerability_patterns(self) -> List[Dict[str, Any]]:
         """Load common security vulnerability patterns"""
@@ -866,7 +874,7 @@ class CodeLensAgent:
                 'Quality Metrics'
             ],
             'ai_models': {
-                'code_analysis': 'microsoft/codebert-base' if HUGGINGFACE_AVAILABLE else 'not_available',
+                'code_analysis': 'microsoft/codebert-base' if HUGGINGFACE_AVAILABLE and 'code_analysis' in self.capabilities else 'not_available',
                 'observability': 'langfuse' if LANGFUSE_AVAILABLE else 'not_available'
             },
             'status': 'active'
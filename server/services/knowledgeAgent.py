@@ -10,78 +10,59 @@ import json
 import os
 import sys
 import uuid
-import subprocess
 import requests
 import hashlib
 import time
+import threading
 from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
 from urllib.parse import urljoin, urlparse
 import logging
 
+# Optional backends are gated by the cached capability manifest
+# (see capabilityProbe.py); nothing is installed at import time
+from capabilityProbe import backend_enabled, noop_observe
+
 # Try to import dependencies
-try:
-    import chromadb
-    from chromadb.config import Settings
-    CHROMADB_AVAILABLE = True
-except ImportError:
-    print("Installing ChromaDB...")
+CHROMADB_AVAILABLE = False
+if backend_enabled('chromadb'):
     try:
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "chromadb", "sentence-transformers", "--user"])
         import chromadb
         from chromadb.config import Settings
         CHROMADB_AVAILABLE = True
-    except:
-        CHROMADB_AVAILABLE = False
+    except ImportError:
+        pass
 
-try:
-    from sentence_transformers import SentenceTransformer
-    SENTENCE_TRANSFORMERS_AVAILABLE = True
-except ImportError:
-    SENTENCE_TRANSFORMERS_AVAILABLE = False
+SENTENCE_TRANSFORMERS_AVAILABLE = False
+if backend_enabled('sentence_transformers'):
+    try:
+        from sentence_transformers import SentenceTransformer
+        SENTENCE_TRANSFORMERS_AVAILABLE = True
+    except ImportError:
+        pass
 
-try:
-    import redis
-    REDIS_AVAILABLE = True
-except ImportError:
-    print("Installing Redis...")
+REDIS_AVAILABLE = False
+if backend_enabled('redis'):
     try:
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "redis", "--user"])
         import redis
         REDIS_AVAILABLE = True
-    except:
-        REDIS_AVAILABLE = False
+    except ImportError:
+        pass
 
-try:
-    import requests
-    from bs4 import BeautifulSoup
-    import PyPDF2
-    PDF_PROCESSING_AVAILABLE = True
-except ImportError:
-    print("Installing PDF processing dependencies...")
+PDF_PROCESSING_AVAILABLE = False
+if backend_enabled('pdf_processing'):
     try:
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "requests", "beautifulsoup4", "PyPDF2", "python-docx", "--user"])
         import requests
         from bs4 import BeautifulSoup
         import PyPDF2
         PDF_PROCESSING_AVAILABLE = True
-    except:
-        PDF_PROCESSING_AVAILABLE = False
+    except ImportError:
+        pass
 
 # Advanced AI/ML Libraries Integration
-try:
-    from langchain.document_loaders import PyPDFLoader, WebBaseLoader
-    from langchain.text_splitter import RecursiveCharacterTextSplitter
-    from langchain.vectorstores import Chroma
-    from langchain.embeddings import HuggingFaceEmbeddings
-    from langchain.llms import HuggingFacePipeline
-    from langchain.chains import RetrievalQA
-    from langchain.prompts import PromptTemplate
-    LANGCHAIN_AVAILABLE = True
-except ImportError:
-    print("Installing Langchain and dependencies...")
+LANGCHAIN_AVAILABLE = False
+if backend_enabled('langchain'):
     try:
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "langchain", "langchain-community", "langchain-huggingface", "--user"])
         from langchain.document_loaders import PyPDFLoader, WebBaseLoader
         from langchain.text_splitter import RecursiveCharacterTextSplitter
         from langchain.vectorstores import Chroma
@@ -90,50 +71,36 @@ except ImportError:
         from langchain.chains import RetrievalQA
         from langchain.prompts import PromptTemplate
         LANGCHAIN_AVAILABLE = True
-    except:
-        LANGCHAIN_AVAILABLE = False
+    except ImportError:
+        pass
 
-try:
-    from langgraph import StateGraph, START, END
-    from langgraph.graph import MessagesState
-    LANGGRAPH_AVAILABLE = True
-except ImportError:
-    print("Installing LangGraph...")
+LANGGRAPH_AVAILABLE = False
+if backend_enabled('langgraph'):
     try:
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "langgraph", "--user"])
         from langgraph import StateGraph, START, END
         from langgraph.graph import MessagesState
         LANGGRAPH_AVAILABLE = True
-    except:
-        LANGGRAPH_AVAILABLE = False
+    except ImportError:
+        pass
 
-try:
-    from langfuse import Langfuse
-    from langfuse.decorators import observe, langfuse_context
-    LANGFUSE_AVAILABLE = True
-except ImportError:
-    print("Installing Langfuse...")
+LANGFUSE_AVAILABLE = False
+observe = noop_observe
+if backend_enabled('langfuse'):
     try:
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "langfuse", "--user"])
         from langfuse import Langfuse
         from langfuse.decorators import observe, langfuse_context
         LANGFUSE_AVAILABLE = True
-    except:
-        LANGFUSE_AVAILABLE = False
+    except ImportError:
+        pass
 
-try:
-    from transformers import pipeline, AutoTokenizer, AutoModel
-    import torch
-    HUGGINGFACE_AVAILABLE = True
-except ImportError:
-    print("Installing HuggingFace Transformers...")
+HUGGINGFACE_AVAILABLE = False
+if backend_enabled('transformers'):
     try:
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "transformers", "torch", "accelerate", "--user"])
         from transformers import pipeline, AutoTokenizer, AutoModel
         import torch
         HUGGINGFACE_AVAILABLE = True
-    except:
-        HUGGINGFACE_AVAILABLE = False
+    except ImportError:
+        pass
 
 class KnowledgeAgent:
     """
@@ -154,6 +121,11 @@ class KnowledgeAgent:
     def __init__(self, db_path: str = "./knowledge_db", redis_host: str = "localhost", redis_port: int = 6379):
         """Initialize Knowledge Agent with advanced AI integrations"""
         self.db_path = db_path
+        # The HuggingFace pipeline (and the QA chain built on it) and the
+        # SentenceTransformer tokenizer are not safe to call from several
+        # threads at once; Chroma, Redis and HTTP calls are, and run unlocked
+        self._generation_lock = threading.Lock()
+        self._embedding_lock = threading.Lock()
         self.redis_client = None
         self.chroma_client = None
         self.embedding_model = None
@@ -210,6 +182,8 @@ class KnowledgeAgent:
                 print("Knowledge Agent with ChromaDB initialized successfully")
             else:
                 print("ChromaDB not available")
+        except Exception as e:
+            print(f"Failed to initialize Knowledge Agent: {e}")
         
         # Initialize Langfuse for LLM observability
         try:
@@ -254,9 +228,16 @@ class KnowledgeAgent:
                 print("LangGraph workflow initialized")
         except Exception as e:
             print(f"LangGraph initialization failed: {e}")
-                
-        except Exception as e:
-            print(f"Failed to initialize Knowledge Agent: {e}")
+    
+    def _embed(self, text: str) -> List[float]:
+        """SentenceTransformer embedding of text (serialized across threads)"""
+        with self._embedding_lock:
+            return self.embedding_model.encode(text).tolist()
+    
+    def _generate(self, prompt: str, **kwargs):
+        """Run the HuggingFace pipeline (serialized across threads)"""
+        with self._generation_lock:
+            return self.huggingface_pipeline(prompt, **kwargs)
     
     def _get_or_create_collection(self, name: str):
         """Get or create a ChromaDB collection"""
@@ -668,7 +649,7 @@ class KnowledgeAgent:
             summary = ""
             if self.huggingface_pipeline:
                 try:
-                    summary_result = self.huggingface_pipeline(
+                    summary_result = self._generate(
                         f"Summarize this document: {text_content[:1000]}...",
                         max_length=200,
                         do_sample=False
@@ -705,7 +686,7 @@ class KnowledgeAgent:
             # Generate key insights using HuggingFace
             insights_prompt = f"Extract key insights from: {content[:500]}..."
             
-            insights_result = self.huggingface_pipeline(
+            insights_result = self._generate(
                 insights_prompt,
                 max_length=150,
                 do_sample=True,
@@ -732,7 +713,7 @@ class KnowledgeAgent:
             content = f"Title: {page_data['title']}\n\nContent: {page_data['content']}"
             
             if self.embedding_model:
-                embedding = self.embedding_model.encode(content).tolist()
+                embedding = self._embed(content)
                 self.confluence_collection.add(
                     embeddings=[embedding],
                     documents=[content],
@@ -767,7 +748,7 @@ class KnowledgeAgent:
             content = pdf_data['content']
             
             if self.embedding_model:
-                embedding = self.embedding_model.encode(content).tolist()
+                embedding = self._embed(content)
                 self.pdf_collection.add(
                     embeddings=[embedding],
                     documents=[content],
@@ -862,13 +843,20 @@ class KnowledgeAgent:
             (self.knowledge_collection, "knowledge")
         ]
         
+        query_embedding = None
+        if self.embedding_model and any(collection for collection, _ in collections):
+            try:
+                query_embedding = self._embed(query)
+            except Exception as e:
+                print(f"Error embedding query: {e}")
+                return []
+        
         for collection, source_type in collections:
             if not collection:
                 continue
             
             try:
-                if self.embedding_model:
-                    query_embedding = self.embedding_model.encode(query).tolist()
+                if query_embedding is not None:
                     results = collection.query(
                         query_embeddings=[query_embedding],
                         n_results=limit
@@ -945,11 +933,12 @@ class KnowledgeAgent:
             # Prepare context for LangChain
             context = "\n\n".join([doc['content'][:500] for doc in context_docs])
             
-            # Use LangChain QA chain
-            result = self.langchain_qa_chain({
-                "query": query,
-                "context": context
-            })
+            # Use LangChain QA chain (its LLM is the shared HuggingFace pipeline)
+            with self._generation_lock:
+                result = self.langchain_qa_chain({
+                    "query": query,
+                    "context": context
+                })
             
             # Extract response and sources
             response = result.get('result', '')
@@ -984,7 +973,7 @@ class KnowledgeAgent:
             Answer:"""
             
             # Generate response
-            result = self.huggingface_pipeline(
+            result = self._generate(
                 prompt,
                 max_length=300,
                 do_sample=True,
@@ -2,62 +2,166 @@
 """
 Knowledge Agent CLI Interface - Command line interface for Knowledge Agent
 Handles method calls from Node.js backend
+
+Modes:
+- One-shot (default): reads a single {"method", "data"} request from stdin
+- Server (--server [--concurrency N]): keeps one KnowledgeAgent resident and
+  serves pipelined newline-delimited JSON requests tagged with an "id".
+  Up to N requests (default 4) run concurrently and responses are written
+  as soon as each one finishes, so they may come back out of order. All
+  requests share one KnowledgeAgent: retrieval, caching and scraping run in
+  parallel, while the agent serializes calls into the HuggingFace pipeline,
+  the QA chain and the embedding model, which are not thread-safe.
 """
 
 import sys
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from knowledgeAgent import KnowledgeAgent
 
+DEFAULT_CONCURRENCY = 4
+
+def handle_request(agent: KnowledgeAgent, method: str, data: dict):
+    """Route a single method call to the Knowledge agent"""
+    if method == 'scrape_confluence_pages':
+        return agent.scrape_confluence_pages(
+            data.get('base_url', ''),
+            data.get('credentials', {}),
+            data.get('max_depth', 3)
+        )
+    elif method == 'process_pdf_with_doclinq':
+        return agent.process_pdf_with_doclinq(
+            data.get('pdf_path', ''),
+            data.get('doclinq_config', {})
+        )
+    elif method == 'chat_query':
+        return agent.chat_query(
+            data.get('query', ''),
+            data.get('context_limit', 5)
+        )
+    elif method == 'get_agent_statistics':
+        return agent.get_agent_statistics()
+    else:
+        return {"error": f"Unknown method: {method}"}
+
+def _parse_concurrency(argv) -> int:
+    """Read --concurrency N (a positive integer) from the command line"""
+    if '--concurrency' not in argv:
+        return DEFAULT_CONCURRENCY
+    index = argv.index('--concurrency')
+    value = argv[index + 1] if index + 1 < len(argv) else ''
+    if not value.isdigit() or int(value) < 1:
+        raise ValueError(f"--concurrency expects a positive integer, got {value!r}")
+    return int(value)
+
+def run_server(concurrency: int = DEFAULT_CONCURRENCY):
+    """
+    Resident multi-request server loop
+
+    Redis, ChromaDB, the embedding models, the HuggingFace pipeline and the
+    LangChain/LangGraph objects are built once. Each stdin line is an
+    {"id", "method", "data"} envelope and is answered with an
+    {"id", "result"} or {"id", "error"} line. While serving, sys.stdout points
+    at stderr so agent logging cannot corrupt the protocol stream. On EOF or a
+    "shutdown" request the server stops reading and drains in-flight requests;
+    a shutdown request is then answered with {"id", "result": {"status":
+    "shutdown"}}, as in the ZenVector worker.
+    """
+    out = sys.stdout
+    write_lock = threading.Lock()
+
+    def respond(message: dict):
+        line = json.dumps(message) + "\n"
+        with write_lock:
+            out.write(line)
+            out.flush()
+
+    def execute(request_id, method: str, data: dict):
+        try:
+            respond({"id": request_id, "result": handle_request(agent, method, data)})
+        except Exception as e:
+            respond({"id": request_id, "error": f"Knowledge Agent CLI error: {str(e)}"})
+
+    sys.stdout = sys.stderr
+    try:
+        agent = KnowledgeAgent()
+        respond({"id": None, "status": "ready"})
+
+        shutdown = None
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for line in sys.stdin:
+                if not line.strip():
+                    continue
+
+                try:
+                    request = json.loads(line)
+                except json.JSONDecodeError as e:
+                    respond({"id": None, "error": f"Invalid JSON: {str(e)}"})
+                    continue
+                if not isinstance(request, dict):
+                    respond({"id": None, "error": "Request must be a JSON object"})
+                    continue
+
+                request_id = request.get('id')
+                method = request.get('method')
+
+                if method == 'shutdown':
+                    shutdown = {"id": request_id, "result": {"status": "shutdown"}}
+                    break
+
+                if request_id is None:
+                    respond({"id": None, "error": "Request id is required in server mode"})
+                    continue
+
+                executor.submit(execute, request_id, method, request.get('data') or {})
+
+        # All in-flight requests have been answered at this point
+        if shutdown is not None:
+            respond(shutdown)
+    finally:
+        sys.stdout = out
+
 def main():
     """Main CLI interface for Knowledge Agent"""
+    if '--server' in sys.argv[1:]:
+        try:
+            concurrency = _parse_concurrency(sys.argv[1:])
+        except ValueError as e:
+            print(json.dumps({"error": f"{e}. Usage: knowledgeAgentCli.py --server [--concurrency N]"}))
+            sys.exit(1)
+        run_server(concurrency)
+        return
+
     try:
         # Read input from stdin
         input_data = sys.stdin.read()
-        
+
         if not input_data.strip():
             print(json.dumps({"error": "No input data provided"}))
             return
-        
+
         # Parse the input JSON
         try:
             request = json.loads(input_data)
         except json.JSONDecodeError as e:
             print(json.dumps({"error": f"Invalid JSON: {str(e)}"}))
             return
-        
+
         method = request.get('method')
         data = request.get('data', {})
-        
+
         # Initialize Knowledge agent
         agent = KnowledgeAgent()
-        
+
         # Route to appropriate method
-        if method == 'scrape_confluence_pages':
-            result = agent.scrape_confluence_pages(
-                data.get('base_url', ''),
-                data.get('credentials', {}),
-                data.get('max_depth', 3)
-            )
-        elif method == 'process_pdf_with_doclinq':
-            result = agent.process_pdf_with_doclinq(
-                data.get('pdf_path', ''),
-                data.get('doclinq_config', {})
-            )
-        elif method == 'chat_query':
-            result = agent.chat_query(
-                data.get('query', ''),
-                data.get('context_limit', 5)
-            )
-        elif method == 'get_agent_statistics':
-            result = agent.get_agent_statistics()
-        else:
-            result = {"error": f"Unknown method: {method}"}
-        
+        result = handle_request(agent, method, data)
+
         # Return result as JSON
         print(json.dumps(result))
-        
+
     except Exception as e:
         print(json.dumps({"error": f"Knowledge Agent CLI error: {str(e)}"}))
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -2,72 +2,133 @@
 """
 ZenVector CLI Interface - Command line interface for ZenVector Agent
 Handles method calls from Node.js backend
+
+Modes:
+- One-shot (default): reads a single {"method", "data"} request from stdin
+- Worker (--worker): loads the agent once and serves newline-delimited JSON
+  requests from stdin, writing one JSON response line per request to stdout
 """
 
 import sys
 import json
+from contextlib import redirect_stdout
 from zenVectorService import ZenVectorAgent
 
+def handle_request(agent: ZenVectorAgent, method: str, data: dict):
+    """Route a single method call to the ZenVector agent"""
+    if method == 'add_code_to_vector_db':
+        return agent.add_code_to_vector_db(
+            data.get('project_id', ''),
+            data.get('code_data', {})
+        )
+    elif method == 'find_similar_code':
+        return agent.find_similar_code(
+            data.get('query_code', ''),
+            data.get('project_id'),
+            data.get('top_k', 5)
+        )
+    elif method == 'semantic_search':
+        return agent.semantic_search(
+            data.get('query', ''),
+            data.get('search_type', 'all'),
+            data.get('top_k', 10)
+        )
+    elif method == 'analyze_demographic_patterns':
+        return agent.analyze_demographic_patterns(
+            data.get('demographic_data', [])
+        )
+    elif method == 'search_demographic_data':
+        return agent.search_demographic_data(
+            data.get('query', ''),
+            data.get('top_k', 10)
+        )
+    elif method == 'get_agent_statistics':
+        return agent.get_agent_statistics()
+    else:
+        return {"error": f"Unknown method: {method}"}
+
+def run_worker():
+    """
+    Long-lived worker loop
+
+    The agent (ChromaDB client and models) is built once and reused for every
+    request. Each stdin line is a {"id", "method", "data"} envelope; each
+    response line is {"id", "result"} or {"id", "error"}. Agent logging is
+    redirected to stderr so stdout only carries protocol lines. The worker
+    exits on EOF or on a "shutdown" request.
+    """
+    out = sys.stdout
+
+    def respond(message: dict):
+        out.write(json.dumps(message) + "\n")
+        out.flush()
+
+    with redirect_stdout(sys.stderr):
+        agent = ZenVectorAgent()
+    respond({"id": None, "status": "ready"})
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as e:
+            respond({"id": None, "error": f"Invalid JSON: {str(e)}"})
+            continue
+        if not isinstance(request, dict):
+            respond({"id": None, "error": "Request must be a JSON object"})
+            continue
+
+        request_id = request.get('id')
+        method = request.get('method')
+
+        if method == 'shutdown':
+            respond({"id": request_id, "result": {"status": "shutdown"}})
+            break
+
+        try:
+            with redirect_stdout(sys.stderr):
+                result = handle_request(agent, method, request.get('data') or {})
+            respond({"id": request_id, "result": result})
+        except Exception as e:
+            respond({"id": request_id, "error": f"ZenVector CLI error: {str(e)}"})
+
 def main():
     """Main CLI interface for ZenVector Agent"""
+    if '--worker' in sys.argv[1:]:
+        run_worker()
+        return
+
     try:
         # Read input from stdin
         input_data = sys.stdin.read()
-        
+
         if not input_data.strip():
             print(json.dumps({"error": "No input data provided"}))
             return
-        
+
         # Parse the input JSON
         try:
             request = json.loads(input_data)
         except json.JSONDecodeError as e:
             print(json.dumps({"error": f"Invalid JSON: {str(e)}"}))
             return
-        
+
         method = request.get('method')
         data = request.get('data', {})
-        
+
         # Initialize ZenVector agent
         agent = ZenVectorAgent()
-        
+
         # Route to appropriate method
-        if method == 'add_code_to_vector_db':
-            result = agent.add_code_to_vector_db(
-                data.get('project_id', ''), 
-                data.get('code_data', {})
-            )
-        elif method == 'find_similar_code':
-            result = agent.find_similar_code(
-                data.get('query_code', ''),
-                data.get('project_id'),
-                data.get('top_k', 5)
-            )
-        elif method == 'semantic_search':
-            result = agent.semantic_search(
-                data.get('query', ''),
-                data.get('search_type', 'all'),
-                data.get('top_k', 10)
-            )
-        elif method == 'analyze_demographic_patterns':
-            result = agent.analyze_demographic_patterns(
-                data.get('demographic_data', [])
-            )
-        elif method == 'search_demographic_data':
-            result = agent.search_demographic_data(
-                data.get('query', ''),
-                data.get('top_k', 10)
-            )
-        elif method == 'get_agent_statistics':
-            result = agent.get_agent_statistics()
-        else:
-            result = {"error": f"Unknown method: {method}"}
-        
+        result = handle_request(agent, method, data)
+
         # Return result as JSON
         print(json.dumps(result))
-        
+
     except Exception as e:
         print(json.dumps({"error": f"ZenVector CLI error: {str(e)}"}))
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
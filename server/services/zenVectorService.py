@@ -9,78 +9,70 @@ import json
 import os
 import sys
 import uuid
-import subprocess
 from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 import logging
 
+# Optional backends are gated by the cached capability manifest
+# (see capabilityProbe.py); nothing is installed at import time
+from capabilityProbe import backend_enabled, noop_observe
+from agentCapabilities import resolve_capabilities
+
 # Try to import ChromaDB and dependencies
-try:
-    import chromadb
-    from chromadb.config import Settings
-    CHROMADB_AVAILABLE = True
-except ImportError:
-    print("ChromaDB not available, installing...")
+CHROMADB_AVAILABLE = False
+if backend_enabled('chromadb'):
     try:
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "chromadb", "sentence-transformers", "--user"])
         import chromadb
         from chromadb.config import Settings
         CHROMADB_AVAILABLE = True
-    except:
-        CHROMADB_AVAILABLE = False
+    except ImportError:
+        pass
 
 # Try to import sentence transformers
-try:
-    from sentence_transformers import SentenceTransformer
-    SENTENCE_TRANSFORMERS_AVAILABLE = True
-except ImportError:
-    SENTENCE_TRANSFORMERS_AVAILABLE = False
+SENTENCE_TRANSFORMERS_AVAILABLE = False
+if backend_enabled('sentence_transformers'):
+    try:
+        from sentence_transformers import SentenceTransformer
+        SENTENCE_TRANSFORMERS_AVAILABLE = True
+    except ImportError:
+        pass
 
 # Advanced AI/ML Libraries Integration for ZenVector
-try:
-    from transformers import pipeline, AutoTokenizer, AutoModel
-    import torch
-    HUGGINGFACE_AVAILABLE = True
-except ImportError:
-    print("Installing HuggingFace Transformers...")
+HUGGINGFACE_AVAILABLE = False
+if backend_enabled('transformers'):
     try:
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "transformers", "torch", "accelerate", "--user"])
         from transformers import pipeline, AutoTokenizer, AutoModel
         import torch
         HUGGINGFACE_AVAILABLE = True
-    except:
-        HUGGINGFACE_AVAILABLE = False
+    except ImportError:
+        pass
 
-try:
-    from langfuse import Langfuse
-    from langfuse.decorators import observe, langfuse_context
-    LANGFUSE_AVAILABLE = True
-except ImportError:
-    print("Installing Langfuse...")
+LANGFUSE_AVAILABLE = False
+observe = noop_observe
+if backend_enabled('langfuse'):
     try:
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "langfuse", "--user"])
         from langfuse import Langfuse
         from langfuse.decorators import observe, langfuse_context
         LANGFUSE_AVAILABLE = True
-    except:
-        LANGFUSE_AVAILABLE = False
+    except ImportError:
+        pass
 
-try:
-    import requests
-    REQUESTS_AVAILABLE = True
-except ImportError:
-    print("Installing requests...")
+REQUESTS_AVAILABLE = False
+if backend_enabled('requests'):
     try:
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "requests", "--user"])
         import requests
         REQUESTS_AVAILABLE = True
-    except:
-        REQUESTS_AVAILABLE = False
+    except ImportError:
+        pass
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Model-backed capabilities that can be enabled per agent instance.
+# Models are only loaded the first time a call actually needs them.
+ZENVECTOR_CAPABILITIES = ('embeddings', 'code_analysis', 'text_generation')
+
 class ZenVectorAgent:
     """
     ZenVector: Advanced AI Agent for Code Intelligence with Enterprise AI Integration
@@ -105,19 +97,31 @@ class ZenVectorAgent:
     - Multi-modal search capabilities
     """
     
-    def __init__(self, db_path: str = "./chroma_db"):
-        """Initialize ZenVector Agent with ChromaDB vector database"""
+    def __init__(self, db_path: str = "./chroma_db", capabilities: Optional[List[str]] = None):
+        """
+        Initialize ZenVector Agent with ChromaDB vector database
+        
+        Args:
+            db_path: ChromaDB persistence directory
+            capabilities: Model-backed capabilities to enable (see ZENVECTOR_CAPABILITIES).
+                Defaults to the ZENVECTOR_CAPABILITIES env var, or all of them.
+                Models are loaded lazily on first use, never here.
+        """
         self.db_path = db_path
+        self.capabilities = resolve_capabilities(ZENVECTOR_CAPABILITIES, 'ZENVECTOR_CAPABILITIES', capabilities)
         self.client = None
-        self.embedding_model = None
         self.code_collection = None
         self.semantic_collection = None
         self.demographic_collection = None
         
+        # Lazily loaded models (see the properties below)
+        self._embedding_model = None
+        self._code_analysis_pipeline = None
+        self._huggingface_pipeline = None
+        self._load_attempted = set()
+        
         # Advanced AI Integration Components
         self.langfuse_client = None
-        self.huggingface_pipeline = None
-        self.code_analysis_pipeline = None
         self.sonarqube_client = None
         
         try:
@@ -131,10 +135,6 @@ class ZenVectorAgent:
                     )
                 )
                 
-                # Initialize sentence transformer for embeddings
-                if SENTENCE_TRANSFORMERS_AVAILABLE:
-                    self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
-                
                 # Create collections for different data types
                 self.code_collection = self._get_or_create_collection("code_similarity")
                 self.semantic_collection = self._get_or_create_collection("semantic_search")
@@ -143,6 +143,9 @@ class ZenVectorAgent:
                 print("ZenVector Agent with ChromaDB initialized successfully")
             else:
                 print("ChromaDB not available, using fallback mode")
+        except Exception as e:
+            print(f"Failed to initialize ZenVector Agent: {e}")
+            self.client = None
         
         # Initialize Langfuse for LLM observability
         try:
@@ -151,30 +154,54 @@ class ZenVectorAgent:
                 print("Langfuse observability initialized for ZenVector")
         except Exception as e:
             print(f"Langfuse initialization failed: {e}")
-        
-        # Initialize HuggingFace models for code analysis
-        try:
-            if HUGGINGFACE_AVAILABLE:
-                # Code analysis pipeline
-                self.code_analysis_pipeline = pipeline(
+    
+    def _should_load(self, capability: str, available: bool) -> bool:
+        """Allow a single load attempt per enabled and installed capability"""
+        if not available or capability not in self.capabilities or capability in self._load_attempted:
+            return False
+        self._load_attempted.add(capability)
+        return True
+    
+    @property
+    def embedding_model(self):
+        """Sentence transformer for embeddings, loaded on first use"""
+        if self._embedding_model is None and self._should_load('embeddings', SENTENCE_TRANSFORMERS_AVAILABLE):
+            try:
+                self._embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+                print("Sentence transformer loaded for ZenVector")
+            except Exception as e:
+                print(f"Sentence transformer initialization failed: {e}")
+        return self._embedding_model
+    
+    @property
+    def code_analysis_pipeline(self):
+        """CodeBERT classification pipeline, loaded on first use"""
+        if self._code_analysis_pipeline is None and self._should_load('code_analysis', HUGGINGFACE_AVAILABLE):
+            try:
+                self._code_analysis_pipeline = pipeline(
                     "text-classification",
                     model="microsoft/codebert-base",
                     device=0 if torch.cuda.is_available() else -1
                 )
-                
-                # General text generation for insights
-                self.huggingface_pipeline = pipeline(
+                print("HuggingFace CodeBERT loaded for ZenVector")
+            except Exception as e:
+                print(f"HuggingFace initialization failed: {e}")
+        return self._code_analysis_pipeline
+    
+    @property
+    def huggingface_pipeline(self):
+        """DialoGPT text generation pipeline for insights, loaded on first use"""
+        if self._huggingface_pipeline is None and self._should_load('text_generation', HUGGINGFACE_AVAILABLE):
+            try:
+                self._huggingface_pipeline = pipeline(
                     "text-generation",
                     model="microsoft/DialoGPT-medium",
                     device=0 if torch.cuda.is_available() else -1
                 )
-                print("HuggingFace models initialized for ZenVector")
-        except Exception as e:
-            print(f"HuggingFace initialization failed: {e}")
-                
-        except Exception as e:
-            print(f"Failed to initialize ZenVector Agent: {e}")
-            self.client = None
+                print("HuggingFace DialoGPT loaded for ZenVector")
+            except Exception as e:
+                print(f"HuggingFace initialization failed: {e}")
+        return self._huggingface_pipeline
     
     def _get_or_create_collection(self, name: str):
         """Get or create a ChromaDB collection"""
@@ -591,9 +618,11 @@ class ZenVectorAgent:
                     'Langfuse LLM Observability',
                     'Multi-Model AI Pipeline'
                 ],
-                'embedding_model': 'all-MiniLM-L6-v2' if self.embedding_model else 'ChromaDB Default',
+                'embedding_model': 'all-MiniLM-L6-v2' if self._embedding_model is not None else 'ChromaDB Default',
                 'vector_database': 'ChromaDB Persistent',
-                'database_path': self.db_path
+                'database_path': self.db_path,
+                'enabled_capabilities': sorted(self.capabilities),
+                'loaded_models': self._loaded_models()
             }
             
             stats['total_vectors'] = sum(stats['collections'].values())
@@ -604,6 +633,17 @@ class ZenVectorAgent:
             print(f"Error getting agent statistics: {e}")
             return {'error': str(e)}
     
+    def _loaded_models(self) -> List[str]:
+        """Names of the models that are currently resident in memory"""
+        loaded = []
+        if self._embedding_model is not None:
+            loaded.append('all-MiniLM-L6-v2')
+        if self._code_analysis_pipeline is not None:
+            loaded.append('microsoft/codebert-base')
+        if self._huggingface_pipeline is not None:
+            loaded.append('microsoft/DialoGPT-medium')
+        return loaded
+    
     def _extract_class_features(self, class_info: Dict[str, Any]) -> str:
         """Extract textual features from class information"""
         features = []